@@ -1,5 +1,7 @@
-import heapq
 from collections import deque
+from landmarks import Landmarks
+from priority_queues import make_frontier
+from search_core import graph_search, reconstruct_path
 graph = {
     0: [(1, 2), (2, 1)],
     1: [(0, 2),(2,5),(3,11),(4,3)],
@@ -21,34 +23,16 @@ heuristics ={
 }
 
 def a_star_search(graph,heuristics,start,goal):
-    nodes_gen=0
-    vis=set()
-    pq=[(0,start,[start],0)]
-    nodes_gen=nodes_gen+1
-    total_cost=float('inf')
-    path=[]
-    while pq:
-        curr_cost, curr_node, curr_path, total_path_cost = heapq.heappop(pq)
-        if curr_node in vis:
-            continue
-        vis.add(curr_node)
-
-        if curr_node == goal:
-            print("Total Path Cost:",total_path_cost)
-            return curr_path, nodes_gen
+    path, total_path_cost, stats = graph_search(start, lambda node: node == goal,
+                                                lambda node: graph[node],
+                                                heuristic=lambda node: heuristics[node])
+    if path:
+        print("Total Path Cost:",total_path_cost)
+    return path, stats["generated"]
 
-        
-        for neighbor, weight in graph[curr_node]:
-            if neighbor not in vis:
-                tentative_cost = total_path_cost + weight
-                heuristic = heuristics[neighbor]
-                f = tentative_cost + heuristic
-                nodes_gen=nodes_gen+1
-                heapq.heappush(pq, (f, neighbor, curr_path+[neighbor], tentative_cost))
-    return path, nodes_gen
-
-def uniform_cost_search(graph,start,goal):
-    pq=[(0,start)]
+def uniform_cost_search(graph,start,goal,frontier="heap"):
+    pq=make_frontier(frontier)
+    pq.push(start,0)
     visited=set()
     parent={start:None}
     cost_so_far = {start: 0}
@@ -56,18 +40,11 @@ def uniform_cost_search(graph,start,goal):
     actual_cost = float('inf')
     actual_path=[]
     while pq:
-        cost, node=heapq.heappop(pq)
-        if node in visited:
-            continue
+        cost, node=pq.pop()
         visited.add(node)
 
         if node == goal:
-            path=[]
-            while node:
-                path.append(node)
-                node=parent[node]
-            
-            path.reverse()
+            path=reconstruct_path(parent, node)
             if actual_cost>cost:
                 actual_cost=cost
                 actual_path=path
@@ -75,10 +52,10 @@ def uniform_cost_search(graph,start,goal):
         
         for neighbor, weight in graph.get(node,[]):
             new_cost = cost + weight
-            if new_cost < cost_so_far.get(neighbor, float('inf')):
+            if neighbor not in visited and new_cost < cost_so_far.get(neighbor, float('inf')):
                 cost_so_far[neighbor] = new_cost
                 nodes_gen+=1
-                heapq.heappush(pq,(new_cost,neighbor))
+                pq.push(neighbor,new_cost)
                 parent[neighbor]=node
     
     return actual_path, nodes_gen
@@ -146,5 +123,10 @@ def main():
     print(f"No. of nodes generated for UCS: {ucs_nodes_gen}")
     print(f"No. of nodes generated for A*: {a_star_nodes_gen}")
 
+    # The hand-entered heuristics above are not admissible (node 5 is inf); landmarks give one that is
+    alt_path, alt_nodes_gen = a_star_search(graph, Landmarks.build(graph, k=3).heuristic(goal_node), start_node, goal_node)
+    print(f"A* with landmark heuristic found the path: {alt_path}")
+    print(f"No. of nodes generated for A* (landmarks): {alt_nodes_gen}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
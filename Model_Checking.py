@@ -1,38 +1,61 @@
-import itertools
+from propositional import ModelChecker, parse, variables_of
+
+# The knowledge bases this script used to hard-code, by number of variables
+KNOWLEDGE_BASES = {
+    3: ["A or B",
+        "(not A) == (not B or C)",
+        "not A or not B or C"],
+    4: ["C == (B or D)",
+        "not A or (not B and not D)",
+        "(B and not C) or A",
+        "D or C"],
+}
+
+
+def read_line(prompt):
+    try:
+        return input(prompt).strip()
+    except EOFError:
+        return ""
+
+
 def main():
     N=int(input("Enter the number of Variables:\n"))
-    possibilities=list(itertools.product([True, False],repeat=N))
-    temp=False
-
-    if N==3:
-        for i in range(len(possibilities)):
-            A=possibilities[i][0]
-            B=possibilities[i][1]
-            C=possibilities[i][2]
-            condition1=A or B
-            condition2=(not A) == (not B or C)
-            condition3=not A or not B or C
-            if condition1 and condition2 and condition3:
-                temp=True
-                print("KB is Satisfied")
-                print(f"({A},{B},{C})")
-    elif N==4:
-        for i in range(len(possibilities)):
-            A=possibilities[i][0]
-            B=possibilities[i][1]
-            C=possibilities[i][2]
-            D=possibilities[i][3]
-            condition1= C == (B or D)
-            condition2=not A or (not B and not D)
-            condition3=(B and not C) or A
-            condition4=D or C
-            if condition1 and condition2 and condition3 and condition4:
-                temp=True
-                print("KB is Satisfied")
-                print(f"({A},{B},{C},{D})")
-        
-    if not temp:
+    kb = KNOWLEDGE_BASES.get(N)
+    preset = kb is not None
+    if not preset:
+        kb = []
+        print("Enter the KB formulas, one per line, and an empty line to finish "
+              "(not/and/or/==, or ~ & | => <=>):")
+        while True:
+            formula = read_line("")
+            if not formula:
+                break
+            kb.append(formula)
+    names = variables_of([parse(formula) for formula in kb])
+    letters = [chr(ord("A") + i) for i in range(N)] if N <= 26 else []
+    variables = letters if set(names) <= set(letters) else names
+    checker = ModelChecker(kb, variables)
+
+    count = 0
+    for model in checker.models():
+        count += 1
+        print("KB is Satisfied")
+        print("(" + ",".join(map(str, model)) + ")")
+    if not count:
         print("No matter how we assign truth values to variables no satifiable assignment is obtained....")
+    if preset:  # the hard-coded KBs print exactly what they always did
+        return
+    if count:
+        print(f"{count} of {2 ** checker.num_vars} assignments satisfy the KB")
+
+    query = read_line("Enter a query to check whether the KB entails it (empty to skip):\n")
+    if query:
+        entailed, counterexample = checker.entails(query)
+        if entailed:
+            print(f"KB entails {query}")
+        else:
+            print(f"KB does not entail {query}, e.g. {counterexample}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
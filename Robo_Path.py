@@ -1,14 +1,33 @@
-import heapq
+import os
+import sys
+
+from grid_map import GridMap
+from priority_queues import make_frontier
 
 # Define the heuristic function (Manhattan Distance)
 def heuristic(start_row, start_col, end_row, end_col):
     return abs(start_row - end_row) + abs(start_col - end_col)
 
 # A* algorithm to find the optimal path
-def robo_path(start_row, start_col, end_row, end_col, matrix, directions_map, m, n):
-    # Priority queue to store the nodes to be explored (f, g, row, col)
-    open_list = []
-    heapq.heappush(open_list, (0 + heuristic(start_row, start_col, end_row, end_col), 0, start_row, start_col))
+def robo_path(start_row, start_col, end_row, end_col, matrix, directions_map, m, n, frontier="heap",
+              jump_points=False):
+    # Jump Point Search on the packed grid: same path cost, far fewer expansions on open floors,
+    # used when directions_map allows every move onto a free cell
+    if jump_points:
+        grid = GridMap.from_directions(matrix, directions_map)
+        # one-way or restricted directions: fall back to the A* loop below
+        if grid.is_uniform():
+            path, _, _ = grid.jump_point_search((start_row, start_col), (end_row, end_col))
+            if not path:
+                print("Path not found.")
+                return
+            print("Path found!")
+            for (r, c) in path:
+                print(f"({r}, {c})")
+            return
+    # Priority queue of cells to be explored, keyed by f; "bucket" suits the unit step costs
+    open_list = make_frontier(frontier)
+    open_list.push((start_row, start_col), 0 + heuristic(start_row, start_col, end_row, end_col))
     
     # A dictionary to store the best path to each cell
     came_from = {}
@@ -24,7 +43,8 @@ def robo_path(start_row, start_col, end_row, end_col, matrix, directions_map, m,
     
     while open_list:
         # Get the cell with the lowest f value
-        f, g, current_row, current_col = heapq.heappop(open_list)
+        f, (current_row, current_col) = open_list.pop()
+        g = g_score[(current_row, current_col)]
         
         # If we reached the goal
         if (current_row, current_col) == (end_row, end_col):
@@ -55,7 +75,7 @@ def robo_path(start_row, start_col, end_row, end_col, matrix, directions_map, m,
                 if (neighbor_row, neighbor_col) not in g_score or tentative_g < g_score[(neighbor_row, neighbor_col)]:
                     g_score[(neighbor_row, neighbor_col)] = tentative_g
                     f = tentative_g + heuristic(neighbor_row, neighbor_col, end_row, end_col)
-                    heapq.heappush(open_list, (f, tentative_g, neighbor_row, neighbor_col))
+                    open_list.push((neighbor_row, neighbor_col), f)
                     came_from[(neighbor_row, neighbor_col)] = (current_row, current_col)
     
     # If we exhaust the open list and don't find a path
@@ -63,6 +83,18 @@ def robo_path(start_row, start_col, end_row, end_col, matrix, directions_map, m,
 
 # Main function
 def main():
+    # python Robo_Path.py floor.npz: the first run saves the map entered below, later runs load it
+    map_path = sys.argv[1] if len(sys.argv) > 1 else None
+    if map_path and os.path.exists(map_path):
+        grid = GridMap.load(map_path)
+        start = (int(input("Enter the start row:\n")), int(input("Enter the start column:\n")))
+        goal = (int(input("Enter the goal row:\n")), int(input("Enter the goal column:\n")))
+        path, _, _ = grid.astar(start, goal)
+        print("Path found!" if path else "Path not found.")
+        for (r, c) in path:
+            print(f"({r}, {c})")
+        return
+
     m = int(input("Enter the number of rows:\n"))
     n = int(input("Enter the number of columns:\n"))
     
@@ -80,6 +112,9 @@ def main():
             # Use split() to avoid extra spaces being included
             directions = input(f"Enter directions for cell ({i}, {j}): ").upper().split()
             directions_map[(i, j)] = directions
+    if map_path:
+        GridMap.from_directions(matrix, directions_map).save(map_path)
+        print(f"Map saved to {map_path}")
     
     # Get the start and goal positions
     start_row = int(input("Enter the start row:\n"))
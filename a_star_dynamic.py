@@ -1,54 +1,26 @@
-import heapq
-from collections import deque
-
-def a_star_search(graph, heuristics, start, goal):
-    nodes_gen = 0
-    vis = set()
-    pq = [(heuristics[start], start, [start], 0)]  # Initialize with heuristic
-    nodes_gen += 1
-    while pq:
-        curr_f, curr_node, curr_path, total_path_cost = heapq.heappop(pq)
-        if curr_node in vis:
-            continue
-        vis.add(curr_node)
-
-        if curr_node == goal:
-            print("Total Path Cost:", total_path_cost)
-            return curr_path, nodes_gen
-
-        for neighbor, weight in graph.get(curr_node, []):
-            if neighbor not in vis:
-                tentative_cost = total_path_cost + weight
-                heuristic = heuristics[neighbor]
-                f = tentative_cost + heuristic
-                nodes_gen += 1
-                heapq.heappush(pq, (f, neighbor, curr_path + [neighbor], tentative_cost))
-    return [], nodes_gen  # Return empty path if goal not found
-
-
-def uniform_cost_search(graph, start, goal):
-    pq = [(0, start, [start])]  # Store the path
-    visited = set()
-    nodes_gen = 0
-
-    while pq:
-        cost, node, path = heapq.heappop(pq)
-        nodes_gen += 1
-
-        if node in visited:
-            continue
-        visited.add(node)
-
-        if node == goal:
-            return path, nodes_gen
-
-        for neighbor, weight in graph.get(node, []):
-            if neighbor not in visited:
-                new_cost = cost + weight
-                new_path = path + [neighbor]
-                heapq.heappush(pq, (new_cost, neighbor, new_path))
-
-    return [], nodes_gen
+from bidirectional_search import average_potential, bidirectional_search
+from landmarks import Landmarks
+from search_core import graph_search
+
+def a_star_search(graph, heuristics, start, goal, bidirectional=False):
+    if bidirectional:
+        path, total_path_cost, stats = bidirectional_search(graph, start, goal,
+                                                            average_potential(heuristics, start))
+    else:
+        path, total_path_cost, stats = graph_search(start, lambda node: node == goal,
+                                                    lambda node: graph.get(node, []),
+                                                    heuristic=lambda node: heuristics[node])
+    if path:
+        print("Total Path Cost:", total_path_cost)
+    return path, stats["generated"]  # Empty path if goal not found
+
+
+def uniform_cost_search(graph, start, goal, bidirectional=False):
+    if bidirectional:
+        path, _, stats = bidirectional_search(graph, start, goal)
+    else:
+        path, _, stats = graph_search(start, lambda node: node == goal, lambda node: graph.get(node, []))
+    return path, stats["popped"]
 
 
 def dfs(graph, start_node, goal_node, result=None, vis=None, nodes_gen=0):
@@ -73,27 +45,9 @@ def dfs(graph, start_node, goal_node, result=None, vis=None, nodes_gen=0):
 
 
 def bfs(graph, start_node, goal_node):
-    q = deque([(start_node, [start_node])])  # Store the path
-    visited = set()
-    nodes_gen = 0
-
-    while q:
-        node, path = q.popleft()
-        nodes_gen += 1
-
-        if node in visited:
-            continue
-        visited.add(node)
-
-        if node == goal_node:
-            return path, nodes_gen
-
-        for neighbor, _ in graph.get(node, []):
-            if neighbor not in visited:
-                new_path = path + [neighbor]
-                q.append((neighbor, new_path))
-
-    return [], nodes_gen
+    path, _, stats = graph_search(start_node, lambda node: node == goal_node,
+                                  lambda node: graph.get(node, []), strategy="fifo")
+    return path, stats["popped"]
 
 
 def main():
@@ -111,14 +65,18 @@ def main():
                 neighbors.append((neighbor, int(weight)))  # Convert weight to integer
         graph[node] = neighbors
 
-    # Get heuristic input from the user
+    # Get heuristic input from the user, or derive it from landmark distances
+    use_landmarks = input("Compute heuristics automatically from landmarks? (y/n): ").strip().lower() == 'y'
     heuristics = {}
-    for node in graph:
-        heuristic_value = int(input(f"Enter heuristic value for node {node}: "))
-        heuristics[node] = heuristic_value
+    if not use_landmarks:
+        for node in graph:
+            heuristic_value = int(input(f"Enter heuristic value for node {node}: "))
+            heuristics[node] = heuristic_value
 
     start_node = input("Enter the start node: ")
     goal_node = input("Enter the goal node: ")
+    if use_landmarks:
+        heuristics = Landmarks.build(graph).heuristic(goal_node)
 
     a_star_path, a_star_nodes_gen = a_star_search(graph, heuristics, start_node, goal_node)
     print(f"A* search found the path: {a_star_path}")
@@ -134,6 +92,11 @@ def main():
     print(f"No. of nodes generated for UCS: {ucs_nodes_gen}")
     print(f"No. of nodes generated for A*: {a_star_nodes_gen}")
 
+    bi_ucs_path, bi_ucs_nodes_gen = uniform_cost_search(graph, start_node, goal_node, bidirectional=True)
+    bi_a_star_path, bi_a_star_nodes_gen = a_star_search(graph, heuristics, start_node, goal_node, bidirectional=True)
+    print(f"No. of nodes generated for bidirectional UCS: {bi_ucs_nodes_gen}")
+    print(f"No. of nodes generated for bidirectional A*: {bi_a_star_nodes_gen}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,155 @@
+import heapq
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+# Graph used by the worker processes. It is set in the parent before the pool
+# starts, so with the fork start method the workers inherit the CSR arrays
+# copy-on-write instead of receiving a pickled copy with every task.
+_GRAPH = None
+
+
+def _set_graph(graph):
+    global _GRAPH
+    _GRAPH = graph
+
+
+def _one_to_many(task):
+    """Dijkstra from one source until every requested target is settled."""
+    source, targets, return_paths = task
+    graph = _GRAPH
+    offsets, adjacency, weights = graph.offsets, graph.targets, graph.weights
+    dist = {source: 0}
+    parent = {source: None}
+    closed = set()
+    remaining = set(targets)
+    heap = [(0, source)]
+    while heap and remaining:
+        cost, node = heapq.heappop(heap)
+        if node in closed:
+            continue
+        closed.add(node)
+        remaining.discard(node)
+        start, end = offsets[node], offsets[node + 1]
+        for neighbor, weight in zip(adjacency[start:end].tolist(), weights[start:end].tolist()):
+            new_cost = cost + weight
+            if new_cost < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_cost
+                parent[neighbor] = node
+                heapq.heappush(heap, (new_cost, neighbor))
+
+    costs = [dist[t] if t in closed else float('inf') for t in targets]
+    paths = None
+    if return_paths:
+        paths = []
+        for t in targets:
+            path = []
+            node = t if t in closed else None
+            while node is not None:
+                path.append(node)
+                node = parent[node]
+            paths.append(path[::-1])
+    return source, targets, costs, paths
+
+
+def batch_shortest_paths(graph, queries, workers=None, return_paths=False):
+    """
+    Answer many (start, goal) queries at once.
+
+    Queries are grouped by start so a single Dijkstra tree serves every goal
+    of that start, and the groups are spread over a process pool. graph may be
+    a dict graph or a CSRGraph.
+
+    Returns (sources, targets, costs, paths): costs is a len(sources) x
+    len(targets) float array (inf where unreachable, not asked for or a
+    node is not in the graph), and paths maps (start, goal) to the node
+    path ([] if there is none) when return_paths is set.
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_dict(graph)
+    groups = {}
+    for start, goal in queries:
+        groups.setdefault(start, {})[goal] = None
+    sources = list(groups)
+    targets = list(dict.fromkeys(goal for goals in groups.values() for goal in goals))
+    row = {label: i for i, label in enumerate(sources)}
+    col = {label: i for i, label in enumerate(targets)}
+    # labels missing from the graph are never searched, and keep their inf costs and empty paths
+    known = {}
+    for label in sources + targets:
+        if label not in known:
+            try:
+                known[label] = graph.node_id(label)
+            except KeyError:
+                known[label] = None
+    tasks = []
+    for start, goals in groups.items():
+        goal_ids = tuple(known[goal] for goal in goals if known[goal] is not None)
+        if known[start] is not None and goal_ids:
+            tasks.append((known[start], goal_ids, return_paths))
+
+    workers = workers or os.cpu_count() or 1
+    _set_graph(graph)
+    if workers == 1:
+        results = map(_one_to_many, tasks)
+        pool = None
+    else:
+        if "fork" in multiprocessing.get_all_start_methods():
+            pool = multiprocessing.get_context("fork").Pool(workers)
+        else:
+            # no fork: ship the graph once per worker through the initializer
+            pool = multiprocessing.Pool(workers, initializer=_set_graph, initargs=(graph,))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        results = pool.imap_unordered(_one_to_many, tasks, chunksize)
+
+    costs = np.full((len(sources), len(targets)), np.inf)
+    paths = {(start, goal): [] for start, goals in groups.items() for goal in goals} if return_paths else None
+    try:
+        for source, goal_ids, goal_costs, goal_paths in results:
+            start = graph.label(source)
+            for i, (goal, cost) in enumerate(zip(goal_ids, goal_costs)):
+                goal = graph.label(goal)
+                costs[row[start], col[goal]] = cost
+                if return_paths:
+                    paths[(start, goal)] = [graph.label(node) for node in goal_paths[i]]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _set_graph(None)
+    return sources, targets, costs, paths
+
+
+def main():
+    from bidirectional_search import random_geometric_graph
+
+    num_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    num_sources = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    goals_per_source = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    graph, _ = random_geometric_graph(num_nodes, 1.6 / num_nodes ** 0.5, 19)
+    csr = CSRGraph.from_dict(graph)
+    rng = random.Random(23)
+    queries = [(s, rng.randrange(num_nodes))
+               for s in rng.sample(range(num_nodes), num_sources) for _ in range(goals_per_source)]
+
+    print(f"{len(queries)} queries from {num_sources} sources on {num_nodes} nodes "
+          f"({os.cpu_count()} CPUs available)")
+    reference = None
+    for workers in (1, 2, 4, 8):
+        start_time = time.perf_counter()
+        _, _, costs, _ = batch_shortest_paths(csr, queries, workers=workers)
+        elapsed = time.perf_counter() - start_time
+        if reference is None:
+            reference = costs
+        assert np.array_equal(costs, reference)
+        print(f"workers={workers}  {elapsed:6.2f}s  {len(queries) / elapsed:8.1f} queries/s")
+
+
+if __name__ == "__main__":
+    main()
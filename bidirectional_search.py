@@ -0,0 +1,160 @@
+import heapq
+import math
+import random
+import sys
+from itertools import count
+
+from search_core import graph_search, reconstruct_path
+
+# id(graph) -> (graph, reversed graph), most recently used last. Plain dict graphs cannot be weakly
+# referenced, so only the last few are kept alive; the stored graph also keeps its id from being reused.
+_reverse_cache = {}
+_REVERSE_CACHE_SIZE = 4
+
+
+def reverse_graph(graph):
+    """
+    Return the graph with every edge reversed. The reverses of the last few
+    graph objects are cached, so clear_reverse_cache after mutating a graph
+    in place.
+    """
+    cached = _reverse_cache.pop(id(graph), None)
+    if cached is not None and cached[0] is graph:
+        _reverse_cache[id(graph)] = cached
+        return cached[1]
+    reverse = {node: [] for node in graph}
+    for node, neighbors in graph.items():
+        for neighbor, weight in neighbors:
+            reverse.setdefault(neighbor, []).append((node, weight))
+    _reverse_cache[id(graph)] = (graph, reverse)
+    while len(_reverse_cache) > _REVERSE_CACHE_SIZE:
+        del _reverse_cache[next(iter(_reverse_cache))]
+    return reverse
+
+
+def clear_reverse_cache():
+    _reverse_cache.clear()
+
+
+def average_potential(heuristics, start, start_heuristics=None):
+    """
+    Consistent-averaging potential p(v) = (h_goal(v) - h_start(v)) / 2 for
+    bidirectional A*. Without start_heuristics, h_start(v) = h(start) - h(v),
+    which is admissible and consistent whenever heuristics is.
+    """
+    if start_heuristics is None:
+        h_start = heuristics[start]
+        return lambda node: (heuristics[node] - (h_start - heuristics[node])) / 2
+    return lambda node: (heuristics[node] - start_heuristics[node]) / 2
+
+
+def bidirectional_search(graph, start, goal, potential=None):
+    """
+    Bidirectional Dijkstra, or bidirectional A* when a consistent potential
+    is given: the forward search orders by g + p(v), the backward search (on
+    the cached reverse graph) by g - p(v), and both stop once the two queue
+    minima add up to at least the best meeting cost found so far.
+
+    Returns (path, cost, stats) like search_core.graph_search, with stats
+    counting "generated", "expanded" and "popped" over both directions.
+    """
+    if start == goal:
+        return [start], 0, {"generated": 1, "expanded": 0, "popped": 0}
+    p = potential or (lambda node: 0)
+    stats = {"generated": 2, "expanded": 0, "popped": 0}
+    tie = count()
+    # per direction: adjacency, sign of the potential, distances, parents, closed set, heap
+    sides = [
+        (graph, 1, {start: 0}, {start: None}, set(), [(p(start), next(tie), start)]),
+        (reverse_graph(graph), -1, {goal: 0}, {goal: None}, set(), [(-p(goal), next(tie), goal)]),
+    ]
+    best_cost, meeting = float('inf'), None
+
+    def top_key(side):
+        _, sign, dist, _, closed, heap = side
+        while heap and (heap[0][2] in closed or heap[0][0] != dist[heap[0][2]] + sign * p(heap[0][2])):
+            heapq.heappop(heap)
+            stats["popped"] += 1
+        return heap[0][0] if heap else float('inf')
+
+    while True:
+        forward_top, backward_top = top_key(sides[0]), top_key(sides[1])
+        if forward_top + backward_top >= best_cost or math.isinf(min(forward_top, backward_top)):
+            break
+        direction = 0 if len(sides[0][5]) <= len(sides[1][5]) else 1
+        adjacency, sign, dist, parent, closed, heap = sides[direction]
+        other_dist = sides[1 - direction][2]
+
+        _, _, node = heapq.heappop(heap)
+        stats["popped"] += 1
+        stats["expanded"] += 1
+        closed.add(node)
+        for neighbor, weight in adjacency.get(node, []):
+            new_cost = dist[node] + weight
+            if new_cost < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_cost
+                parent[neighbor] = node
+                stats["generated"] += 1
+                heapq.heappush(heap, (new_cost + sign * p(neighbor), next(tie), neighbor))
+                if neighbor in other_dist and new_cost + other_dist[neighbor] < best_cost:
+                    best_cost, meeting = new_cost + other_dist[neighbor], neighbor
+
+    if meeting is None:
+        return [], float('inf'), stats
+    path = reconstruct_path(sides[0][3], meeting)
+    node = sides[1][3][meeting]
+    while node is not None:
+        path.append(node)
+        node = sides[1][3][node]
+    return path, best_cost, stats
+
+
+def random_geometric_graph(num_nodes, radius, seed):
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(num_nodes)]
+    cells = {}
+    for node, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(node)
+    graph = {node: [] for node in range(num_nodes)}
+    for node, (x, y) in enumerate(points):
+        cx, cy = int(x / radius), int(y / radius)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in cells.get((cx + dx, cy + dy), []):
+                    d = math.dist(points[node], points[other])
+                    if other != node and d <= radius:
+                        graph[node].append((other, d))
+    return graph, points
+
+
+def main():
+    num_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    graph, points = random_geometric_graph(num_nodes, 1.6 / math.sqrt(num_nodes), 7)
+    rng = random.Random(3)
+    totals = {"UCS": 0, "bidirectional UCS": 0, "A*": 0, "bidirectional A*": 0, "bidirectional A* h_s": 0}
+    for _ in range(queries):
+        start, goal = rng.randrange(num_nodes), rng.randrange(num_nodes)
+        heuristics = {node: math.dist(points[node], points[goal]) for node in graph}
+        start_heuristics = {node: math.dist(points[node], points[start]) for node in graph}
+        is_goal = lambda node: node == goal
+        successors = lambda node: graph[node]
+        results = {
+            "UCS": graph_search(start, is_goal, successors),
+            "bidirectional UCS": bidirectional_search(graph, start, goal),
+            "A*": graph_search(start, is_goal, successors, heuristic=heuristics.get),
+            "bidirectional A*": bidirectional_search(graph, start, goal, average_potential(heuristics, start)),
+            "bidirectional A* h_s": bidirectional_search(graph, start, goal,
+                                                         average_potential(heuristics, start, start_heuristics)),
+        }
+        costs = {round(cost, 9) for _, cost, _ in results.values()}
+        assert len(costs) == 1, costs
+        for name, (_, _, stats) in results.items():
+            totals[name] += stats["expanded"]
+    print(f"{queries} random queries on a geometric graph with {num_nodes} nodes")
+    for name, expanded in totals.items():
+        print(f"{name:<21} mean nodes expanded: {expanded / queries:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+import random
+import sys
+import time
+
+from priority_queues import IndexedDaryHeap
+
+# Literals are encoded as 2 * var for var and 2 * var + 1 for -var, so
+# lit ^ 1 is the negation and lit >> 1 the variable.
+TRUE, FALSE, UNASSIGNED = 1, -1, 0
+
+
+def encode(literal):
+    return 2 * literal if literal > 0 else -2 * literal + 1
+
+
+def decode(lit):
+    return -(lit >> 1) if lit & 1 else lit >> 1
+
+
+def luby(i):
+    """i-th element (from 0) of the Luby restart sequence 1 1 2 1 1 2 4 ..."""
+    size, exponent = 1, 0
+    while size < i + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        exponent -= 1
+        i %= size
+    return 1 << exponent
+
+
+class CDCLSolver:
+    """
+    Iterative conflict-driven clause learning SAT solver over DIMACS-style
+    clauses (lists of non-zero ints, -v meaning "not v").
+
+    Unit propagation uses two watched literals per clause, so only clauses
+    watching a literal that just became false are visited. Conflicts are
+    analysed to the first unique implication point; the learned clause is
+    minimised, the search backjumps to the second highest level in it, and
+    learned clauses with high LBD (number of distinct decision levels) are
+    periodically deleted. Branching follows EVSIDS activity with phase
+    saving, and restarts follow the Luby sequence.
+    """
+
+    def __init__(self, restart_base=100, var_decay=0.95):
+        self.restart_base = restart_base
+        self.var_decay = var_decay
+        self.num_vars = 0
+        self.clauses = []  # problem clauses, as lists of encoded literals
+        self.learnts = []  # learned clauses; a deleted one is emptied in place
+        self.lbd = {}  # id(learned clause) -> number of distinct decision levels in it
+        self.watches = [[], []]  # watches[lit]: clauses whose first two literals include lit
+        self.value = [UNASSIGNED, UNASSIGNED]  # per literal
+        self.level = [0]
+        self.reason = [None]  # implying clause per variable, None for decisions and level 0 units
+        self.activity = [0.0]
+        self.polarity = [1]  # saved phase: the literal bit to decide on (1 = negative first)
+        self.seen = [False]
+        self.order = IndexedDaryHeap()
+        self.var_inc = 1.0
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.ok = True  # False once the clauses are unsatisfiable at level 0
+        self.model = None
+        self.core = []
+        self.next_reduce = 2000  # conflict count of the next learned clause database reduction
+        self.stats = {"decisions": 0, "propagations": 0, "conflicts": 0, "restarts": 0, "learned": 0,
+                      "reductions": 0, "deleted": 0}
+
+    def _ensure_var(self, var):
+        while self.num_vars < var:
+            self.num_vars += 1
+            self.watches += [[], []]
+            self.value += [UNASSIGNED, UNASSIGNED]
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.polarity.append(1)
+            self.seen.append(False)
+            self.order.push(self.num_vars, -0.0)
+
+    def add_clause(self, clause):
+        """Add a clause of DIMACS literals. Returns False if the formula became unsatisfiable."""
+        self._ensure_var(max((abs(literal) for literal in clause), default=0))
+        if not self.ok:
+            return False
+        if self.trail_lim:
+            self._backtrack(0)
+        lits = set()
+        for literal in clause:
+            lit = encode(literal)
+            if lit ^ 1 in lits or self.value[lit] == TRUE:
+                return True  # tautology or already satisfied
+            if self.value[lit] != FALSE:
+                lits.add(lit)
+        lits = list(lits)
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            self._assign(lits[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self.clauses.append(lits)
+            self._watch(lits)
+        return self.ok
+
+    def _watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def _assign(self, lit, reason):
+        self.value[lit] = TRUE
+        self.value[lit ^ 1] = FALSE
+        var = lit >> 1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        """Propagate the trail from qhead; returns a conflicting clause or None."""
+        value, watches, trail, level, reason = self.value, self.watches, self.trail, self.level, self.reason
+        current = len(self.trail_lim)
+        qhead = start = self.qhead
+        conflict = None
+        while qhead < len(trail) and conflict is None:
+            false_lit = trail[qhead] ^ 1
+            qhead += 1
+            watch_list = watches[false_lit]
+            kept = 0
+            i = 0
+            size = len(watch_list)
+            while i < size:
+                clause = watch_list[i]
+                i += 1
+                if not clause:
+                    continue  # deleted learned clause: drop the watch
+                first = clause[0]
+                if first == false_lit:
+                    first = clause[0] = clause[1]
+                    clause[1] = false_lit
+                if value[first] == TRUE:
+                    watch_list[kept] = clause
+                    kept += 1
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if value[lit] != FALSE:
+                        clause[1] = lit
+                        clause[k] = false_lit
+                        watches[lit].append(clause)
+                        break
+                else:
+                    watch_list[kept] = clause
+                    kept += 1
+                    if value[first] == FALSE:
+                        conflict = clause
+                        watch_list[kept:kept + size - i] = watch_list[i:size]
+                        kept += size - i
+                        break
+                    value[first] = TRUE
+                    value[first ^ 1] = FALSE
+                    var = first >> 1
+                    level[var] = current
+                    reason[var] = clause
+                    trail.append(first)
+            del watch_list[kept:]
+        self.stats["propagations"] += qhead - start
+        self.qhead = len(trail) if conflict is not None else qhead
+        return conflict
+
+    def _bump(self, var):
+        activity = self.activity
+        activity[var] += self.var_inc
+        if activity[var] > 1e100:
+            for v in range(1, self.num_vars + 1):
+                activity[v] *= 1e-100
+            self.var_inc *= 1e-100
+            order = IndexedDaryHeap()
+            for v in self.order.pos:
+                order.push(v, -activity[v])
+            self.order = order
+        elif var in self.order:
+            self.order.push(var, -activity[var])
+
+    def _analyze(self, conflict):
+        """First-UIP learning: returns (learned clause, backjump level)."""
+        seen, level, reason, trail = self.seen, self.level, self.reason, self.trail
+        current = len(self.trail_lim)
+        learnt = [None]
+        pending = 0
+        lit = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            for other in (clause if lit is None else clause[1:]):
+                var = other >> 1
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    self._bump(var)
+                    if level[var] >= current:
+                        pending += 1
+                    else:
+                        learnt.append(other)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            clause = reason[lit >> 1]
+            seen[lit >> 1] = False
+            pending -= 1
+            if pending == 0:
+                break
+        learnt[0] = lit ^ 1
+
+        # drop literals implied by other literals of the clause (recursive minimisation)
+        levels = {level[other >> 1] for other in learnt[1:]}
+        cleared = [other >> 1 for other in learnt[1:]]
+        minimised = [learnt[0]]
+        for other in learnt[1:]:
+            if reason[other >> 1] is None or not self._redundant(other, levels, cleared):
+                minimised.append(other)
+        for var in cleared:
+            seen[var] = False
+
+        if len(minimised) == 1:
+            return minimised, 0
+        top = max(range(1, len(minimised)), key=lambda k: level[minimised[k] >> 1])
+        minimised[1], minimised[top] = minimised[top], minimised[1]
+        return minimised, level[minimised[1] >> 1]
+
+    def _redundant(self, lit, levels, cleared):
+        """True if lit's implication graph ancestors all lie in the learned clause (or level 0)."""
+        seen, level, reason = self.seen, self.level, self.reason
+        stack = [lit]
+        mark = len(cleared)
+        while stack:
+            for other in reason[stack.pop() >> 1][1:]:
+                var = other >> 1
+                if seen[var] or level[var] == 0:
+                    continue
+                if reason[var] is None or level[var] not in levels:
+                    for var in cleared[mark:]:
+                        seen[var] = False
+                    del cleared[mark:]
+                    return False
+                seen[var] = True
+                cleared.append(var)
+                stack.append(other)
+        return True
+
+    def _backtrack(self, target):
+        if len(self.trail_lim) <= target:
+            return
+        value, order, activity, polarity, reason = self.value, self.order, self.activity, self.polarity, self.reason
+        start = self.trail_lim[target]
+        for lit in self.trail[start:]:
+            var = lit >> 1
+            value[lit] = value[lit ^ 1] = UNASSIGNED
+            reason[var] = None
+            polarity[var] = lit & 1
+            if var not in order:
+                order.push(var, -activity[var])
+        del self.trail[start:]
+        del self.trail_lim[target:]
+        self.qhead = len(self.trail)
+
+    def _reduce(self):
+        """Delete the worse half of the learned clauses by LBD, keeping glue clauses (LBD <= 2) and reasons."""
+        reason, value, lbd = self.reason, self.value, self.lbd
+        keep, candidates = [], []
+        for clause in self.learnts:
+            locked = reason[clause[0] >> 1] is clause and value[clause[0]] == TRUE
+            (keep if locked or lbd[id(clause)] <= 2 else candidates).append(clause)
+        candidates.sort(key=lambda clause: lbd[id(clause)])
+        half = len(candidates) // 2
+        for clause in candidates[half:]:
+            del lbd[id(clause)]
+            del clause[:]
+        self.learnts = keep + candidates[:half]
+        self.stats["reductions"] += 1
+        self.stats["deleted"] += len(candidates) - half
+
+    def _decide(self):
+        order, value = self.order, self.value
+        while order:
+            _, var = order.pop()
+            if value[2 * var] == UNASSIGNED:
+                return 2 * var + self.polarity[var]
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Run the search with the given literals assumed true for this call
+        only. Returns True (model in self.model) or False; after False,
+        self.core is the subset of assumptions that is already inconsistent
+        with the clauses (empty if the clauses alone are unsatisfiable).
+
+        Learned clauses, variable activity and saved phases are kept between
+        calls, and add_clause may be called between them.
+        """
+        self.model = None
+        self.core = []
+        for literal in assumptions:
+            self._ensure_var(abs(literal))
+        if not self.ok:
+            return False
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+        assumed = [encode(literal) for literal in assumptions]
+        restarts = 0
+        budget = self.restart_base * luby(restarts)
+        stats = self.stats
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                stats["conflicts"] += 1
+                budget -= 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, target = self._analyze(conflict)
+                self._backtrack(target)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self.learnts.append(learnt)
+                    self.lbd[id(learnt)] = len({self.level[lit >> 1] for lit in learnt})
+                    self._watch(learnt)
+                    self._assign(learnt[0], learnt)
+                stats["learned"] += 1
+                self.var_inc /= self.var_decay
+                continue
+
+            if budget <= 0:
+                restarts += 1
+                stats["restarts"] += 1
+                budget = self.restart_base * luby(restarts)
+                self._backtrack(0)
+            if stats["conflicts"] >= self.next_reduce:
+                self._reduce()
+                self.next_reduce = stats["conflicts"] + 2000 + 300 * stats["reductions"]
+
+            # the first decision levels hold the assumptions, one per level
+            lit = None
+            while len(self.trail_lim) < len(assumed):
+                candidate = assumed[len(self.trail_lim)]
+                if self.value[candidate] == TRUE:
+                    self.trail_lim.append(len(self.trail))  # already implied: empty level
+                elif self.value[candidate] == FALSE:
+                    self.core = [decode(core_lit) for core_lit in self._final_conflict(candidate)]
+                    self._backtrack(0)
+                    return False
+                else:
+                    lit = candidate
+                    break
+            if lit is None:
+                lit = self._decide()
+                if lit is None:
+                    self.model = {var: self.value[2 * var] == TRUE for var in range(1, self.num_vars + 1)}
+                    self._backtrack(0)
+                    return True
+                stats["decisions"] += 1
+            self.trail_lim.append(len(self.trail))
+            self._assign(lit, None)
+
+    def _final_conflict(self, lit):
+        """Assumptions (as encoded literals) whose propagation made the assumption lit false."""
+        seen, level, reason = self.seen, self.level, self.reason
+        core = [lit]
+        if level[lit >> 1] == 0:
+            return core
+        seen[lit >> 1] = True
+        for implied in reversed(self.trail[self.trail_lim[0]:]):
+            var = implied >> 1
+            if not seen[var]:
+                continue
+            if reason[var] is None:
+                core.append(implied)  # a decision at these levels is an assumption
+            else:
+                for other in reason[var][1:]:
+                    if level[other >> 1] > 0:
+                        seen[other >> 1] = True
+            seen[var] = False
+        return core
+
+
+def random_ksat(num_vars, num_clauses, k=3, seed=0, planted=False):
+    """Uniform random k-SAT; with planted=True every clause agrees with one hidden assignment."""
+    rng = random.Random(seed)
+    hidden = [rng.random() < 0.5 for _ in range(num_vars + 1)]
+    clauses = []
+    while len(clauses) < num_clauses:
+        clause = [v if rng.random() < 0.5 else -v for v in rng.sample(range(1, num_vars + 1), k)]
+        if not planted or any((lit > 0) == hidden[abs(lit)] for lit in clause):
+            clauses.append(clause)
+    return clauses
+
+
+def incremental_benchmark(num_vars=200, ratio=3.7, num_queries=100, seed=0):
+    """
+    A sequence of related queries: one base formula, 3 assumed literals per
+    query and a new permanent clause every 10 queries. One incremental
+    solver against dpll() on the whole formula each time.
+    """
+    from dpLL import dpll
+
+    rng = random.Random(seed)
+    base = random_ksat(num_vars, round(ratio * num_vars), seed=seed)
+    queries = []
+    for i in range(num_queries):
+        added = random_ksat(num_vars, 1, seed=rng.randrange(10**9)) if i % 10 == 9 else []
+        assumptions = [v if rng.random() < 0.5 else -v for v in rng.sample(range(1, num_vars + 1), 3)]
+        queries.append((added, assumptions))
+
+    solver = CDCLSolver()
+    for clause in base:
+        solver.add_clause(clause)
+    start_time = time.perf_counter()
+    incremental = []
+    for added, assumptions in queries:
+        for clause in added:
+            solver.add_clause(clause)
+        incremental.append(solver.solve(assumptions))
+        if not incremental[-1]:
+            assert set(solver.core) <= set(assumptions)
+    incremental_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    clauses = list(base)
+    for (added, assumptions), expected in zip(queries, incremental):
+        clauses += added
+        result = dpll(clauses, {abs(v): v > 0 for v in assumptions})
+        assert (result is not None) == expected
+    scratch_time = time.perf_counter() - start_time
+    print(f"{num_queries} queries on n={num_vars}, m={len(base)} ({sum(incremental)} SAT): "
+          f"incremental {incremental_time:.2f}s, dpll() from scratch {scratch_time:.2f}s "
+          f"({scratch_time / incremental_time:.1f}x), {len(solver.learnts)} learned clauses kept")
+
+
+def main():
+    sys.setrecursionlimit(10000)
+    if sys.argv[1:2] == ["incremental"]:
+        for num_vars in [int(arg) for arg in sys.argv[2:]] or [100, 200]:
+            for ratio in (3.7, 4.0):
+                incremental_benchmark(num_vars, ratio)
+        return
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50, 100, 150, 200, 250]
+    for num_vars in sizes:
+        num_clauses = round(4.26 * num_vars)  # the uf/uuf threshold ratio
+        for seed in range(3):
+            clauses = random_ksat(num_vars, num_clauses, seed=seed)
+            solver = CDCLSolver()
+            for clause in clauses:
+                solver.add_clause(clause)
+            start_time = time.perf_counter()
+            sat = solver.solve()
+            elapsed = time.perf_counter() - start_time
+            if sat:
+                assert all(any(solver.model[abs(lit)] == (lit > 0) for lit in clause) for clause in clauses)
+            print(f"n={num_vars:<4} m={num_clauses:<5} seed={seed}  {'SAT' if sat else 'UNSAT':<5}  "
+                  f"{elapsed:7.2f}s  conflicts={solver.stats['conflicts']}  decisions={solver.stats['decisions']}")
+        clauses = random_ksat(num_vars, num_clauses, seed=0)
+        if num_vars <= 100:
+            from dpLL import _dpll_recursive
+            start_time = time.perf_counter()
+            _dpll_recursive(clauses, {})
+            print(f"           previous recursive dpll (seed=0): {time.perf_counter() - start_time:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import heapq
+import random
+import sys
+import time
+
+import numpy as np
+
+from csr_graph import label_array, labels_from_array
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over a {node: [(neighbor, weight), ...]} graph.
+
+    build() contracts nodes one at a time in edge-difference order, adding a
+    shortcut u->w (remembering the middle node) whenever the path u->v->w is
+    the only shortest one. Afterwards each node keeps only edges to higher
+    ranked nodes, and query() runs a bidirectional Dijkstra that only goes
+    upward, then unpacks the shortcuts back into the original node path.
+    """
+
+    def __init__(self, labels, up_forward, up_backward, middle):
+        self.labels = labels
+        self.ids = {label: i for i, label in enumerate(labels)}
+        self.up_forward = up_forward  # up_forward[u] = {w: cost} with rank[w] > rank[u]
+        self.up_backward = up_backward  # up_backward[w] = {u: cost} for edges u->w with rank[u] > rank[w]
+        self.middle = middle  # (u, w) -> contracted node bypassed by shortcut u->w
+
+    @classmethod
+    def build(cls, graph, witness_limit=200):
+        """Preprocess graph. witness_limit caps the settled nodes per witness search."""
+        labels = list(graph)
+        ids = {label: i for i, label in enumerate(labels)}
+        for neighbors in graph.values():
+            for neighbor, _ in neighbors:
+                if neighbor not in ids:
+                    ids[neighbor] = len(labels)
+                    labels.append(neighbor)
+        n = len(labels)
+        out = [{} for _ in range(n)]
+        inn = [{} for _ in range(n)]
+        for label, neighbors in graph.items():
+            u = ids[label]
+            for neighbor, weight in neighbors:
+                v = ids[neighbor]
+                if u != v and weight < out[u].get(v, float('inf')):
+                    out[u][v] = weight
+                    inn[v][u] = weight
+
+        middle = {}
+        deleted_neighbors = [0] * n
+        up_forward = [None] * n
+        up_backward = [None] * n
+
+        def shortcuts_for(v):
+            """Shortcuts needed if v were contracted now: list of (u, w, cost)."""
+            needed = []
+            for u, cost_in in inn[v].items():
+                targets = {w: cost_in + cost_out for w, cost_out in out[v].items() if w != u}
+                if not targets:
+                    continue
+                witness = _witness_search(out, u, v, targets, max(targets.values()), witness_limit)
+                for w, cost in targets.items():
+                    if witness.get(w, float('inf')) > cost:
+                        needed.append((u, w, cost))
+            return needed
+
+        def priority(v):
+            return len(shortcuts_for(v)) - len(inn[v]) - len(out[v]) + deleted_neighbors[v]
+
+        heap = [(priority(v), v) for v in range(n)]
+        heapq.heapify(heap)
+        while heap:
+            _, v = heapq.heappop(heap)
+            # lazy update: re-evaluate and put back if v is no longer the cheapest
+            current = priority(v)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+
+            for u, w, cost in shortcuts_for(v):
+                if cost < out[u].get(w, float('inf')):
+                    out[u][w] = cost
+                    inn[w][u] = cost
+                    middle[(u, w)] = v
+            up_forward[v] = out[v]
+            up_backward[v] = inn[v]
+            for w in out[v]:
+                del inn[w][v]
+                deleted_neighbors[w] += 1
+            for u in inn[v]:
+                del out[u][v]
+                deleted_neighbors[u] += 1
+        return cls(labels, up_forward, up_backward, middle)
+
+    @property
+    def num_shortcuts(self):
+        return len(self.middle)
+
+    def query(self, start, goal):
+        """Return (cost, path) like ucs_dynamic.uniform_cost_search, or (inf, []) if unreachable."""
+        if start not in self.ids or goal not in self.ids:
+            return float('inf'), []
+        s, t = self.ids[start], self.ids[goal]
+        dist = ({s: 0}, {t: 0})
+        parent = ({s: None}, {t: None})
+        heaps = ([(0, s)], [(0, t)])
+        adjacency = (self.up_forward, self.up_backward)
+        best_cost, meeting = (0, s) if s == t else (float('inf'), None)
+
+        side = 0
+        while heaps[0] or heaps[1]:
+            if not heaps[side] or heaps[side][0][0] >= best_cost:
+                heaps[side].clear()  # this direction cannot improve the answer any more
+                side = 1 - side
+                continue
+            cost, node = heapq.heappop(heaps[side])
+            if cost > dist[side][node]:
+                side = 1 - side
+                continue
+            if node in dist[1 - side] and cost + dist[1 - side][node] < best_cost:
+                best_cost, meeting = cost + dist[1 - side][node], node
+            for neighbor, weight in adjacency[side][node].items():
+                new_cost = cost + weight
+                if new_cost < dist[side].get(neighbor, float('inf')):
+                    dist[side][neighbor] = new_cost
+                    parent[side][neighbor] = node
+                    heapq.heappush(heaps[side], (new_cost, neighbor))
+            side = 1 - side
+
+        if meeting is None:
+            return float('inf'), []
+        chain = []
+        node = meeting
+        while node is not None:
+            chain.append(node)
+            node = parent[0][node]
+        chain.reverse()
+        node = parent[1][meeting]
+        while node is not None:
+            chain.append(node)
+            node = parent[1][node]
+
+        path = [chain[0]]
+        for u, w in zip(chain, chain[1:]):
+            path.extend(self._unpack(u, w))
+        return best_cost, [self.labels[node] for node in path]
+
+    def _unpack(self, u, w):
+        """Original nodes after u on the edge or shortcut u->w."""
+        nodes = []
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            m = self.middle.get((a, b))
+            if m is None:
+                nodes.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+        return nodes
+
+    def save(self, path):
+        """Write the hierarchy to an .npz file: up-graphs in CSR form, shortcuts as (u, w) -> middle arrays."""
+        pairs = np.array(list(self.middle), dtype=np.int64).reshape(-1, 2)
+        np.savez(path, labels=label_array(self.labels),
+                 **_adjacency_arrays("forward", self.up_forward), **_adjacency_arrays("backward", self.up_backward),
+                 middle_pairs=pairs, middle_nodes=np.array(list(self.middle.values()), dtype=np.int64))
+
+    @classmethod
+    def load(cls, path, allow_pickle=False):
+        """Load a hierarchy written by save(); allow_pickle as in CSRGraph.load."""
+        data = np.load(path, allow_pickle=allow_pickle)
+        middle = dict(zip(map(tuple, data["middle_pairs"].tolist()), data["middle_nodes"].tolist()))
+        return cls(labels_from_array(data["labels"]), _adjacency_from(data, "forward"),
+                   _adjacency_from(data, "backward"), middle)
+
+
+def _adjacency_arrays(name, adjacency):
+    """A list of {neighbor: cost} dicts as CSR offsets, targets and weights."""
+    offsets = np.zeros(len(adjacency) + 1, dtype=np.int64)
+    np.cumsum([len(edges) for edges in adjacency], out=offsets[1:])
+    targets = np.array([w for edges in adjacency for w in edges], dtype=np.int64)
+    weights = np.array([cost for edges in adjacency for cost in edges.values()])
+    return {f"{name}_offsets": offsets, f"{name}_targets": targets, f"{name}_weights": weights}
+
+
+def _adjacency_from(data, name):
+    offsets = data[f"{name}_offsets"].tolist()
+    targets, weights = data[f"{name}_targets"].tolist(), data[f"{name}_weights"].tolist()
+    return [dict(zip(targets[a:b], weights[a:b])) for a, b in zip(offsets, offsets[1:])]
+
+
+def _witness_search(out, source, skip, targets, max_cost, limit):
+    """Dijkstra from source avoiding skip, bounded by max_cost and a settle limit."""
+    dist = {source: 0}
+    heap = [(0, source)]
+    remaining = len(targets)
+    settled = 0
+    while heap and settled < limit:
+        cost, node = heapq.heappop(heap)
+        if cost > dist[node]:
+            continue
+        if cost > max_cost:
+            break
+        settled += 1
+        if node in targets:
+            remaining -= 1
+            if remaining == 0:
+                break
+        for neighbor, weight in out[node].items():
+            if neighbor == skip:
+                continue
+            new_cost = cost + weight
+            if new_cost < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_cost
+                heapq.heappush(heap, (new_cost, neighbor))
+    return dist
+
+
+def main():
+    from bidirectional_search import random_geometric_graph
+    from ucs_dynamic import uniform_cost_search
+
+    num_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    graph, _ = random_geometric_graph(num_nodes, 1.6 / num_nodes ** 0.5, 11)
+    num_edges = sum(len(neighbors) for neighbors in graph.values())
+
+    start_time = time.perf_counter()
+    ch = ContractionHierarchy.build(graph)
+    build_time = time.perf_counter() - start_time
+    ch.save("/tmp/contraction_hierarchy.npz")
+    ch = ContractionHierarchy.load("/tmp/contraction_hierarchy.npz")
+    print(f"{num_nodes} nodes, {num_edges} edges: preprocessing {build_time:.1f}s, "
+          f"{ch.num_shortcuts} shortcuts")
+
+    rng = random.Random(5)
+    pairs = [(rng.randrange(num_nodes), rng.randrange(num_nodes)) for _ in range(queries)]
+    timings = {}
+    for name, run in (("uniform_cost_search", lambda s, t: uniform_cost_search(graph, s, t)),
+                      ("ContractionHierarchy.query", ch.query)):
+        start_time = time.perf_counter()
+        timings[name] = [run(s, t) for s, t in pairs]
+        print(f"{name:<28} {(time.perf_counter() - start_time) / queries * 1000:8.3f} ms/query")
+    for (cost, path), (ch_cost, ch_path) in zip(*timings.values()):
+        assert cost == ch_cost or abs(cost - ch_cost) < 1e-9, (cost, ch_cost)
+        if ch_path:
+            assert abs(sum(dict(graph[a])[b] for a, b in zip(ch_path, ch_path[1:])) - cost) < 1e-9
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Compressed-sparse-row adjacency for weighted directed graphs.
+
+    Node labels are interned to ids 0..n-1. The out-edges of node i are
+    targets[offsets[i]:offsets[i+1]] with matching weights. The object also
+    behaves like the dict-of-lists format used by the search scripts
+    (graph[node], graph.get(node, []), iteration over nodes), so it can be
+    passed to a_star_search, uniform_cost_search, bfs and dfs unchanged.
+    """
+
+    def __init__(self, offsets, targets, weights, labels=None):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.weights = np.asarray(weights)
+        # labels=None means the labels are the ids themselves (0..n-1)
+        self.labels = labels
+        self.ids = None if labels is None else {label: i for i, label in enumerate(labels)}
+
+    @classmethod
+    def from_dict(cls, graph):
+        """Convert a {node: [(neighbor, weight), ...]} graph into CSR form."""
+        labels = list(graph)
+        ids = {label: i for i, label in enumerate(labels)}
+        for neighbors in graph.values():
+            for neighbor, _ in neighbors:
+                if neighbor not in ids:
+                    ids[neighbor] = len(labels)
+                    labels.append(neighbor)
+
+        offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+        for label, neighbors in graph.items():
+            offsets[ids[label] + 1] = len(neighbors)
+        np.cumsum(offsets, out=offsets)
+
+        num_edges = int(offsets[-1])
+        targets = np.empty(num_edges, dtype=np.int32)
+        weight_list = [0] * num_edges
+        for label, neighbors in graph.items():
+            pos = int(offsets[ids[label]])
+            for neighbor, weight in neighbors:
+                targets[pos] = ids[neighbor]
+                weight_list[pos] = weight
+                pos += 1
+        weights = np.array(weight_list, dtype=_weight_dtype(weight_list))
+
+        if labels == list(range(len(labels))):
+            labels = None
+        return cls(offsets, targets, weights, labels)
+
+    @classmethod
+    def from_edges(cls, sources, targets, weights, num_nodes=None, labels=None):
+        """Build from parallel edge arrays of integer node ids (vectorized)."""
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int32)
+        weights = np.asarray(weights)
+        if num_nodes is None:
+            num_nodes = len(labels) if labels is not None else int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+        order = np.argsort(sources, kind="stable")
+        offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=offsets[1:])
+        return cls(offsets, targets[order], weights[order], labels)
+
+    @classmethod
+    def load(cls, path, allow_pickle=False):
+        """
+        Load a graph written by save(). Labels other than strings, numbers
+        or equal-length tuples of ints are pickled, and loading those needs
+        allow_pickle=True (only for files you trust).
+        """
+        data = np.load(path, allow_pickle=allow_pickle)
+        labels = labels_from_array(data["labels"]) if "labels" in data else None
+        return cls(data["offsets"], data["targets"], data["weights"], labels)
+
+    def save(self, path):
+        """Write the arrays (and label table, if any) to an .npz file."""
+        arrays = {"offsets": self.offsets, "targets": self.targets, "weights": self.weights}
+        if self.labels is not None:
+            arrays["labels"] = label_array(self.labels)
+        np.savez(path, **arrays)
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        """Bytes used by the offset/target/weight arrays."""
+        return self.offsets.nbytes + self.targets.nbytes + self.weights.nbytes
+
+    def node_id(self, label):
+        if self.ids is None:
+            if isinstance(label, (int, np.integer)) and 0 <= label < self.num_nodes:
+                return int(label)
+            raise KeyError(label)
+        return self.ids[label]
+
+    def label(self, node_id):
+        return node_id if self.labels is None else self.labels[node_id]
+
+    def neighbor_ids(self, node_id):
+        """Return (targets, weights) array views for the out-edges of node_id."""
+        start, end = self.offsets[node_id], self.offsets[node_id + 1]
+        return self.targets[start:end], self.weights[start:end]
+
+    def to_dict(self):
+        return {label: self[label] for label in self}
+
+    # dict-of-lists compatibility used by the existing search functions
+
+    def __getitem__(self, label):
+        node_id = self.node_id(label)
+        start, end = self.offsets[node_id], self.offsets[node_id + 1]
+        targets = self.targets[start:end].tolist()
+        weights = self.weights[start:end].tolist()
+        if self.labels is not None:
+            labels = self.labels
+            targets = [labels[t] for t in targets]
+        return list(zip(targets, weights))
+
+    def get(self, label, default=None):
+        try:
+            return self[label]
+        except KeyError:
+            return default
+
+    def __contains__(self, label):
+        try:
+            self.node_id(label)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(range(self.num_nodes) if self.labels is None else self.labels)
+
+    def __len__(self):
+        return self.num_nodes
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return ((label, self[label]) for label in self)
+
+    def __repr__(self):
+        return f"CSRGraph(nodes={self.num_nodes}, edges={self.num_edges})"
+
+
+def _weight_dtype(weights):
+    """Keep integer weights integral so path costs print the same as with dicts."""
+    if all(isinstance(w, (int, np.integer)) and not isinstance(w, bool) for w in weights):
+        if not weights or (min(weights) >= -2**31 and max(weights) < 2**31):
+            return np.int32
+        return np.int64
+    return np.float64
+
+
+def label_array(labels):
+    """
+    Node labels as a plain NumPy array when they are all strings, all ints,
+    all floats or all int tuples of one length (grid cells); otherwise an
+    object array, which np.load only reads back with allow_pickle=True.
+    """
+    labels = list(labels)
+    for kind, dtype in ((str, str), (int, np.int64), (float, np.float64)):
+        if all(type(label) is kind for label in labels):
+            return np.array(labels, dtype=dtype)
+    if labels and all(type(label) is tuple and len(label) == len(labels[0]) for label in labels):
+        if all(type(x) is int for label in labels for x in label):
+            return np.array(labels, dtype=np.int64)
+    return np.array(labels, dtype=object)
+
+
+def labels_from_array(array):
+    """The labels written by label_array, with 2-D rows turned back into tuples."""
+    if array.ndim == 2:
+        return [tuple(row) for row in array.tolist()]
+    return array.tolist()
+
+
+def random_edge_arrays(num_nodes, num_edges, seed=0):
+    """Random directed graph with integer weights 1..100, as edge arrays."""
+    rng = np.random.default_rng(seed)
+    sources = rng.integers(0, num_nodes, num_edges)
+    targets = rng.integers(0, num_nodes, num_edges)
+    weights = rng.integers(1, 101, num_edges).astype(np.int32)
+    return sources, targets, weights
+
+
+def _rss_bytes():
+    """Current resident set size (Linux); falls back to the tracemalloc counter elsewhere."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return tracemalloc.get_traced_memory()[0]
+
+
+def benchmark(num_edges, queries=5):
+    """Compare memory and UCS throughput of the dict format and CSRGraph."""
+    from a_star_dynamic import uniform_cost_search
+
+    num_nodes = max(num_edges // 4, 2)
+    sources, targets, weights = random_edge_arrays(num_nodes, num_edges)
+
+    rss_before = _rss_bytes()
+    dict_graph = {node: [] for node in range(num_nodes)}
+    for s, t, w in zip(sources.tolist(), targets.tolist(), weights.tolist()):
+        dict_graph[s].append((t, w))
+    dict_bytes = _rss_bytes() - rss_before
+
+    start_time = time.perf_counter()
+    csr = CSRGraph.from_edges(sources, targets, weights, num_nodes)
+    build_time = time.perf_counter() - start_time
+
+    rng = random.Random(1)
+    pairs = [(rng.randrange(num_nodes), rng.randrange(num_nodes)) for _ in range(queries)]
+    timings = {}
+    for name, graph in (("dict", dict_graph), ("csr", csr)):
+        expanded = 0
+        start_time = time.perf_counter()
+        for s, t in pairs:
+            expanded += uniform_cost_search(graph, s, t)[1]
+        timings[name] = expanded / (time.perf_counter() - start_time)
+
+    print(f"edges={num_edges:>9}  dict={dict_bytes / num_edges:6.1f} B/edge  "
+          f"csr={csr.nbytes / num_edges:5.1f} B/edge  csr build={build_time:.2f}s  "
+          f"UCS pops/s dict={timings['dict']:,.0f} csr={timings['csr']:,.0f}")
+    del dict_graph
+
+
+def main():
+    sizes = [int(float(arg)) for arg in sys.argv[1:]] or [10**5, 10**6]
+    for num_edges in sizes:
+        benchmark(num_edges)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+CHUNK_BYTES = 1 << 24
+_NON_CLAUSE_LINE = re.compile(rb"^[ \t]*[cp][^\n]*$", re.MULTILINE)  # comments and the "p cnf" header
+_END_MARKER = re.compile(rb"^[ \t]*%", re.MULTILINE)  # SATLIB files end with "%" and a stray "0"
+_HEADER = re.compile(rb"^[ \t]*p[ \t]+cnf[ \t]+(\d+)[ \t]+(\d+)", re.MULTILINE)
+
+
+def open_cnf(path, mode="rb"):
+    """Open a DIMACS file, transparently decompressing .gz, .xz/.lzma and .bz2."""
+    if path == "-":
+        return sys.stdin.buffer if "r" in mode else sys.stdout.buffer
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".gz":
+        return gzip.open(path, mode)
+    if suffix in (".xz", ".lzma"):
+        return lzma.open(path, mode)
+    if suffix == ".bz2":
+        return bz2.open(path, mode)
+    return open(path, mode)
+
+
+class ClauseArena:
+    """
+    CNF stored flat: literals is one int32 array holding every clause back to
+    back and clause i is literals[offsets[i]:offsets[i+1]].
+
+    Iterating yields each clause as a list of ints, so an arena can be passed
+    wherever dpll() and CDCLSolver expect a list of clauses.
+    """
+
+    def __init__(self, literals, offsets, num_vars=None):
+        self.literals = np.asarray(literals, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if num_vars is None:
+            num_vars = int(np.abs(self.literals).max()) if len(self.literals) else 0
+        self.num_vars = num_vars
+
+    @classmethod
+    def from_clauses(cls, clauses, num_vars=None):
+        lengths = [len(clause) for clause in clauses]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        literals = np.fromiter((literal for clause in clauses for literal in clause),
+                               dtype=np.int32, count=int(offsets[-1]))
+        return cls(literals, offsets, num_vars)
+
+    @property
+    def num_clauses(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        return self.literals.nbytes + self.offsets.nbytes
+
+    def clause(self, i):
+        return self.literals[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i):
+        return self.clause(i).tolist()
+
+    def __iter__(self):
+        literals = self.literals.tolist()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield literals[start:end]
+
+    def __len__(self):
+        return self.num_clauses
+
+    def __repr__(self):
+        return f"ClauseArena(vars={self.num_vars}, clauses={self.num_clauses})"
+
+
+def read_dimacs(path):
+    """
+    Stream a DIMACS CNF file into a ClauseArena. The file is read in 16 MB
+    chunks and each chunk is parsed by NumPy in one call, so no per-clause
+    Python objects are created. Returns the arena; num_vars comes from the
+    "p cnf" header when there is one.
+    """
+    literal_chunks = []
+    length_chunks = []
+    carry = np.empty(0, dtype=np.int32)  # literals of a clause split across chunks
+    num_vars = None
+    tail = b""  # incomplete last line of the previous chunk
+    with open_cnf(path) as f:
+        while True:
+            block = f.read(CHUNK_BYTES)
+            if block:
+                data = tail + block
+                cut = data.rfind(b"\n") + 1
+                data, tail = data[:cut], data[cut:]
+            else:
+                data, tail = tail, b""
+            # the regexes only run on chunks that can contain such lines (memchr is cheap)
+            end = _END_MARKER.search(data) if b"%" in data else None
+            if end:
+                data, block = data[:end.start()], b""
+            if b"c" in data or b"p" in data:
+                if num_vars is None:
+                    header = _HEADER.search(data)
+                    if header:
+                        num_vars = int(header.group(1))
+                data = _NON_CLAUSE_LINE.sub(b"", data)
+            tokens = np.fromstring(data, dtype=np.int32, sep=" ") if data.strip() else np.empty(0, np.int32)
+            ends = np.flatnonzero(tokens == 0)
+            if len(ends):
+                head = np.concatenate((carry, tokens[:ends[-1]]))
+                starts = np.concatenate(([-1], ends[:-1]))
+                lengths = ends - starts - 1
+                lengths[0] += len(carry)
+                literal_chunks.append(head[head != 0])
+                length_chunks.append(lengths)
+                carry = tokens[ends[-1] + 1:]
+            else:
+                carry = np.concatenate((carry, tokens))
+            if not block:
+                break
+    if len(carry):  # last clause without a terminating 0
+        literal_chunks.append(carry)
+        length_chunks.append(np.array([len(carry)]))
+
+    literals = np.concatenate(literal_chunks) if literal_chunks else np.empty(0, dtype=np.int32)
+    lengths = np.concatenate(length_chunks) if length_chunks else np.empty(0, dtype=np.int64)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return ClauseArena(literals, offsets, num_vars)
+
+
+def write_dimacs(path, clauses, num_vars=None, comments=()):
+    """Write clauses (a ClauseArena or a list of int lists) as DIMACS CNF, compressed by suffix."""
+    arena = clauses if isinstance(clauses, ClauseArena) else ClauseArena.from_clauses(clauses, num_vars)
+    num_vars = num_vars or arena.num_vars
+    # one terminating 0 after every clause
+    terminated = np.insert(arena.literals, arena.offsets[1:], 0)
+    with open_cnf(path, "wb") as f:
+        for comment in comments:
+            f.write(f"c {comment}\n".encode())
+        f.write(f"p cnf {num_vars} {arena.num_clauses}\n".encode())
+        step = CHUNK_BYTES // 8
+        for start in range(0, len(terminated), step):
+            tokens = terminated[start:start + step]
+            text = np.char.add(tokens.astype(str), np.where(tokens == 0, "\n", " "))
+            f.write("".join(text.tolist()).encode())
+
+
+def write_solution(out, model, per_line=10):
+    """
+    Write a result in SAT competition format: "s SATISFIABLE" plus "v" lines
+    ending in 0, or "s UNSATISFIABLE" if model is None. out is a path or a
+    text file object; model maps var -> bool.
+    """
+    if isinstance(out, str):
+        with open(out, "w") as f:
+            return write_solution(f, model, per_line)
+    if model is None:
+        out.write("s UNSATISFIABLE\n")
+        return
+    out.write("s SATISFIABLE\n")
+    literals = [var if model[var] else -var for var in sorted(model)] + [0]
+    for start in range(0, len(literals), per_line):
+        out.write("v " + " ".join(map(str, literals[start:start + per_line])) + "\n")
+
+
+def _read_dimacs_lists(path):
+    """Line-by-line reader into per-clause Python lists, kept as a benchmark reference."""
+    clauses = []
+    clause = []
+    with open_cnf(path) as f:
+        for line in f:
+            if line[:1] == b"%":
+                break
+            if line[:1] in (b"c", b"p"):
+                continue
+            for token in line.split():
+                literal = int(token)
+                if literal == 0:
+                    clauses.append(clause)
+                    clause = []
+                else:
+                    clause.append(literal)
+    if clause:
+        clauses.append(clause)
+    return clauses
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def benchmark(num_clauses):
+    from cdcl_solver import random_ksat
+
+    num_vars = max(3, round(num_clauses / 4.26))
+    path = f"/tmp/random{num_clauses}.cnf"
+    write_dimacs(path, random_ksat(num_vars, num_clauses, seed=1), num_vars, ["random 3-SAT"])
+    write_dimacs(path + ".gz", read_dimacs(path))
+    write_dimacs(path + ".xz", read_dimacs(path))
+    print(f"{num_clauses} clauses, {num_vars} vars, {os.path.getsize(path) / 2**20:.1f} MB as text")
+
+    for name, reader in (("per-clause lists", _read_dimacs_lists), ("ClauseArena", read_dimacs)):
+        before = _rss_mb()
+        start_time = time.perf_counter()
+        cnf = reader(path)
+        elapsed = time.perf_counter() - start_time
+        size = f", {cnf.nbytes / 2**20:.1f} MB arrays" if isinstance(cnf, ClauseArena) else ""
+        print(f"{name:<17} {elapsed:6.2f}s  +{_rss_mb() - before:6.1f} MB RSS{size}")
+        if name == "per-clause lists":
+            reference = cnf
+        else:
+            assert len(cnf) == len(reference) and all(a == b for a, b in zip(cnf, reference))
+        del cnf
+    for suffix in (".gz", ".xz"):
+        start_time = time.perf_counter()
+        arena = read_dimacs(path + suffix)
+        print(f"ClauseArena {suffix:<5} {time.perf_counter() - start_time:6.2f}s "
+              f"({os.path.getsize(path + suffix) / 2**20:.1f} MB compressed)")
+    start_time = time.perf_counter()
+    write_dimacs("/tmp/rewritten.cnf", arena, num_vars)
+    print(f"write_dimacs      {time.perf_counter() - start_time:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a DIMACS CNF file (.gz/.xz/.bz2 accepted) with CDCL.")
+    parser.add_argument("cnf", nargs="?", help="input file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="solution file (default: stdout)")
+    parser.add_argument("--benchmark", type=int, metavar="CLAUSES",
+                        help="compare parse time and memory against per-clause lists")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return 0
+    if not args.cnf:
+        parser.error("a CNF file is required")
+
+    from cdcl_solver import CDCLSolver
+
+    start_time = time.perf_counter()
+    arena = read_dimacs(args.cnf)
+    parsed = time.perf_counter()
+    solver = CDCLSolver()
+    for clause in arena:
+        if not solver.add_clause(clause):
+            break
+    sat = solver.solve()
+    print(f"c {arena.num_vars} vars, {arena.num_clauses} clauses; parsed in {parsed - start_time:.2f}s, "
+          f"solved in {time.perf_counter() - parsed:.2f}s; {solver.stats}", file=sys.stderr)
+    model = {var: solver.model.get(var, False) for var in range(1, arena.num_vars + 1)} if sat else None
+    if args.output == "-":
+        write_solution(sys.stdout, model)
+    else:
+        write_solution(args.output, model)
+    return 10 if sat else 20  # SAT competition exit codes
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import sys
+import time
+
+import numpy as np
+
+from grid_map import DIAGONAL_MOVES, SQRT2, STRAIGHT_MOVES, GridMap, warehouse_matrix
+
+
+def _moves_into(grid, cells):
+    """
+    Every move that ends in one of cells: (sources, targets, costs). A move
+    p -> q exists when p's mask has the bit, so one-way directions and the
+    corner-cutting rule baked into the masks are respected.
+    """
+    masks = grid.moves.reshape(-1)
+    size = len(masks)
+    sources, targets, costs = [], [], []
+    for bit, (dr, dc) in STRAIGHT_MOVES + (DIAGONAL_MOVES if grid.diagonal else ()):
+        candidates = cells - (dr * grid.cols + dc)
+        inside = (candidates >= 0) & (candidates < size)
+        candidates, reached = candidates[inside], cells[inside]
+        allowed = (masks[candidates] & bit) != 0  # off-grid wraparounds never have the bit
+        sources.append(candidates[allowed])
+        targets.append(reached[allowed])
+        costs.append(np.full(int(allowed.sum()), SQRT2 if dr and dc else 1.0))
+    return np.concatenate(sources), np.concatenate(targets), np.concatenate(costs)
+
+
+def _goal_cells(grid, goals):
+    goals = np.asarray(goals, dtype=np.int64).reshape(-1, 2)
+    return np.unique(goals[:, 0] * grid.cols + goals[:, 1])
+
+
+def bfs_field(grid, goals):
+    """
+    Steps from every cell to the nearest of goals on a 4-connected
+    unit-cost grid, by a BFS wavefront that expands a whole frontier per
+    NumPy pass. float32 rows x cols array; inf where no goal is reachable.
+    """
+    if grid.diagonal:
+        raise ValueError("bfs_field needs unit costs: use octile_field for 8-connected grids")
+    distances = np.full(grid.rows * grid.cols, np.inf, dtype=np.float32)
+    frontier = _goal_cells(grid, goals)
+    level = 0
+    while len(frontier):
+        distances[frontier] = level
+        sources, _, _ = _moves_into(grid, frontier)
+        frontier = np.unique(sources[distances[sources] == np.inf])
+        level += 1
+    return distances.reshape(grid.rows, grid.cols)
+
+
+def octile_field(grid, goals):
+    """
+    Cost from every cell to the nearest of goals with straight steps of 1
+    and diagonal steps of sqrt(2), by bucketed Dijkstra: bucket k holds
+    the cells whose tentative cost is in [k, k + 1). No step is cheaper
+    than 1, so a cell in bucket k cannot improve another cell in the same
+    bucket, and a whole bucket is settled and relaxed in one NumPy pass.
+    float32 rows x cols array; inf where no goal is reachable.
+    """
+    distances = np.full(grid.rows * grid.cols, np.inf)
+    settled = np.zeros(len(distances), dtype=bool)
+    seeds = _goal_cells(grid, goals)
+    distances[seeds] = 0.0
+    buckets = {0: [seeds]}
+    bucket = 0
+    while buckets:
+        while bucket not in buckets:
+            bucket += 1
+        cells = np.unique(np.concatenate(buckets.pop(bucket)))
+        # drop entries that have since moved to a lower bucket (and been settled there)
+        cells = cells[~settled[cells] & (np.floor(distances[cells]) == bucket)]
+        settled[cells] = True
+        sources, targets, costs = _moves_into(grid, cells)
+        keep = ~settled[sources]
+        sources, candidates = sources[keep], distances[targets[keep]] + costs[keep]
+        before = distances[sources]
+        np.minimum.at(distances, sources, candidates)
+        improved = np.unique(sources[distances[sources] < before])
+        for key, group in _split_by_bucket(improved, distances):
+            buckets.setdefault(key, []).append(group)
+    return distances.astype(np.float32).reshape(grid.rows, grid.cols)
+
+
+def _split_by_bucket(cells, distances):
+    keys = np.floor(distances[cells]).astype(np.int64)
+    order = np.argsort(keys, kind="stable")
+    keys, cells = keys[order], cells[order]
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    return zip(keys[np.r_[0, bounds]].tolist() if len(keys) else [], np.split(cells, bounds))
+
+
+def distance_field(grid, goals):
+    """bfs_field for 4-connected grids, octile_field for 8-connected ones."""
+    return octile_field(grid, goals) if grid.diagonal else bfs_field(grid, goals)
+
+
+def descend(grid, field, start):
+    """
+    A shortest path from start to a goal of field, found by stepping to the
+    neighbour with the least step cost + remaining cost until the field is
+    0: O(path length), no search. Returns (path, cost); ([], inf) if no
+    goal is reachable from start.
+    """
+    cols = grid.cols
+    masks = grid.moves.reshape(-1)
+    flat = field.reshape(-1)
+    moves = STRAIGHT_MOVES + (DIAGONAL_MOVES if grid.diagonal else ())
+    steps = [(bit, dr * cols + dc, SQRT2 if dr and dc else 1.0) for bit, (dr, dc) in moves]
+    cell = start[0] * cols + start[1]
+    if not np.isfinite(flat[cell]):
+        return [], float("inf")
+    path = [cell]
+    cost = 0.0
+    while flat[cell] > 0:
+        mask = masks[cell]
+        _, step, cell = min((step + flat[cell + offset], step, cell + offset)
+                            for bit, offset, step in steps if mask & bit)
+        cost += step
+        path.append(cell)
+    return [divmod(cell, cols) for cell in path], cost
+
+
+def main():
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    robots = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    matrix = warehouse_matrix(side, side)
+    rng = np.random.default_rng(2)
+    free_cells = np.argwhere(matrix == 0)
+    goals = [tuple(cell) for cell in free_cells[rng.choice(len(free_cells), 4)].tolist()]
+    starts = [tuple(cell) for cell in free_cells[rng.choice(len(free_cells), robots)].tolist()]
+    # 8-connected on the same floor, plus robo_path_actual-style blocked edges
+    cells = rng.integers(side, size=(side * side // 50, 2))
+    obstacles = {((int(r), int(c)), (int(r) + 1, int(c) + 1)) for r, c in cells if r + 1 < side and c + 1 < side}
+    grids = [("4-connected, BFS wavefront", GridMap.open(matrix)),
+             ("8-connected, bucketed Dijkstra", GridMap.from_blocked_edges(side, side, obstacles, True, matrix))]
+    for name, grid in grids:
+        start_time = time.perf_counter()
+        field = distance_field(grid, goals[:1])
+        field_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        paths = [descend(grid, field, start) for start in starts]
+        descend_time = time.perf_counter() - start_time
+        checked = starts[:10]
+        start_time = time.perf_counter()
+        costs = [grid.astar(start, goals[0])[1] for start in checked]
+        astar_time = (time.perf_counter() - start_time) / len(checked)
+        for (_, cost), expected in zip(paths, costs):
+            assert abs(cost - expected) < 1e-3, (cost, expected)
+        print(f"{side}x{side} {name}: field in {field_time:.2f}s, {robots} paths by descent in "
+              f"{descend_time:.2f}s; A* per robot {astar_time:.2f}s -> {robots} robots {astar_time * robots:.1f}s")
+        start_time = time.perf_counter()
+        field = distance_field(grid, goals)
+        print(f"  field to the nearest of {len(goals)} goals in {time.perf_counter() - start_time:.2f}s "
+              f"({np.isfinite(field).sum()} reachable cells)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import gc
+import os
+import sys
+import time
+
+import numpy as np
+
+# Row blocks used when filling a matrix from coordinates, so 10k+ city
+# instances never need an (n x n x 2) temporary.
+BLOCK_ROWS = 512
+
+
+class DistanceMatrix:
+    """
+    Dense TSP distance matrix on one contiguous (n x n) array, int32 for the
+    rounded TSPLIB metrics and float32 otherwise. The array may be a
+    np.memmap, so instances larger than memory can be stored on disk.
+
+    dm[(a, b)] works like the old {(city1, city2): distance} dict, and
+    route_distance/hill_climb use the array directly.
+    """
+
+    def __init__(self, array):
+        self.array = array
+
+    @classmethod
+    def from_pairs(cls, tokens, num_cities, dtype=None):
+        """
+        Parse "a,b,d" tokens (a string or list) as symmetric distances:
+        int32 if every distance is integral, float32 otherwise.
+        """
+        if isinstance(tokens, str):
+            tokens = tokens.split()
+        values = np.array([token.split(',') for token in tokens], dtype=np.float64).reshape(-1, 3)
+        if dtype is None:
+            dtype = _distance_dtype(values[:, 2])
+        elif np.issubdtype(dtype, np.integer) and _distance_dtype(values[:, 2]) != np.int32:
+            raise ValueError(f"Fractional distances do not fit {np.dtype(dtype)}")
+        array = np.zeros((num_cities, num_cities), dtype=dtype)
+        known = np.eye(num_cities, dtype=bool)
+        a, b = values[:, 0].astype(np.int64), values[:, 1].astype(np.int64)
+        array[a, b] = array[b, a] = values[:, 2]
+        known[a, b] = known[b, a] = True
+        if not known.all():
+            i, j = np.argwhere(~known)[0]
+            raise ValueError(f"No distance given between cities {i} and {j}")
+        return cls(array)
+
+    @classmethod
+    def from_coords(cls, coords, metric="EUC_2D", out=None):
+        """
+        Distances between (x, y) coordinates using a TSPLIB metric: EUC_2D,
+        CEIL_2D, ATT and GEO give int32, EXACT gives unrounded float32.
+        out may be a path; the matrix is then written to a memory-mapped .npy.
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        n = len(coords)
+        dtype = np.float32 if metric == "EXACT" else np.int32
+        if out is None:
+            array = np.empty((n, n), dtype=dtype)
+        else:
+            array = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=(n, n))
+
+        if metric == "GEO":
+            coords = _geo_radians(coords)
+        for start in range(0, n, BLOCK_ROWS):
+            block = coords[start:start + BLOCK_ROWS]
+            array[start:start + len(block)] = _metric_block(block, coords, metric)
+        if metric == "GEO":
+            np.fill_diagonal(array, 0)  # acos rounding leaves 1 on the diagonal
+        return cls(array)
+
+    @classmethod
+    def from_tsplib(cls, path, out=None):
+        """Load a TSPLIB .tsp file (NODE_COORD_SECTION or EXPLICIT EDGE_WEIGHT_SECTION)."""
+        header = {}
+        with open(path) as f:
+            section = None
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                key = line.split(':')[0].strip().upper()
+                if key in ("NODE_COORD_SECTION", "EDGE_WEIGHT_SECTION"):
+                    section = key
+                    break
+                if ':' in line:
+                    header[key] = line.split(':', 1)[1].strip()
+            if section is None:
+                raise ValueError(f"{path}: no NODE_COORD_SECTION or EDGE_WEIGHT_SECTION")
+            body = f.read()
+        # anything after the data section (DISPLAY_DATA_SECTION, EOF) is ignored
+        for end_marker in ("DISPLAY_DATA_SECTION", "EOF"):
+            if end_marker in body:
+                body = body[:body.index(end_marker)]
+
+        n = int(header["DIMENSION"])
+        weight_type = header.get("EDGE_WEIGHT_TYPE", "EXPLICIT").upper()
+        values = np.array(body.split(), dtype=np.float64)
+        if section == "NODE_COORD_SECTION":
+            coords = values.reshape(n, -1)[:, 1:3]
+            return cls.from_coords(coords, weight_type, out)
+        return cls(_explicit_matrix(values, n, header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX").upper(), out))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a matrix written by save(), memory-mapped read-only by default."""
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    def save(self, path):
+        np.save(path, self.array)
+
+    @property
+    def num_cities(self):
+        return len(self.array)
+
+    @property
+    def nbytes(self):
+        return self.array.nbytes
+
+    def route_distance(self, route, start_city):
+        """Length of start_city -> route... -> start_city in one vectorized gather."""
+        tour = np.array([start_city] + list(route) + [start_city])
+        total = self.array[tour[:-1], tour[1:]].sum(dtype=np.float64)
+        return int(total) if np.issubdtype(self.array.dtype, np.integer) else float(total)
+
+    def __getitem__(self, pair):
+        return self.array[pair].item()
+
+    def __len__(self):
+        return len(self.array)
+
+    def __repr__(self):
+        return f"DistanceMatrix(cities={self.num_cities}, dtype={self.array.dtype})"
+
+
+def _geo_radians(coords):
+    """TSPLIB GEO: DDD.MM degrees-minutes to radians (PI truncated as in the spec)."""
+    degrees = np.trunc(coords)
+    minutes = coords - degrees
+    return 3.141592 * (degrees + 5.0 * minutes / 3.0) / 180.0
+
+
+def _metric_block(block, coords, metric):
+    if metric == "GEO":
+        q1 = np.cos(block[:, None, 1] - coords[None, :, 1])
+        q2 = np.cos(block[:, None, 0] - coords[None, :, 0])
+        q3 = np.cos(block[:, None, 0] + coords[None, :, 0])
+        cosine = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+        return (6378.388 * np.arccos(cosine) + 1.0).astype(np.int64)
+    dx = block[:, None, 0] - coords[None, :, 0]
+    dy = block[:, None, 1] - coords[None, :, 1]
+    if metric == "ATT":
+        r = np.sqrt((dx * dx + dy * dy) / 10.0)
+        t = np.floor(r + 0.5)
+        return np.where(t < r, t + 1, t)
+    d = np.sqrt(dx * dx + dy * dy)
+    if metric == "EUC_2D":
+        return np.floor(d + 0.5)
+    if metric == "CEIL_2D":
+        return np.ceil(d)
+    if metric == "EXACT":
+        return d
+    raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE: {metric}")
+
+
+def _distance_dtype(values):
+    """int32 when every distance is integral, float32 otherwise."""
+    return np.int32 if np.array_equal(values, np.round(values)) else np.float32
+
+
+def _explicit_matrix(values, n, weight_format, out=None):
+    dtype = _distance_dtype(values)
+    if out is None:
+        array = np.zeros((n, n), dtype=dtype)
+    else:
+        array = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=(n, n))
+    if weight_format == "FULL_MATRIX":
+        array[:] = values[:n * n].reshape(n, n)
+        return array
+    if weight_format not in ("UPPER_ROW", "UPPER_DIAG_ROW", "LOWER_ROW", "LOWER_DIAG_ROW"):
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT: {weight_format}")
+    diagonal = weight_format.endswith("DIAG_ROW")
+    if weight_format.startswith("UPPER"):
+        rows, cols = np.triu_indices(n, 0 if diagonal else 1)
+    else:
+        rows, cols = np.tril_indices(n, 0 if diagonal else -1)
+    array[rows, cols] = values[:len(rows)]
+    array[cols, rows] = values[:len(rows)]
+    return array
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def main():
+    num_cities = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = np.random.default_rng(0)
+    path = f"/tmp/random{num_cities}.tsp"
+    with open(path, "w") as f:
+        f.write(f"NAME : random{num_cities}\nTYPE : TSP\nDIMENSION : {num_cities}\n"
+                "EDGE_WEIGHT_TYPE : EUC_2D\nNODE_COORD_SECTION\n")
+        for i, (x, y) in enumerate(rng.random((num_cities, 2)) * 100000, 1):
+            f.write(f"{i} {x:.2f} {y:.2f}\n")
+        f.write("EOF\n")
+
+    before = _rss_mb()
+    start_time = time.perf_counter()
+    dm = DistanceMatrix.from_tsplib(path)
+    print(f"{num_cities} cities EUC_2D: loaded in {time.perf_counter() - start_time:.2f}s, "
+          f"{dm.nbytes / 2**20:.0f} MB array (+{_rss_mb() - before:.0f} MB RSS)")
+    dm.save("/tmp/distance_matrix.npy")
+    del dm
+    gc.collect()
+
+    start_time = time.perf_counter()
+    mapped = DistanceMatrix.load("/tmp/distance_matrix.npy")
+    route = list(range(1, num_cities))
+    length = mapped.route_distance(route, 0)
+    print(f"memory-mapped reopen + one route_distance: {time.perf_counter() - start_time:.3f}s (length {length})")
+
+    start_time = time.perf_counter()
+    geo = DistanceMatrix.from_coords(rng.uniform(-80, 80, (num_cities, 2)), "GEO")
+    print(f"{num_cities} cities GEO: computed in {time.perf_counter() - start_time:.2f}s")
+    del geo
+
+    # The old tuple-keyed dict, measured on a sample and scaled by the pair count
+    sample = 1000
+    before = _rss_mb()
+    dist = {(i, j): int(i + j) for i in range(sample) for j in range(sample)}
+    per_pair = (_rss_mb() - before) * 2**20 / len(dist)
+    del dist
+    print(f"tuple-keyed dict: ~{per_pair:.0f} bytes/pair -> ~{per_pair * num_cities ** 2 / 2**30:.1f} GB "
+          f"for {num_cities} cities, vs {4 * num_cities ** 2 / 2**30:.2f} GB as int32")
+
+
+if __name__ == "__main__":
+    main()
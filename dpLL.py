@@ -1,4 +1,24 @@
-def dpll(clauses, assignment={}):
+from cdcl_solver import CDCLSolver
+
+
+def dpll(clauses, assignment=None):
+    """
+    Satisfying assignment {var: bool} for a CNF given as lists of non-zero
+    ints, or None if there is none. assignment fixes variables up front.
+    Runs the iterative CDCL solver in cdcl_solver.py.
+    """
+    solver = CDCLSolver()
+    for clause in clauses:
+        solver.add_clause(clause)
+    for var, value in (assignment or {}).items():
+        solver.add_clause([var if value else -var])
+    if not solver.solve():
+        return None
+    variables = {abs(literal) for clause in clauses for literal in clause} | set(assignment or {})
+    return {var: solver.model[var] for var in sorted(variables)}
+
+def _dpll_recursive(clauses, assignment):
+    """The previous recursive DPLL, kept as a benchmark reference."""
     clauses, assignment = unit_propagation(clauses, assignment)
     if clauses is None:
         return None  # Conflict detected
@@ -18,7 +38,7 @@ def dpll(clauses, assignment={}):
         new_clauses = simplify_clauses(clauses, var, value)
         new_assignment = assignment.copy()
         new_assignment[var] = value
-        result = dpll(new_clauses, new_assignment)
+        result = _dpll_recursive(new_clauses, new_assignment)
         if result is not None:
             return result
     return None
@@ -82,12 +102,13 @@ def choose_variable(clauses):
             return abs(literal)  # Pick the first variable found
     return None
 
-# Example CNF: (A OR B) AND (NOT A OR C) AND (B OR NOT C)
-cnf = [[1, 2], [-1, 3], [2, -3]]
-dictionary={1:'A',2:'B',3:'C'}
-result = dpll(cnf)
-if result:
-    pretty_result = {dictionary[var]: value for var, value in result.items()}
-    print("Satisfiable with assignment:", pretty_result)
-else:
-    print("Unsatisfiable")
\ No newline at end of file
+if __name__ == "__main__":
+    # Example CNF: (A OR B) AND (NOT A OR C) AND (B OR NOT C)
+    cnf = [[1, 2], [-1, 3], [2, -3]]
+    dictionary={1:'A',2:'B',3:'C'}
+    result = dpll(cnf)
+    if result:
+        pretty_result = {dictionary[var]: value for var, value in result.items()}
+        print("Satisfiable with assignment:", pretty_result)
+    else:
+        print("Unsatisfiable")
\ No newline at end of file
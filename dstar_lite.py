@@ -0,0 +1,250 @@
+import contextlib
+import heapq
+import io
+import sys
+import time
+
+import numpy as np
+
+from grid_map import DIAGONAL_MOVES, DOWN, LEFT, RIGHT, SQRT2, STRAIGHT_MOVES, UP, GridMap
+
+INF = float("inf")
+
+
+class DStarLite:
+    """
+    D* Lite (Koenig and Likhachev, optimized version) on robo_path_actual's
+    grid model: rows x cols cells, blocked edges ((r1, c1), (r2, c2)) in
+    obstacles, and "manhattan" (4 moves) or "chebyshev" (8 moves, diagonal
+    cost sqrt(2), no diagonal unless both straight moves out of the cell
+    are open) movement.
+
+    The search runs from the goal, so g[s] is the cost from s to the goal.
+    When edges change (block_edge/unblock_edge) only the affected costs are
+    repaired by the next replan(), and move_to() lets the robot advance
+    without invalidating anything.
+    """
+
+    def __init__(self, rows, cols, obstacles, start, goal, dist_type="manhattan"):
+        self.rows, self.cols = rows, cols
+        self.diagonal = dist_type == "chebyshev"
+        self.obstacles = {tuple(sorted(edge)) for edge in obstacles}
+        grid = GridMap.from_blocked_edges(rows, cols, self.obstacles, self.diagonal)
+        self.masks = grid.moves.reshape(-1).tolist()
+        moves = STRAIGHT_MOVES + (DIAGONAL_MOVES if self.diagonal else ())
+        self.steps = [(bit, dr, dc, dr * cols + dc, SQRT2 if dr and dc else 1) for bit, (dr, dc) in moves]
+        self.start = self.last = start[0] * cols + start[1]
+        self.goal = goal[0] * cols + goal[1]
+        self.g = [INF] * (rows * cols)
+        self.rhs = [INF] * (rows * cols)
+        self.rhs[self.goal] = 0
+        self.km = 0
+        self.queue = []
+        self.keys = {}  # cell -> its live key in queue
+        self.expanded = 0
+        self._push(self.goal)
+        self.replan()
+
+    def _h(self, a, b):
+        dr, dc = abs(a // self.cols - b // self.cols), abs(a % self.cols - b % self.cols)
+        return dr + dc + (SQRT2 - 2) * min(dr, dc) if self.diagonal else dr + dc
+
+    def _key(self, s):
+        best = min(self.g[s], self.rhs[s])
+        return (best + self._h(self.start, s) + self.km, best)
+
+    def _push(self, s):
+        key = self._key(s)
+        self.keys[s] = key
+        heapq.heappush(self.queue, (key, s))
+
+    def _update(self, s):
+        if self.g[s] != self.rhs[s]:
+            self._push(s)
+        else:
+            self.keys.pop(s, None)  # its queue entry goes stale
+
+    def _successors(self, s):
+        mask = self.masks[s]
+        return [(s + offset, cost) for bit, _, _, offset, cost in self.steps if mask & bit]
+
+    def _predecessors(self, s):
+        masks, size = self.masks, len(self.masks)
+        found = []
+        for bit, _, _, offset, cost in self.steps:
+            p = s - offset
+            if 0 <= p < size and masks[p] & bit:
+                found.append((p, cost))
+        return found
+
+    def _best_rhs(self, s):
+        g = self.g
+        return min((cost + g[t] for t, cost in self._successors(s)), default=INF)
+
+    def replan(self):
+        """Repair g until the start's cost is consistent; returns the start's cost to the goal."""
+        queue, keys, g, rhs = self.queue, self.keys, self.g, self.rhs
+        while queue:
+            key, u = queue[0]
+            if keys.get(u) != key:
+                heapq.heappop(queue)
+                continue
+            # ties with the start's key are expanded too (with slack for rounding in the sqrt(2) sums), so
+            # every cell a greedy descent from the start can step onto is consistent
+            if key[0] > self._key(self.start)[0] + 1e-9 and rhs[self.start] == g[self.start]:
+                break
+            new_key = self._key(u)
+            if key < new_key:
+                heapq.heapreplace(queue, (new_key, u))
+                keys[u] = new_key
+                continue
+            heapq.heappop(queue)
+            del keys[u]
+            self.expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                for p, cost in self._predecessors(u):
+                    if p != self.goal and cost + g[u] < rhs[p]:
+                        rhs[p] = cost + g[u]
+                        self._update(p)
+            else:
+                old = g[u]
+                g[u] = INF
+                for p, cost in self._predecessors(u) + [(u, None)]:
+                    if p != self.goal and (p == u or rhs[p] == cost + old):
+                        rhs[p] = self._best_rhs(p)
+                    self._update(p)
+        return g[self.start]
+
+    def _cell_mask(self, s):
+        """Moves out of s under is_valid_move: in bounds, edge open, diagonals need both straight moves."""
+        r, c = divmod(s, self.cols)
+        mask = 0
+        for bit, dr, dc, _, _ in self.steps:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < self.rows and 0 <= nc < self.cols):
+                continue
+            if tuple(sorted(((r, c), (nr, nc)))) in self.obstacles:
+                continue
+            if dr and dc and not (mask & (UP if dr < 0 else DOWN) and mask & (LEFT if dc < 0 else RIGHT)):
+                continue
+            mask |= bit
+        return mask
+
+    def _set_edge(self, a, b, blocked):
+        edge = tuple(sorted((tuple(a), tuple(b))))
+        if blocked == (edge in self.obstacles):
+            return
+        (self.obstacles.add if blocked else self.obstacles.discard)(edge)
+        changed = []
+        for s in (edge[0][0] * self.cols + edge[0][1], edge[1][0] * self.cols + edge[1][1]):
+            old, new = self.masks[s], self._cell_mask(s)
+            self.masks[s] = new
+            for bit, _, _, offset, cost in self.steps:
+                if (old ^ new) & bit:
+                    changed.append((s, s + offset, cost if old & bit else INF, cost if new & bit else INF))
+        g, rhs = self.g, self.rhs
+        for u, v, old_cost, new_cost in changed:
+            if u == self.goal:
+                continue
+            if old_cost > new_cost:
+                rhs[u] = min(rhs[u], new_cost + g[v])
+            elif rhs[u] == old_cost + g[v]:
+                rhs[u] = self._best_rhs(u)
+            self._update(u)
+
+    def block_edge(self, a, b):
+        self._set_edge(a, b, True)
+
+    def unblock_edge(self, a, b):
+        self._set_edge(a, b, False)
+
+    def move_to(self, cell):
+        self.start = cell[0] * self.cols + cell[1]
+        # keys already queued were computed from the old start; km keeps them lower bounds
+        self.km += self._h(self.last, self.start)
+        self.last = self.start
+
+    def path(self):
+        """
+        Greedy descent on g from the start; [] when the goal is unreachable.
+        Raises RuntimeError if g is not consistent along the way (replan()
+        not called since the last change).
+        """
+        s = self.start
+        if self.g[s] == INF:
+            return []
+        cells = [s]
+        while s != self.goal:
+            s = min(self._successors(s), key=lambda step: step[1] + self.g[step[0]], default=(None,))[0]
+            if s is None or self.g[s] == INF or len(cells) > len(self.g):
+                raise RuntimeError("g is inconsistent along the path: call replan() first")
+            cells.append(s)
+        return [divmod(s, self.cols) for s in cells]
+
+
+def random_edges(side, fraction, rng):
+    """About fraction of the straight edges of a side x side grid, as sorted cell pairs."""
+    cells = rng.integers(side, size=(int(2 * side * side * fraction), 2))
+    down = rng.random(len(cells)) < 0.5
+    return {((int(r), int(c)), (int(r) + 1, int(c)) if d else (int(r), int(c) + 1))
+            for (r, c), d in zip(cells, down) if (r + 1 if d else c + 1) < side}
+
+
+def main():
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with contextlib.redirect_stdout(io.StringIO()):
+        import robo_path_actual
+    for dist_type in ("manhattan", "chebyshev"):
+        rng = np.random.default_rng(0)
+        obstacles = random_edges(side, 0.3, rng)
+        start, goal = (0, 0), (side - 1, side - 1)
+        robo_path_actual.ROWS = robo_path_actual.COLS = side
+        robo_path_actual.OBSTACLES = set(obstacles)
+
+        start_time = time.perf_counter()
+        planner = DStarLite(side, side, obstacles, start, goal, dist_type)
+        print(f"{side}x{side} {dist_type}: initial plan cost {planner.g[planner.start]:.2f} in "
+              f"{time.perf_counter() - start_time:.2f}s ({planner.expanded} expansions)")
+        path = planner.path()
+        position = 0
+        repair_time = astar_time = 0.0
+        repair_expanded = 0
+        for _ in range(events):
+            # drive a few steps, then discover that an edge a few steps ahead is blocked
+            position = min(position + int(rng.integers(5, 30)), len(path) - 2)
+            if position >= len(path) - 2:
+                break
+            here = path[position]
+            planner.move_to(here)
+            ahead = min(position + int(rng.integers(1, 10)), len(path) - 2)
+            edge = tuple(sorted((path[ahead], path[ahead + 1])))
+            changes = [(edge, True)]
+            if rng.random() < 0.5:  # and now and then an old obstacle is cleared
+                cleared = sorted(robo_path_actual.OBSTACLES)[int(rng.integers(len(robo_path_actual.OBSTACLES)))]
+                changes.append((cleared, False))
+            for (a, b), blocked in changes:
+                (robo_path_actual.OBSTACLES.add if blocked else robo_path_actual.OBSTACLES.discard)((a, b))
+
+            expanded = planner.expanded
+            start_time = time.perf_counter()
+            for (a, b), blocked in changes:
+                planner.block_edge(a, b) if blocked else planner.unblock_edge(a, b)
+            cost = planner.replan()
+            path = planner.path()
+            repair_time += time.perf_counter() - start_time
+            repair_expanded += planner.expanded - expanded
+            position = 0
+
+            start_time = time.perf_counter()
+            _, expected = robo_path_actual.a_star(here, goal, dist_type)
+            astar_time += time.perf_counter() - start_time
+            assert abs(cost - expected) < 1e-6, (cost, expected)
+        print(f"  {events} obstacle updates: D* Lite repairs {repair_time:.2f}s total "
+              f"({repair_expanded / events:.1f} expansions per update), "
+              f"a_star from scratch {astar_time:.2f}s total ({astar_time / events:.2f}s per update)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,548 @@
+import heapq
+import sys
+import time
+from itertools import chain, count
+
+import numpy as np
+
+# One bit per move out of a cell, packed into a uint8 per cell
+UP, DOWN, LEFT, RIGHT = 1, 2, 4, 8
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = 16, 32, 64, 128
+STRAIGHT_MOVES = ((UP, (-1, 0)), (DOWN, (1, 0)), (LEFT, (0, -1)), (RIGHT, (0, 1)))
+DIAGONAL_MOVES = ((UP_LEFT, (-1, -1)), (UP_RIGHT, (-1, 1)), (DOWN_LEFT, (1, -1)), (DOWN_RIGHT, (1, 1)))
+LETTERS = {"U": UP, "D": DOWN, "L": LEFT, "R": RIGHT}
+SQRT2 = 2 ** 0.5
+
+
+def _neighbour(a, dr, dc):
+    """b[r, c] = a[r + dr, c + dc], False outside the grid."""
+    rows, cols = a.shape
+    b = np.zeros_like(a)
+    b[max(0, -dr):rows - max(0, dr), max(0, -dc):cols - max(0, dc)] = \
+        a[max(0, dr):rows - max(0, -dr), max(0, dc):cols - max(0, -dc)]
+    return b
+
+
+def _open_moves(free, diagonal):
+    """Every move to an in-bounds free cell; diagonals also need both orthogonal cells free (no corner cutting)."""
+    moves = np.zeros(free.shape, dtype=np.uint8)
+    for bit, (dr, dc) in STRAIGHT_MOVES:
+        moves[_neighbour(free, dr, dc)] |= bit
+    if diagonal:
+        for bit, (dr, dc) in DIAGONAL_MOVES:
+            allowed = _neighbour(free, dr, dc) & _neighbour(free, dr, 0) & _neighbour(free, 0, dc)
+            moves[allowed] |= bit
+    return moves
+
+
+def _block_edges(moves, edges):
+    """Clear the move bits of each blocked edge ((r1, c1), (r2, c2)) in both directions."""
+    bits = np.zeros(9, dtype=np.uint8)  # indexed by (dr + 1) * 3 + (dc + 1)
+    for bit, (dr, dc) in STRAIGHT_MOVES + DIAGONAL_MOVES:
+        bits[(dr + 1) * 3 + dc + 1] = bit
+    for a, b in ((0, 1), (1, 0)):
+        delta = edges[:, b] - edges[:, a]
+        adjacent = (np.abs(delta) <= 1).all(axis=1)
+        mask = bits[(delta[adjacent, 0] + 1) * 3 + delta[adjacent, 1] + 1]
+        np.bitwise_and.at(moves, (edges[adjacent, a, 0], edges[adjacent, a, 1]), ~mask)
+
+
+def octile(dr, dc):
+    """Cost of the shortest 8-connected move sequence covering (dr, dc); Manhattan when one of them is 0."""
+    dr, dc = abs(dr), abs(dc)
+    return max(dr, dc) + (SQRT2 - 1) * min(dr, dc)
+
+
+class GridMap:
+    """
+    A grid as a uint8 array of move bitmasks (UP, DOWN, ..., DOWN_RIGHT):
+    bit set = the move out of that cell is allowed. Neighbour generation is
+    a table lookup on the mask, with no bounds checks or direction letters.
+    free marks the cells a robot can stand on (matrix value != 1).
+
+    jump_point_search needs a uniform grid, where the moves are exactly
+    those implied by free (see open()); astar works on any mask.
+    """
+
+    def __init__(self, moves, free, diagonal=False):
+        self.moves = np.ascontiguousarray(moves, dtype=np.uint8)
+        self.free = np.asarray(free, dtype=bool)
+        self.rows, self.cols = self.moves.shape
+        self.diagonal = diagonal
+        self._tables = {}
+
+    @classmethod
+    def open(cls, matrix, diagonal=False):
+        """Uniform-cost grid from a 0/1 matrix: 4-connected, or 8-connected without corner cutting."""
+        free = np.asarray(matrix) != 1
+        return cls(np.where(free, _open_moves(free, diagonal), 0), free, diagonal)
+
+    @classmethod
+    def from_directions(cls, matrix, directions_map):
+        """
+        Grid from robo_path's inputs: directions_map[(r, c)] lists the
+        letters (U, D, L, R) allowed out of each cell; moves off the grid or
+        onto a 1 in matrix are dropped, as robo_path does on every expansion.
+        """
+        free = np.asarray(matrix) != 1
+        cols = free.shape[1]
+        masks = {}  # each distinct letter list is translated once
+        for letters in directions_map.values():
+            key = tuple(letters)
+            if key not in masks:
+                masks[key] = sum(LETTERS[letter] for letter in set(key))
+        cells = np.fromiter((r * cols + c for r, c in directions_map), dtype=np.int64, count=len(directions_map))
+        requested = np.zeros(free.size, dtype=np.uint8)
+        requested[cells] = np.fromiter((masks[tuple(letters)] for letters in directions_map.values()),
+                                       dtype=np.uint8, count=len(directions_map))
+        return cls(requested.reshape(free.shape) & _open_moves(free, False), free)
+
+    @classmethod
+    def from_blocked_edges(cls, rows, cols, obstacles, diagonal=False, matrix=None):
+        """
+        Grid from robo_path_actual's model: obstacles is a set of blocked
+        edges ((r1, c1), (r2, c2)), blocked both ways, and matrix (optional)
+        marks blocked cells. A diagonal move needs its own edge open and
+        both straight moves out of the same cell allowed, as in
+        is_valid_move.
+        """
+        free = np.ones((rows, cols), dtype=bool) if matrix is None else np.asarray(matrix) != 1
+        moves = np.where(free, _open_moves(free, False), 0).astype(np.uint8)
+        edges = np.fromiter(chain.from_iterable(a + b for a, b in obstacles), dtype=np.int64,
+                            count=4 * len(obstacles)).reshape(-1, 2, 2)
+        straight = np.abs(edges[:, 1] - edges[:, 0]).sum(axis=1) == 1
+        _block_edges(moves, edges[straight])
+        if diagonal:
+            for bit, (dr, dc) in DIAGONAL_MOVES:
+                vertical, horizontal = UP if dr < 0 else DOWN, LEFT if dc < 0 else RIGHT
+                allowed = _neighbour(free, dr, dc) & (moves & vertical != 0) & (moves & horizontal != 0)
+                moves[allowed] |= bit
+            _block_edges(moves, edges[~straight])
+        return cls(moves, free, diagonal)
+
+    @classmethod
+    def load(cls, path):
+        """Load a grid written by save()."""
+        data = np.load(path)
+        return cls(data["moves"], data["free"], bool(data["diagonal"]))
+
+    def save(self, path):
+        """Write the move masks, free mask and connectivity to an .npz file."""
+        np.savez(path, moves=self.moves, free=self.free, diagonal=self.diagonal)
+
+    def expand(self, cells):
+        """
+        Every move out of an array of flat cell indices (r * cols + c) at
+        once: (sources, targets, costs) arrays, one entry per allowed move,
+        grouped by direction.
+        """
+        cells = np.asarray(cells, dtype=np.int64)
+        masks = self.moves.reshape(-1)[cells]
+        sources, targets, costs = [], [], []
+        for bit, (dr, dc) in STRAIGHT_MOVES + (DIAGONAL_MOVES if self.diagonal else ()):
+            hit = cells[(masks & bit) != 0]
+            sources.append(hit)
+            targets.append(hit + (dr * self.cols + dc))
+            costs.append(np.full(len(hit), SQRT2 if dr and dc else 1.0))
+        return np.concatenate(sources), np.concatenate(targets), np.concatenate(costs)
+
+    def is_uniform(self):
+        free = self.free
+        return np.array_equal(self.moves[free], _open_moves(free, self.diagonal)[free])
+
+    def _step_table(self):
+        """For each of the 256 masks, the (flat offset, cost) of every move it allows."""
+        cols = self.cols
+        moves = STRAIGHT_MOVES + DIAGONAL_MOVES
+        return [[(dr * cols + dc, SQRT2 if dr and dc else 1) for bit, (dr, dc) in moves if mask & bit]
+                for mask in range(256)]
+
+    def astar(self, start, goal):
+        """
+        A* over the move masks with the Manhattan (4-connected) or octile
+        (8-connected) heuristic. Returns (path, cost, stats) like
+        search_core.graph_search; ([], inf, stats) when the goal is unreachable.
+        """
+        cols = self.cols
+        moves = memoryview(self.moves.reshape(-1))
+        steps = self._step_table()
+        source, target = start[0] * cols + start[1], goal[0] * cols + goal[1]
+        goal_row, goal_col = goal
+        diagonal = self.diagonal
+        stats = {"generated": 1, "expanded": 0, "popped": 0}
+
+        def h(cell):
+            dr, dc = abs(cell // cols - goal_row), abs(cell % cols - goal_col)
+            if diagonal:
+                return dr + dc + (SQRT2 - 2) * min(dr, dc)
+            return dr + dc
+
+        g = {source: 0}
+        parent = {source: None}
+        closed = set()
+        tie = count()
+        frontier = [(h(source), next(tie), source)]
+        while frontier:
+            _, _, cell = heapq.heappop(frontier)
+            stats["popped"] += 1
+            if cell in closed:
+                continue
+            if cell == target:
+                path = []
+                while cell is not None:
+                    path.append((cell // cols, cell % cols))
+                    cell = parent[cell]
+                return path[::-1], g[target], stats
+            closed.add(cell)
+            stats["expanded"] += 1
+            base = g[cell]
+            for offset, cost in steps[moves[cell]]:
+                nxt = cell + offset
+                new_g = base + cost
+                if new_g < g.get(nxt, float("inf")) and nxt not in closed:
+                    g[nxt] = new_g
+                    parent[nxt] = cell
+                    stats["generated"] += 1
+                    heapq.heappush(frontier, (new_g + h(nxt), next(tie), nxt))
+        return [], float("inf"), stats
+
+    def _jump_tables(self):
+        """
+        Straight-line scan tables over the free mask padded with a blocked
+        border: for every cell and direction, the column (or row) of the
+        first cell at or beyond it that is blocked or has a forced
+        neighbour, so a straight jump is one lookup instead of a cell-by-cell
+        walk. For 4-connected grids the vertical tables also stop where a
+        horizontal scan from a side cell would reach a forced neighbour.
+        """
+        key = "diagonal" if self.diagonal else "straight"
+        if key in self._tables:
+            return self._tables[key]
+        free = np.zeros((self.rows + 2, self.cols + 2), dtype=bool)
+        free[1:-1, 1:-1] = self.free
+        height, width = free.shape
+        dtype = np.uint16 if max(height, width) < 1 << 16 else np.uint32
+        blocked = ~free
+
+        def n(dr, dc):
+            return _neighbour(free, dr, dc)
+
+        def forward(events, axis):
+            index = np.arange(events.shape[axis], dtype=np.int64)
+            index = index if axis == 1 else index[:, None]
+            first = np.where(events, index, events.shape[axis])
+            first = np.flip(np.minimum.accumulate(np.flip(first, axis), axis=axis), axis)
+            return np.ascontiguousarray(first, dtype=dtype)
+
+        def backward(events, axis):
+            index = np.arange(events.shape[axis], dtype=np.int64)
+            index = index if axis == 1 else index[:, None]
+            return np.ascontiguousarray(np.maximum.accumulate(np.where(events, index, -1), axis=axis), dtype=dtype)
+
+        right = forward(blocked | (n(-1, 0) & ~n(-1, -1)) | (n(1, 0) & ~n(1, -1)), 1)
+        left = backward(blocked | (n(-1, 0) & ~n(-1, 1)) | (n(1, 0) & ~n(1, 1)), 1)
+        down_events = blocked | (n(0, -1) & ~n(-1, -1)) | (n(0, 1) & ~n(-1, 1))
+        up_events = blocked | (n(0, -1) & ~n(1, -1)) | (n(0, 1) & ~n(1, 1))
+        if not self.diagonal:
+            rows = np.arange(height)[:, None]
+            hits_right = free & free[rows, right]
+            hits_left = free & free[rows, left]
+            sideways = _neighbour(hits_right, 0, 1) | _neighbour(hits_left, 0, -1)
+            down_events |= sideways
+            up_events |= sideways
+        down, up = forward(down_events, 0), backward(up_events, 0)
+        self._tables[key] = tables = (free.astype(np.uint8).tobytes(),
+                                      *(memoryview(t.reshape(-1)) for t in (right, left, down, up)))
+        return tables
+
+    def jump_point_search(self, start, goal):
+        """
+        Jump Point Search (Harabor and Grastien) on a uniform grid: straight
+        and diagonal runs are skipped until a cell with a forced neighbour,
+        so only jump points go through the open list. 8-connected grids use
+        the no-corner-cutting variant, matching is_valid_move in
+        robo_path_actual. The cost is the same optimal cost astar finds (the
+        path may be a different one of equal cost). Returns (path, cost,
+        stats), with the skipped cells filled back into the path.
+        """
+        if not self.is_uniform():
+            raise ValueError("jump point search needs a uniform grid: build it with GridMap.open()")
+        free, right, left, down, up = self._jump_tables()
+        width = self.cols + 2
+        source = (start[0] + 1) * width + start[1] + 1
+        target = (goal[0] + 1) * width + goal[1] + 1
+        target_base, target_col = target - target % width, target % width
+        diagonal = self.diagonal
+        stats = {"generated": 1, "expanded": 0, "popped": 0}
+
+        def jump_h(p, dc):
+            if not free[p]:
+                return -1
+            base = p - p % width
+            if dc > 0:
+                q = base + right[p]
+                if base == target_base and p <= target <= q:
+                    return target
+            else:
+                q = base + left[p]
+                if base == target_base and q <= target <= p:
+                    return target
+            return q if free[q] else -1
+
+        def jump_v(p, dr):
+            if not free[p]:
+                return -1
+            col = p % width
+            q = (down[p] if dr > 0 else up[p]) * width + col
+            low, high = (p, q) if dr > 0 else (q, p)
+            if col == target_col and low <= target <= high:
+                return target
+            if not diagonal:
+                # on the goal's row the sideways scans may reach the goal itself
+                c = target_base + col
+                if low <= c <= high and c != q and (jump_h(c + 1, 1) == target or jump_h(c - 1, -1) == target):
+                    return c
+            return q if free[q] else -1
+
+        def jump_d(p, dr, dc):
+            dv = dr * width
+            while free[p]:
+                if p == target or jump_h(p + dc, dc) >= 0 or jump_v(p + dv, dr) >= 0:
+                    return p
+                if not (free[p + dc] and free[p + dv]):
+                    return -1
+                p += dv + dc
+            return -1
+
+        def directions(p, previous):
+            if previous is None:
+                found = [(dr, dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)) if free[p + dr * width + dc]]
+                if diagonal:
+                    found += [(dr, dc) for dr, dc in ((-1, -1), (-1, 1), (1, -1), (1, 1))
+                              if free[p + dr * width + dc] and free[p + dr * width] and free[p + dc]]
+                return found
+            dr = (p // width > previous // width) - (p // width < previous // width)
+            dc = (p % width > previous % width) - (p % width < previous % width)
+            if dr and dc:
+                vertical, horizontal = free[p + dr * width], free[p + dc]
+                found = [(dr, 0)] if vertical else []
+                if horizontal:
+                    found.append((0, dc))
+                if vertical and horizontal:
+                    found.append((dr, dc))
+                return found
+            if dc:
+                ahead, above, below = free[p + dc], free[p - width], free[p + width]
+                found = [(0, dc)] if ahead else []
+                if diagonal and ahead:
+                    found += [(s, dc) for s, side in ((-1, above), (1, below)) if side]
+            else:
+                ahead, above, below = free[p + dr * width], free[p - 1], free[p + 1]
+                found = [(dr, 0)] if ahead else []
+                if diagonal and ahead:
+                    found += [(dr, s) for s, side in ((-1, above), (1, below)) if side]
+            # the perpendicular moves
+            found += [(s, 0) if dc else (0, s) for s, side in ((-1, above), (1, below)) if side]
+            return found
+
+        def h(p):
+            dr, dc = abs(p // width - target // width), abs(p % width - target_col)
+            return dr + dc + (SQRT2 - 2) * min(dr, dc) if diagonal else dr + dc
+
+        g = {source: 0}
+        parent = {source: None}
+        closed = set()
+        tie = count()
+        frontier = [(h(source), next(tie), source)]
+        while frontier:
+            _, _, p = heapq.heappop(frontier)
+            stats["popped"] += 1
+            if p in closed:
+                continue
+            if p == target:
+                return self._unpack(parent, p, width), g[p], stats
+            closed.add(p)
+            stats["expanded"] += 1
+            for dr, dc in directions(p, parent[p]):
+                nxt = p + dr * width + dc
+                if dr and dc:
+                    q = jump_d(nxt, dr, dc)
+                elif dc:
+                    q = jump_h(nxt, dc)
+                else:
+                    q = jump_v(nxt, dr)
+                if q < 0 or q in closed:
+                    continue
+                new_g = g[p] + octile(q // width - p // width, q % width - p % width)
+                if new_g < g.get(q, float("inf")):
+                    g[q] = new_g
+                    parent[q] = p
+                    stats["generated"] += 1
+                    heapq.heappush(frontier, (new_g + h(q), next(tie), q))
+        return [], float("inf"), stats
+
+    @staticmethod
+    def _unpack(parent, p, width):
+        """Cell path from the jump point parents, stepping along each straight or diagonal run."""
+        points = []
+        while p is not None:
+            points.append(divmod(p, width))
+            p = parent[p]
+        points.reverse()
+        path = [(points[0][0] - 1, points[0][1] - 1)]
+        for (r0, c0), (r1, c1) in zip(points, points[1:]):
+            dr, dc = (r1 > r0) - (r1 < r0), (c1 > c0) - (c1 < c0)
+            for k in range(1, max(abs(r1 - r0), abs(c1 - c0)) + 1):
+                path.append((r0 + k * dr - 1, c0 + k * dc - 1))
+        return path
+
+
+def warehouse_matrix(rows, cols, seed=0, rack=(2, 12), aisle=3, clutter=0.002):
+    """0/1 floor map: blocks of racks separated by aisles, plus scattered clutter and some gaps in the racks."""
+    rng = np.random.default_rng(seed)
+    matrix = np.zeros((rows, cols), dtype=np.uint8)
+    height, length = rack
+    r_idx, c_idx = np.arange(rows)[:, None], np.arange(cols)[None, :]
+    if height:
+        matrix[(r_idx % (height + aisle) < height) & (c_idx % (length + aisle) < length)] = 1
+    matrix[rng.random((rows, cols)) < clutter] = 1
+    matrix[rng.random((rows, cols)) < 0.02] = 0
+    return matrix
+
+
+def compare(grid, pairs):
+    """Run astar and jump_point_search on each (start, goal) pair and print expansions and times."""
+    for start, goal in pairs:
+        start_time = time.perf_counter()
+        _, astar_cost, astar_stats = grid.astar(start, goal)
+        astar_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        path, jps_cost, jps_stats = grid.jump_point_search(start, goal)
+        jps_time = time.perf_counter() - start_time
+        assert abs(astar_cost - jps_cost) < 1e-6, (astar_cost, jps_cost)
+        print(f"  {start} -> {goal}: cost {jps_cost:.2f}; A* {astar_stats['expanded']} expansions "
+              f"in {astar_time:.2f}s, JPS {jps_stats['expanded']} in {jps_time:.3f}s ({len(path)} cells)")
+
+
+def topology_benchmark(side):
+    """
+    Expansions per second on a side x side grid whose goal is walled off,
+    so every search expands every reachable cell: robo_path's tuple/letter
+    expansion, robo_path_actual.a_star over blocked edges, GridMap.astar,
+    and frontier-at-a-time BFS with expand(). Also times compiling, saving
+    and loading the grid.
+    """
+    import contextlib
+    import io
+    import os
+    import tempfile
+    with contextlib.redirect_stdout(io.StringIO()):  # both modules print when imported or searching
+        import robo_path_actual
+        from Robo_Path import robo_path
+
+    matrix = warehouse_matrix(side, side)
+    start, goal = (2, 0), (side - 1, side - 1)  # start in the first aisle
+    matrix[start] = matrix[goal] = 0
+    matrix[side - 2, side - 1] = matrix[side - 1, side - 2] = 1
+    rows = matrix.tolist()
+    directions_map = {(r, c): ["U", "D", "L", "R"] for r in range(side) for c in range(side)}
+
+    start_time = time.perf_counter()
+    grid = GridMap.from_directions(matrix, directions_map)
+    print(f"{side}x{side}: compiled directions_map in {time.perf_counter() - start_time:.2f}s")
+
+    def wavefront():
+        seen = np.zeros(grid.rows * grid.cols, dtype=bool)
+        frontier = np.array([start[0] * grid.cols + start[1]])
+        seen[frontier] = True
+        expanded = 0
+        while len(frontier):
+            expanded += len(frontier)
+            _, targets, _ = grid.expand(frontier)
+            frontier = np.unique(targets[~seen[targets]])
+            seen[frontier] = True
+        return expanded
+
+    start_time = time.perf_counter()
+    reachable = wavefront()
+    wave_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        robo_path(*start, *goal, rows, directions_map, side, side)
+    before_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    expanded = grid.astar(start, goal)[2]["expanded"]
+    astar_time = time.perf_counter() - start_time
+    assert expanded == reachable
+    print(f"  {reachable} reachable cells")
+    print(f"  robo_path (dict + letters)   {reachable / before_time:12,.0f} expansions/s")
+    print(f"  GridMap.astar (mask table)   {reachable / astar_time:12,.0f} expansions/s")
+    print(f"  expand() wavefront           {reachable / wave_time:12,.0f} expansions/s")
+
+    # the same for robo_path_actual's edge model: 10% of the straight edges blocked, goal fenced in
+    rng = np.random.default_rng(0)
+    cells = rng.integers(side, size=(side * side // 5, 2))
+    down = rng.random(len(cells)) < 0.5
+    obstacles = {((int(r), int(c)), (int(r) + 1, int(c)) if d else (int(r), int(c) + 1))
+                 for (r, c), d in zip(cells, down) if (r + 1 if d else c + 1) < side}
+    obstacles |= {((side - 2, side - 1), goal), ((side - 1, side - 2), goal)}
+    start_time = time.perf_counter()
+    edge_grid = GridMap.from_blocked_edges(side, side, obstacles)
+    print(f"  compiled {len(obstacles)} blocked edges in {time.perf_counter() - start_time:.2f}s")
+    robo_path_actual.ROWS = robo_path_actual.COLS = side
+    robo_path_actual.OBSTACLES = obstacles
+    start_time = time.perf_counter()
+    robo_path_actual.a_star(start, goal, "manhattan")
+    before_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    expanded = edge_grid.astar(start, goal)[2]["expanded"]
+    astar_time = time.perf_counter() - start_time
+    print(f"  {expanded} reachable cells")
+    print(f"  robo_path_actual.a_star      {expanded / before_time:12,.0f} expansions/s")
+    print(f"  GridMap.astar (mask table)   {expanded / astar_time:12,.0f} expansions/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "floor.npz")
+        start_time = time.perf_counter()
+        grid.save(path)
+        save_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        GridMap.load(path)
+        print(f"  save {save_time * 1e3:.0f} ms, load {(time.perf_counter() - start_time) * 1e3:.0f} ms, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB")
+
+
+def compile_map(matrix_path, out_path, diagonal=False):
+    """Compile a text map (one row of 0/1 per line) into a GridMap file."""
+    GridMap.open(np.loadtxt(matrix_path, dtype=np.uint8, ndmin=2), diagonal).save(out_path)
+
+
+def main():
+    if sys.argv[1:2] == ["topology"]:
+        for side in [int(arg) for arg in sys.argv[2:]] or [1000]:
+            topology_benchmark(side)
+        return
+    if sys.argv[1:2] == ["compile"]:
+        compile_map(sys.argv[2], sys.argv[3], "--diagonal" in sys.argv[4:])
+        return
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    maps = [("racks", warehouse_matrix(side, side)),
+            ("open floor", warehouse_matrix(side, side, rack=(0, 0), clutter=0.0005))]
+    for name, matrix in maps:
+        rng = np.random.default_rng(1)
+        free_cells = np.argwhere(matrix == 0)
+        pairs = [tuple(map(tuple, free_cells[rng.choice(len(free_cells), 2)].tolist())) for _ in range(queries)]
+        for diagonal in (False, True):
+            start_time = time.perf_counter()
+            grid = GridMap.open(matrix, diagonal)
+            build_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            grid._jump_tables()
+            print(f"{name} {side}x{side} {'8' if diagonal else '4'}-connected: masks in {build_time:.2f}s, "
+                  f"jump tables in {time.perf_counter() - start_time:.2f}s")
+            compare(grid, pairs)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 import random
 
+import numpy as np
+
+from distance_matrix import DistanceMatrix
+from tsp_local_search import distance_array, local_search, two_opt
+
 dist_matrix = {
     (0, 1): 20, (1, 0): 20,
     (0, 2): 10, (2, 0): 10,
@@ -15,6 +20,8 @@ def route_distance(route, dist_matrix, start_city):
     compute the total distance of traveling:
     start_city -> route[0] -> route[1] -> ... -> route[-1] -> start_city
     """
+    if isinstance(dist_matrix, DistanceMatrix):
+        return dist_matrix.route_distance(route, start_city)
     total_dist = 0
     current_city = start_city
     for next_city in route:
@@ -39,29 +46,25 @@ def generate_2opt_neighbors(route):
             neighbors.append(new_route)
     return neighbors
 
-def hill_climb(route, dist_matrix, start_city):
+def hill_climb(route, dist_matrix, start_city, mode="first"):
     """
-    Perform hill climbing on the TSP route using 2-opt neighbors.
+    Perform hill climbing on the TSP route using 2-opt moves.
+    Each move is scored by its 4-edge delta on a NumPy distance array and
+    applied in place (see tsp_local_search.two_opt); mode is "first" or
+    "best" improvement.
+    For large tours, mode "2opt", "oropt" or "or2opt" runs
+    tsp_local_search.local_search instead, which only tries moves towards
+    each city's nearest neighbors and needs the route to cover every city.
     Returns the best route (excluding the start city) and its total distance.
     """
-    current_route = route
-    current_dist = route_distance(current_route, dist_matrix, start_city)
-
-    while True:
-        improved = False
-        neighbors = generate_2opt_neighbors(current_route)
-        for neighbor in neighbors:
-            dist_neighbor = route_distance(neighbor, dist_matrix, start_city)
-            if dist_neighbor < current_dist:
-                current_route = neighbor
-                current_dist = dist_neighbor
-                improved = True
-                break  # Accept the first improvement
-        if not improved:
-            # print("No Better Neighbor Found!!")
-            break
-    
-    return current_route, current_dist
+    dist = distance_array(dist_matrix)
+    tour = np.array([start_city] + list(route))
+    if mode in ("first", "best"):
+        two_opt(tour, dist, mode)
+    else:
+        local_search(tour, dist, mode)
+    best_route = tour[1:].tolist()
+    return best_route, route_distance(best_route, dist_matrix, start_city)
 
 def main():
     # --- For start city 0 ---
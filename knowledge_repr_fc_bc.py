@@ -1,3 +1,6 @@
+from spatial_index import SpatialIndex, parse_location
+from triple_store import TripleStore
+
 room_kb = {
     "furniture": ["desk", "chair", "bed", "wardrobe", "bookshelf"],
     "windows": {"window1": "wall3", "window2": "wall4"},
@@ -25,51 +28,124 @@ room_kb = {
 "bookshelf"], "bookshelf": ["bed"]}
     }
 }
+
+# Rules over the facts built from room_kb: the relations are two-way, and
+# whatever is next to an item is also near it.
+RULES = [
+    (("?b", "right_of", "?a"), [("?a", "left_of", "?b")]),
+    (("?b", "left_of", "?a"), [("?a", "right_of", "?b")]),
+    (("?b", "next_to", "?a"), [("?a", "next_to", "?b")]),
+    (("?a", "is_near", "?b"), [("?a", "next_to", "?b")]),
+    (("?b", "is_near", "?a"), [("?a", "is_near", "?b")]),
+]
+
+
+def build_store(kb):
+    """
+    Facts for a room knowledge base: category membership, what each window
+    and door is on, anchors parsed out of the location text, and the
+    relations. (x, "left_of", y) reads "x is to the left of y"; in kb it is
+    stored as relations["left_of"][y] = x.
+    """
+    store = TripleStore()
+    for category, members in kb.items():
+        if category not in ("locations", "relations"):
+            for member in members:
+                store.add(member, "in_category", category)
+    for group in ("windows", "door"):
+        for opening, wall in kb.get(group, {}).items():
+            store.add(opening, "on_wall", wall)
+    for corner, items in kb.get("corners", {}).items():
+        for item in items:
+            store.add(item, "in_corner", corner)
+    for item, location in kb.get("locations", {}).items():
+        store.add(item, "location", location)
+        for anchor in parse_location(location).anchors:
+            if anchor.startswith("wall"):
+                store.add(item, "at_wall", anchor)
+            elif anchor.startswith("corner"):
+                store.add(item, "in_corner", anchor)
+    for relation, pairs in kb.get("relations", {}).items():
+        for item, others in pairs.items():
+            for other in [others] if isinstance(others, str) else others:
+                store.add(other, relation, item)
+    for head, body in RULES:
+        store.add_rule(head, body)
+    store.forward_chain()
+    return store
+
+
+store = build_store(room_kb)
+index = SpatialIndex.from_kb(room_kb)
+
+
+def _one_or_all(answers, nothing):
+    if not answers:
+        return nothing
+    return answers[0] if len(answers) == 1 else answers
+
+
 # Rules (Query Functions)
 def get_furniture():
     """Returns a list of furniture in the room."""
-    return room_kb["furniture"]
+    return store.subjects("in_category", "furniture")
 
 def count_items(category):
     """Counts the number of items in a given category (e.g., doors, windows)."""
-    return len(room_kb.get(category, {}))
+    return len(store.subjects("in_category", category))
 
 def where_is(item):
     """Returns the location of a given item."""
-    return room_kb["locations"].get(item, "Unknown location")
+    return _one_or_all(store.objects(item, "location"), "Unknown location")
 
 def what_is_at_wall(wall):
     """Returns a list of items located at a given wall."""
-    return [item for item, loc in room_kb["locations"].items() if wall in loc]
+    return store.subjects("at_wall", wall)
 
 def what_is_at_corner(corner):
     """Returns a list of items located at a given corner."""
-    return room_kb["corners"].get(corner, [])
+    return store.subjects("in_corner", corner)
 
 def left_of(item):
     """Returns what is to the left of a given item."""
-    return room_kb["relations"]["left_of"].get(item, "Nothing to the left")
+    return _one_or_all(store.subjects("left_of", item), "Nothing to the left")
 
 def right_of(item):
     """Returns what is to the right of a given item."""
-    return room_kb["relations"]["right_of"].get(item, "Nothing to the right")
+    return _one_or_all(store.subjects("right_of", item), "Nothing to the right")
 
 def next_to(item):
     """Returns what is next to a given item."""
-    return room_kb["relations"]["next_to"].get(item, "Nothing next to it")
+    return _one_or_all(store.subjects("next_to", item), "Nothing next to it")
 
 def is_near(item):
     """Returns a list of items near a given item."""
-    return room_kb["relations"]["is_near"].get(item, "Nothing nearby")
-
-print("1. What furniture is in the room?", get_furniture())
-print("2. How many doors are in the room?", count_items("door"))
-print("   How many windows are in the room?", count_items("windows"))
-
-print("3. Where is the table (desk)?", where_is("desk"))
-print("   Where is the chair?", where_is("chair"))
-print("4. What is to the left of the desk?", left_of("desk"))
-print("   What is to the right of the chair?", right_of("chair"))
-print("6. What is at wall2?", what_is_at_wall("wall2"))
-print("7. What is in corner1?", what_is_at_corner("corner1"))
-print("8. What is next to the bed?", next_to("bed"))
\ No newline at end of file
+    return store.subjects("is_near", item) or "Nothing nearby"
+
+def closest_to(item, k=1):
+    """Returns the k items closest to a given item, by their estimated positions."""
+    return _one_or_all([name for name, _ in index.nearest(item, k)], "Nothing else in the room")
+
+def within(item, radius):
+    """Returns the items within radius (metres) of a given item, closest first."""
+    return index.near(item, radius) or "Nothing that close"
+
+def main():
+    print("1. What furniture is in the room?", get_furniture())
+    print("2. How many doors are in the room?", count_items("door"))
+    print("   How many windows are in the room?", count_items("windows"))
+
+    print("3. Where is the table (desk)?", where_is("desk"))
+    print("   Where is the chair?", where_is("chair"))
+    print("4. What is to the left of the desk?", left_of("desk"))
+    print("   What is to the right of the chair?", right_of("chair"))
+    print("6. What is at wall2?", what_is_at_wall("wall2"))
+    print("7. What is in corner1?", what_is_at_corner("corner1"))
+    print("8. What is next to the bed?", next_to("bed"))
+    print("9. What is near the bed (backward chaining)?",
+          [s for s, _, _ in store.prove("?x", "is_near", "bed")])
+    print("10. What is closest to the desk?", closest_to("desk", 2))
+    print("    What is within 2.5m of the bed?", within("bed", 2.5))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import heapq
+import random
+import sys
+
+import numpy as np
+
+from bidirectional_search import reverse_graph
+from csr_graph import label_array, labels_from_array
+
+
+def shortest_path_tree(graph, source):
+    """Dijkstra from source over the whole graph: returns (dist, parent) dicts."""
+    dist = {source: 0}
+    parent = {source: None}
+    heap = [(0, source)]
+    closed = set()
+    while heap:
+        cost, node = heapq.heappop(heap)
+        if node in closed:
+            continue
+        closed.add(node)
+        for neighbor, weight in graph.get(node, []):
+            new_cost = cost + weight
+            if new_cost < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_cost
+                parent[neighbor] = node
+                heapq.heappush(heap, (new_cost, neighbor))
+    return dist, parent
+
+
+class LandmarkHeuristic:
+    """
+    ALT lower bound on the distance from a node to one goal:
+    h(v) = max over landmarks L of d(L, goal) - d(L, v) and d(v, L) - d(goal, L).
+    Indexable like the heuristics dict that a_star_search expects; 0
+    everywhere if the goal is not in the graph.
+    """
+
+    def __init__(self, landmarks, goal):
+        self.landmarks = landmarks
+        goal_id = landmarks.ids.get(goal)
+        self.goal_forward = None if goal_id is None else landmarks.forward[goal_id]
+        self.goal_backward = None if goal_id is None else landmarks.backward[goal_id]
+
+    def __getitem__(self, node):
+        node_id = self.landmarks.ids.get(node)
+        if node_id is None or self.goal_forward is None:
+            return 0
+        with np.errstate(invalid="ignore"):
+            bounds = np.concatenate((self.goal_forward - self.landmarks.forward[node_id],
+                                     self.landmarks.backward[node_id] - self.goal_backward))
+        bounds = bounds[~np.isnan(bounds)]  # inf - inf: landmark reaches neither node
+        return max(float(bounds.max()), 0.0) if len(bounds) else 0.0
+
+    def get(self, node, default=None):
+        return self[node]
+
+
+class Landmarks:
+    """
+    Precomputed landmark distance tables for ALT heuristics.
+
+    forward[v, i] = d(landmark_i, v) and backward[v, i] = d(v, landmark_i),
+    stored as (nodes x landmarks) float arrays, so one node's bounds are one
+    contiguous row. Unreachable entries are inf.
+    """
+
+    def __init__(self, labels, landmarks, forward, backward):
+        self.labels = labels
+        self.ids = {label: i for i, label in enumerate(labels)}
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+
+    @classmethod
+    def build(cls, graph, k=8, method="avoid", seed=0):
+        """Select k landmarks ("farthest" or "avoid") and compute their distance tables."""
+        labels = list(graph)
+        for neighbors in graph.values():
+            labels.extend(neighbor for neighbor, _ in neighbors)
+        labels = list(dict.fromkeys(labels))
+        reverse = reverse_graph(graph)
+        rng = random.Random(seed)
+        landmarks, forward, backward = [], [], []
+        table = cls(labels, landmarks, None, None)
+
+        k = min(k, len(labels))
+        while len(landmarks) < k:
+            if method == "farthest" or not landmarks:
+                landmark = table._farthest(graph, rng)
+            elif method == "avoid":
+                landmark = table._avoid(graph, rng)
+            else:
+                raise ValueError(f"Unknown landmark selection method: {method}")
+            if landmark is None or landmark in landmarks:
+                landmark = rng.choice([label for label in labels if label not in landmarks])
+            landmarks.append(landmark)
+            forward.append(table._column(shortest_path_tree(graph, landmark)[0]))
+            backward.append(table._column(shortest_path_tree(reverse, landmark)[0]))
+            table.forward = np.stack(forward, axis=1)
+            table.backward = np.stack(backward, axis=1)
+        return table
+
+    def _column(self, dist):
+        column = np.full(len(self.labels), np.inf)
+        for label, d in dist.items():
+            column[self.ids[label]] = d
+        return column
+
+    def _farthest(self, graph, rng):
+        """Reachable node whose distance to the nearest chosen landmark is largest."""
+        if not self.landmarks:
+            dist = shortest_path_tree(graph, rng.choice(self.labels))[0]
+            return max(dist, key=dist.get)
+        nearest = np.min(np.where(np.isinf(self.forward), -1, self.forward), axis=1)
+        nearest[[self.ids[landmark] for landmark in self.landmarks]] = -1
+        return self.labels[int(np.argmax(nearest))]
+
+    def _avoid(self, graph, rng):
+        """
+        Goldberg-Werneck "avoid": grow a shortest path tree from a random root,
+        weight each node by how badly the current landmarks bound its distance,
+        and walk down the heaviest landmark-free subtree to a leaf.
+        """
+        root = rng.choice(self.labels)
+        dist, parent = shortest_path_tree(graph, root)
+        children = {node: [] for node in dist}
+        for node, prev in parent.items():
+            if prev is not None:
+                children[prev].append(node)
+
+        # lower bound on d(root, node): d(L, node) - d(L, root) and d(root, L) - d(node, L)
+        root_id = self.ids[root]
+        size = {}
+        has_landmark = {}
+        landmark_set = set(self.landmarks)
+        # children before parents (by tree depth, not distance: zero-weight edges tie distances)
+        order = [root]
+        for node in order:
+            order.extend(children[node])
+        for node in reversed(order):
+            node_id = self.ids[node]
+            with np.errstate(invalid="ignore"):
+                lower = np.concatenate((self.forward[node_id] - self.forward[root_id],
+                                        self.backward[root_id] - self.backward[node_id]))
+            lower = lower[~np.isnan(lower)]
+            weight = dist[node] - (max(float(lower.max()), 0.0) if len(lower) else 0.0)
+            has_landmark[node] = node in landmark_set or any(has_landmark[c] for c in children[node])
+            size[node] = 0 if has_landmark[node] else weight + sum(size[c] for c in children[node])
+
+        node = root
+        while children[node]:
+            best = max(children[node], key=size.get)
+            if size[best] <= 0:
+                break
+            node = best
+        return node if node != root else None
+
+    def heuristic(self, goal):
+        """Admissible, consistent heuristic towards goal, usable as a_star_search's heuristics."""
+        return LandmarkHeuristic(self, goal)
+
+    def save(self, path):
+        # landmarks as label indices, so only labels CSRGraph cannot store plainly need pickle
+        np.savez(path, labels=label_array(self.labels),
+                 landmarks=np.array([self.ids[landmark] for landmark in self.landmarks], dtype=np.int64),
+                 forward=self.forward, backward=self.backward)
+
+    @classmethod
+    def load(cls, path, allow_pickle=False):
+        """Load tables written by save(); allow_pickle as in CSRGraph.load."""
+        data = np.load(path, allow_pickle=allow_pickle)
+        labels = labels_from_array(data["labels"])
+        landmarks = [labels[i] for i in data["landmarks"].tolist()]
+        return cls(labels, landmarks, data["forward"], data["backward"])
+
+
+def main():
+    from bidirectional_search import random_geometric_graph
+    from search_core import graph_search
+
+    num_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    graph, _ = random_geometric_graph(num_nodes, 1.6 / num_nodes ** 0.5, 13)
+    rng = random.Random(17)
+    pairs = [(rng.randrange(num_nodes), rng.randrange(num_nodes)) for _ in range(queries)]
+
+    plain = [graph_search(s, lambda node, t=t: node == t, graph.get) for s, t in pairs]
+    ucs_total = sum(stats["generated"] for _, _, stats in plain)
+    print(f"{queries} queries, {num_nodes} nodes: UCS mean nodes_gen {ucs_total / queries:.1f}")
+    for method in ("farthest", "avoid"):
+        for k in (4, 8, 16):
+            table = Landmarks.build(graph, k=k, method=method)
+            total = 0
+            for (s, t), (_, cost, _) in zip(pairs, plain):
+                _, alt_cost, stats = graph_search(s, lambda node, t=t: node == t, graph.get,
+                                                  heuristic=table.heuristic(t).__getitem__)
+                assert abs(alt_cost - cost) < 1e-9 or alt_cost == cost
+                total += stats["generated"]
+            print(f"ALT {method:<8} k={k:<2}  mean nodes_gen {total / queries:8.1f}  "
+                  f"({ucs_total / total:.1f}x fewer than UCS)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import heapq
+import sys
+import time
+from itertools import count
+
+import numpy as np
+
+from chebyshev import chebyshev_heuristic, manhattan_heuristic
+from grid_map import GridMap, warehouse_matrix
+
+# Movement model -> (8-connected?, heuristic); every move or wait takes one time step
+MODELS = {"manhattan": (False, manhattan_heuristic), "chebyshev": (True, chebyshev_heuristic)}
+
+
+class ReservationTable:
+    """
+    Cells and moves taken at given time steps. Prioritized planning fills
+    it with the paths already planned; CBS fills one per agent with that
+    agent's constraints.
+
+    cells[(cell, t)]: cell is taken at time t.
+    moves[(a, b, t)]: someone moves a -> b arriving at t, so moving b -> a
+    at t would swap through them.
+    parked[cell]: the time from which an agent sits on cell (its goal) for good.
+    latest[cell]: the last time cell is taken, so an agent only stops on
+    its goal once nobody else needs it.
+    """
+
+    def __init__(self):
+        self.cells = {}
+        self.moves = {}
+        self.parked = {}
+        self.latest = {}
+
+    def reserve(self, path, agent):
+        for t, cell in enumerate(path):
+            self.cells[(cell, t)] = agent
+            if t:
+                self.moves[(path[t - 1], cell, t)] = agent
+            self.latest[cell] = max(self.latest.get(cell, -1), t)
+        self.parked[path[-1]] = len(path) - 1
+
+    def forbid_cell(self, cell, t):
+        self.cells[(cell, t)] = None
+        self.latest[cell] = max(self.latest.get(cell, -1), t)
+
+    def forbid_move(self, a, b, t):
+        """Forbid moving a -> b arriving at t (stored the way reserve() stores the opposite move)."""
+        self.moves[(b, a, t)] = None
+
+    def blocked(self, cell, t):
+        return (cell, t) in self.cells or self.parked.get(cell, t + 1) <= t
+
+
+def _move_lists(grid):
+    """The masks as a list and the flat offsets each mask allows, built once per grid."""
+    if "offsets" not in grid._tables:
+        grid._tables["offsets"] = (grid.moves.reshape(-1).tolist(),
+                                   [[offset for offset, _ in moves] for moves in grid._step_table()])
+    return grid._tables["offsets"]
+
+
+def space_time_astar(grid, start, goal, heuristic, table, max_time, stats=None, avoid=None):
+    """
+    A* over (cell, time) states on a GridMap: each step moves along an
+    allowed move or waits, avoiding the cells and swaps in table, and the
+    goal only counts once no later reservation needs it. Among equally
+    short paths it prefers the one with the fewest clashes with avoid (the
+    other robots' current paths, for CBS). Returns the path as one flat
+    cell index per time step, or None within max_time.
+    """
+    cols = grid.cols
+    masks, steps = _move_lists(grid)
+    goal_row, goal_col = divmod(goal, cols)
+
+    def h(cell):
+        return heuristic(cell // cols, cell % cols, goal_row, goal_col)
+
+    if table.blocked(start, 0):
+        return None
+    settle_after = table.latest.get(goal, -1)
+    parent = {(start, 0): None}
+    tie = count()
+    frontier = [(h(start), 0, next(tie), 0, start)]
+    cells, moves, parked = table.cells, table.moves, table.parked
+    avoid = avoid or ReservationTable()
+    while frontier:
+        _, clashes, _, t, cell = heapq.heappop(frontier)
+        if stats is not None:
+            stats["expanded"] += 1
+        if cell == goal and t > settle_after:
+            path = []
+            state = (cell, t)
+            while state is not None:
+                path.append(state[0])
+                state = parent[state]
+            return path[::-1]
+        if t >= max_time:
+            continue
+        nt = t + 1
+        for nxt in [cell] + [cell + offset for offset in steps[masks[cell]]]:
+            if (nxt, nt) in parent or (nxt, nt) in cells or parked.get(nxt, nt + 1) <= nt:
+                continue
+            if (nxt, cell, nt) in moves:
+                continue
+            parent[(nxt, nt)] = (cell, t)
+            clash = avoid.blocked(nxt, nt) or (nxt, cell, nt) in avoid.moves
+            heapq.heappush(frontier, (nt + h(nxt), clashes + clash, next(tie), nt, nxt))
+    return None
+
+
+def first_conflict(paths):
+    """The earliest (kind, i, j, a, b, t) clash between two paths, or None. Agents stay on their goals."""
+    horizon = max(len(path) for path in paths)
+    for t in range(horizon):
+        seen = {}
+        for i, path in enumerate(paths):
+            cell = path[min(t, len(path) - 1)]
+            if cell in seen:
+                return ("cell", seen[cell], i, cell, cell, t)
+            seen[cell] = i
+        if t:
+            moved = {}
+            for i, path in enumerate(paths):
+                a, b = path[min(t - 1, len(path) - 1)], path[min(t, len(path) - 1)]
+                if a != b:
+                    if (b, a) in moved:
+                        return ("move", moved[(b, a)], i, b, a, t)
+                    moved[(a, b)] = i
+    return None
+
+
+def _count_conflicts(paths):
+    horizon = max(len(path) for path in paths)
+    conflicts = 0
+    for t in range(horizon):
+        cells = [path[min(t, len(path) - 1)] for path in paths]
+        conflicts += len(cells) - len(set(cells))
+    return conflicts
+
+
+class MultiAgentPlanner:
+    """
+    Collision-free paths for several robots on one GridMap, one cell per
+    robot per time step, no two robots on a cell or swapping along an edge
+    at the same time, each robot staying on its goal once there.
+
+    plan(mode="cbs") runs Conflict-Based Search (Sharon et al.): optimal in
+    the sum of arrival times, with space-time A* per agent under its CBS
+    constraints. plan(mode="prioritized") plans the agents one after the
+    other around a shared ReservationTable: much faster, not optimal, and
+    it can fail where CBS would succeed.
+    """
+
+    def __init__(self, grid, dist_type="manhattan", max_wait=None):
+        diagonal, self.heuristic = MODELS[dist_type]
+        if diagonal != grid.diagonal:
+            raise ValueError(f"{dist_type} movement needs a {'8' if diagonal else '4'}-connected grid")
+        self.grid = grid
+        self.max_wait = grid.rows + grid.cols if max_wait is None else max_wait
+        self.stats = {"expanded": 0, "low_level": 0, "nodes": 0}
+
+    def _horizon(self, start, goal):
+        """Single-robot shortest path length plus max_wait, or None if the goal is unreachable."""
+        path, _, _ = self.grid.astar(divmod(start, self.grid.cols), divmod(goal, self.grid.cols))
+        return len(path) - 1 + self.max_wait if path else None
+
+    def _low_level(self, start, goal, table, horizon, avoid=None):
+        self.stats["low_level"] += 1
+        return space_time_astar(self.grid, start, goal, self.heuristic, table, horizon, self.stats, avoid)
+
+    def plan(self, starts, goals, mode="cbs", max_nodes=10000):
+        """
+        One path per robot as a list of (row, col) per time step, or None if
+        none was found (for CBS, within max_nodes constraint-tree nodes).
+        """
+        self.stats = {"expanded": 0, "low_level": 0, "nodes": 0}  # per call, so max_nodes applies to each plan
+        cols = self.grid.cols
+        starts = [r * cols + c for r, c in starts]
+        goals = [r * cols + c for r, c in goals]
+        if len(set(starts)) < len(starts) or len(set(goals)) < len(goals):
+            raise ValueError("robots need distinct starts and distinct goals")
+        horizons = [self._horizon(s, g) for s, g in zip(starts, goals)]
+        if None in horizons:
+            return None
+        if mode == "prioritized":
+            paths = self._prioritized(starts, goals, horizons)
+        elif mode == "cbs":
+            paths = self._cbs(starts, goals, horizons, max_nodes)
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+        return None if paths is None else [[divmod(cell, cols) for cell in path] for path in paths]
+
+    def _prioritized(self, starts, goals, horizons):
+        table = ReservationTable()
+        # every robot's start is taken at time 0, so nobody plans through a robot that has not moved yet
+        for agent, start in enumerate(starts):
+            table.cells[(start, 0)] = agent
+        paths = []
+        for agent, (start, goal, horizon) in enumerate(zip(starts, goals, horizons)):
+            del table.cells[(start, 0)]
+            path = self._low_level(start, goal, table, horizon)
+            if path is None:
+                return None
+            table.reserve(path, agent)
+            paths.append(path)
+        return paths
+
+    def _cbs(self, starts, goals, horizons, max_nodes):
+        constraints = [() for _ in starts]  # per agent: (("cell", cell, t) | ("move", a, b, t), ...)
+
+        def replan(agent, agent_constraints, paths):
+            table = ReservationTable()
+            for constraint in agent_constraints:
+                if constraint[0] == "cell":
+                    table.forbid_cell(constraint[1], constraint[2])
+                else:
+                    table.forbid_move(*constraint[1:])
+            # conflict avoidance table: break ties towards paths that clash least with the others
+            avoid = ReservationTable()
+            for other, path in enumerate(paths):
+                if other != agent and path is not None:
+                    avoid.reserve(path, other)
+            return self._low_level(starts[agent], goals[agent], table, horizons[agent], avoid)
+
+        paths = [None] * len(starts)
+        for agent in range(len(starts)):
+            paths[agent] = replan(agent, (), paths)
+            if paths[agent] is None:
+                return None
+        tie = count()
+        open_list = [(sum(len(path) - 1 for path in paths), _count_conflicts(paths), next(tie), constraints, paths)]
+        while open_list:
+            _, _, _, constraints, paths = heapq.heappop(open_list)
+            self.stats["nodes"] += 1
+            conflict = first_conflict(paths)
+            if conflict is None:
+                return paths
+            if self.stats["nodes"] >= max_nodes:
+                return None
+            kind, i, j, a, b, t = conflict
+            for agent, constraint in ((i, ("cell", a, t) if kind == "cell" else ("move", a, b, t)),
+                                      (j, ("cell", a, t) if kind == "cell" else ("move", b, a, t))):
+                child_constraints = list(constraints)
+                child_constraints[agent] = constraints[agent] + (constraint,)
+                path = replan(agent, child_constraints[agent], paths)
+                if path is None:
+                    continue
+                child_paths = list(paths)
+                child_paths[agent] = path
+                heapq.heappush(open_list, (sum(len(p) - 1 for p in child_paths), _count_conflicts(child_paths),
+                                           next(tie), child_constraints, child_paths))
+        return None
+
+
+def random_tasks(matrix, agents, rng):
+    """Distinct random free start cells and distinct random free goal cells."""
+    free_cells = np.argwhere(np.asarray(matrix) != 1)
+    starts = free_cells[rng.choice(len(free_cells), agents, replace=False)]
+    goals = free_cells[rng.choice(len(free_cells), agents, replace=False)]
+    return [tuple(cell) for cell in starts.tolist()], [tuple(cell) for cell in goals.tolist()]
+
+
+def check_paths(paths, starts, goals):
+    """Assert the paths start and end where they should and never collide."""
+    assert [path[0] for path in paths] == list(starts) and [path[-1] for path in paths] == list(goals)
+    assert first_conflict(paths) is None
+
+
+def main():
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    counts = [int(arg) for arg in sys.argv[2:]] or [10, 25, 50, 100, 200]
+    matrix = warehouse_matrix(side, side, seed=0)
+    rng = np.random.default_rng(0)
+    # a few blocked edges on top of the racks, as in robo_path_actual
+    cells = rng.integers(side - 1, size=(side * side // 20, 2))
+    obstacles = {((int(r), int(c)), (int(r), int(c) + 1)) for r, c in cells}
+    for dist_type in ("manhattan", "chebyshev"):
+        grid = GridMap.from_blocked_edges(side, side, obstacles, dist_type == "chebyshev", matrix)
+        for agents in counts:
+            starts, goals = random_tasks(matrix, agents, np.random.default_rng(agents))
+            line = f"{side}x{side} {dist_type:<9} {agents:>3} robots:"
+            for mode in ("prioritized", "cbs"):
+                planner = MultiAgentPlanner(grid, dist_type)
+                start_time = time.perf_counter()
+                paths = planner.plan(starts, goals, mode, max_nodes=2000)
+                seconds = time.perf_counter() - start_time
+                if paths is None:
+                    line += f"  {mode} failed after {seconds:6.2f}s ({planner.stats['nodes']} CT nodes) |"
+                    continue
+                check_paths(paths, starts, goals)
+                cost = sum(len(path) - 1 for path in paths)
+                line += (f"  {mode} cost {cost} in {seconds:6.2f}s ({agents / seconds:7.1f} robots/s"
+                         f"{', %d CT nodes' % planner.stats['nodes'] if mode == 'cbs' else ''}) |")
+            print(line.rstrip(" |"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import sys
+import time
+
+from propositional import ModelChecker, assignments, popcount, random_cnf_formula, set_rows
+
+# Checker and shared stop flag used by the worker processes, set by
+# _init_worker before any shard runs (inherited copy-on-write under fork).
+_CHECKER = None
+_FORMULAS = None
+_STOP = None
+
+
+def _init_worker(checker, query, stop):
+    global _CHECKER, _FORMULAS, _STOP
+    _CHECKER, _STOP = checker, stop
+    _FORMULAS = checker.counterexample_formulas(query) if query is not None else (checker.variables, checker.compiled)
+
+
+def _count_shard(shard):
+    first_word, last_word = shard
+    return sum(popcount(words) for _, words in _CHECKER.conjunction_chunks(_FORMULAS[1], first_word, last_word))
+
+
+def _counterexample_shard(shard):
+    """First counterexample row in the shard, or None; gives up as soon as another worker has found one."""
+    first_word, last_word = shard
+    for start, words in _CHECKER.conjunction_chunks(_FORMULAS[1], first_word, last_word):
+        if _STOP.value:
+            return None
+        if words.any():
+            _STOP.value = 1
+            return int(set_rows(start, words)[0])
+    return None
+
+
+def shards(num_words, workers, per_worker=8):
+    """
+    Split the truth table into prefix shards: fixing the first s variables
+    gives 2^s aligned word ranges of equal size. s is chosen so every
+    worker gets about per_worker shards, which evens out shards the KB
+    prunes quickly.
+    """
+    count = 1
+    while count < workers * per_worker and count < num_words:
+        count *= 2
+    size = num_words // count
+    return [(start, start + size) for start in range(0, num_words, size)]
+
+
+def _run(checker, query, function, workers, per_worker):
+    workers = workers or os.cpu_count() or 1
+    variables, compiled = checker.counterexample_formulas(query) if query is not None \
+        else (checker.variables, checker.compiled)
+    num_words = compiled[0].num_words if compiled else max(1, (1 << len(variables)) // 64)
+    tasks = shards(num_words, workers, per_worker)
+    stop = multiprocessing.Value("b", 0, lock=False)
+    if workers == 1:
+        _init_worker(checker, query, stop)
+        return variables, (function(task) for task in tasks)
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() \
+        else multiprocessing.get_context()
+    pool = context.Pool(workers, initializer=_init_worker, initargs=(checker, query, stop))
+
+    def results():
+        try:
+            yield from pool.imap_unordered(function, tasks)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    return variables, results()
+
+
+def parallel_count_models(kb, variables=None, workers=None, per_worker=8):
+    """Model count of kb (a formula or list of formulas), summed over prefix shards run on a process pool."""
+    checker = kb if isinstance(kb, ModelChecker) else ModelChecker(kb, variables)
+    if not checker.compiled:
+        return 1 << checker.num_vars
+    _, counts = _run(checker, None, _count_shard, workers, per_worker)
+    return sum(counts)
+
+
+def parallel_entails(kb, query, variables=None, workers=None, per_worker=8):
+    """
+    Whether KB |= query, like ModelChecker.entails but with the shards on a
+    process pool. The first counterexample found (not necessarily the first
+    in row order) is returned and stops every worker: the others see the
+    shared flag between chunks, and unstarted shards are dropped.
+    """
+    checker = kb if isinstance(kb, ModelChecker) else ModelChecker(kb, variables)
+    variables, rows = _run(checker, query, _counterexample_shard, workers, per_worker)
+    for row in rows:
+        if row is not None:
+            rows.close()
+            return False, dict(zip(variables, assignments([row], len(variables))[0].tolist()))
+    return True, None
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [24, 28, 32]
+    worker_counts = (1, 2, 4, 8, 16)
+    print(f"{os.cpu_count()} CPUs available")
+    for num_vars in sizes:
+        variables = [f"X{v}" for v in range(1, num_vars + 1)]
+        kb = random_cnf_formula(num_vars, round(2.5 * num_vars), seed=num_vars)
+        checker = ModelChecker(kb, variables)
+        # counterexamples need X1..X4 all false, so they sit in the last sixteenth of the table
+        query = " | ".join(variables[:4])
+        for workers in worker_counts:
+            start_time = time.perf_counter()
+            count = parallel_count_models(checker, workers=workers)
+            count_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            entailed, _ = parallel_entails(checker, query, workers=workers)
+            entail_time = time.perf_counter() - start_time
+            if workers == 1:
+                base_time = count_time
+            print(f"N={num_vars:<3} workers={workers:<3} count {count} in {count_time:6.2f}s "
+                  f"(speedup {base_time / count_time:4.1f}x); entails {query}: {entailed} in {entail_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import heapq
+import random
+import sys
+import time
+from itertools import count
+
+
+class LazyBinaryHeap:
+    """heapq with lazy deletion: a decrease-key pushes a new entry and the old one goes stale."""
+
+    def __init__(self):
+        self.heap = []
+        self.entry = {}  # item -> (priority, seq) of its live entry
+        self.seq = count()
+        self.pushes = 0
+        self.stale_pops = 0
+
+    def push(self, item, priority):
+        """Insert item, or lower its priority. Returns False if it was already as good."""
+        live = self.entry.get(item)
+        if live is not None and live[0] <= priority:
+            return False
+        key = (priority, next(self.seq))
+        self.entry[item] = key
+        heapq.heappush(self.heap, (key, item))
+        self.pushes += 1
+        return True
+
+    def pop(self):
+        """Remove and return (priority, item) with the lowest priority."""
+        while True:
+            key, item = heapq.heappop(self.heap)
+            if self.entry.get(item) == key:
+                del self.entry[item]
+                return key[0], item
+            self.stale_pops += 1
+
+    def __contains__(self, item):
+        return item in self.entry
+
+    def __len__(self):
+        return len(self.entry)
+
+
+class IndexedDaryHeap:
+    """d-ary heap with a position index, so decrease-key sifts the entry in place."""
+
+    def __init__(self, d=4):
+        self.d = d
+        self.heap = []  # list of [priority, seq, item]; seq is unique, so lists compare by key
+        self.pos = {}  # item -> index in heap
+        self.seq = count()
+        self.pushes = 0
+        self.stale_pops = 0  # always 0, kept for a uniform interface
+
+    def push(self, item, priority):
+        index = self.pos.get(item)
+        if index is None:
+            self.heap.append([priority, next(self.seq), item])
+            index = len(self.heap) - 1
+        elif self.heap[index][0] <= priority:
+            return False
+        else:
+            self.heap[index][0] = priority
+            self.heap[index][1] = next(self.seq)
+        self.pushes += 1
+        self._sift_up(index)
+        return True
+
+    def pop(self):
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.pos[top[2]]
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return top[0], top[2]
+
+    def _sift_up(self, index):
+        heap, pos, d = self.heap, self.pos, self.d
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) // d
+            if heap[parent] < entry:
+                break
+            heap[index] = heap[parent]
+            pos[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        pos[entry[2]] = index
+
+    def _sift_down(self, index):
+        heap, pos, d = self.heap, self.pos, self.d
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            first = index * d + 1
+            if first >= size:
+                break
+            best = first
+            for child in range(first + 1, min(first + d, size)):
+                if heap[child] < heap[best]:
+                    best = child
+            if entry < heap[best]:
+                break
+            heap[index] = heap[best]
+            pos[heap[index][2]] = index
+            index = best
+        heap[index] = entry
+        pos[entry[2]] = index
+
+    def __contains__(self, item):
+        return item in self.pos
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class _PairingNode:
+    __slots__ = ("key", "item", "child", "sibling", "prev")
+
+    def __init__(self, key, item):
+        self.key = key
+        self.item = item
+        self.child = None
+        self.sibling = None
+        self.prev = None  # parent if leftmost child, else left sibling
+
+
+class PairingHeap:
+    """Pairing heap with O(1) insert/decrease-key and two-pass delete-min."""
+
+    def __init__(self):
+        self.root = None
+        self.nodes = {}  # item -> node
+        self.seq = count()
+        self.pushes = 0
+        self.stale_pops = 0  # always 0, kept for a uniform interface
+
+    @staticmethod
+    def _meld(a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if b.key < a.key:
+            a, b = b, a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        a.sibling = None
+        a.prev = None
+        return a
+
+    def push(self, item, priority):
+        node = self.nodes.get(item)
+        key = (priority, next(self.seq))
+        if node is None:
+            node = _PairingNode(key, item)
+            self.nodes[item] = node
+            self.root = self._meld(self.root, node)
+        elif node.key[0] <= priority:
+            return False
+        else:
+            node.key = key
+            if node is not self.root:
+                # cut the subtree rooted at node and meld it back with the root
+                if node.prev.child is node:
+                    node.prev.child = node.sibling
+                else:
+                    node.prev.sibling = node.sibling
+                if node.sibling is not None:
+                    node.sibling.prev = node.prev
+                node.sibling = node.prev = None
+                self.root = self._meld(self.root, node)
+        self.pushes += 1
+        return True
+
+    def pop(self):
+        root = self.root
+        del self.nodes[root.item]
+        # first pass: meld children pairwise left to right
+        pairs = []
+        child = root.child
+        while child is not None:
+            second = child.sibling
+            following = second.sibling if second is not None else None
+            child.sibling = child.prev = None
+            if second is not None:
+                second.sibling = second.prev = None
+            pairs.append(self._meld(child, second))
+            child = following
+        # second pass: meld right to left
+        new_root = None
+        for tree in reversed(pairs):
+            new_root = self._meld(tree, new_root)
+        self.root = new_root
+        return root.key[0], root.item
+
+    def __contains__(self, item):
+        return item in self.nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+class BucketQueue:
+    """
+    Monotone bucket (Dial) queue for non-negative integer priorities.
+    Pops must be non-decreasing, which holds for UCS and for A* with a
+    consistent heuristic; grid searches with unit steps fit this exactly.
+    """
+
+    def __init__(self):
+        self.buckets = {}  # priority -> {item: None}, insertion ordered
+        self.priority = {}  # item -> current priority
+        self.cursor = 0
+        self.pushes = 0
+        self.stale_pops = 0  # always 0, kept for a uniform interface
+
+    def push(self, item, priority):
+        if not float(priority).is_integer() or priority < self.cursor:
+            raise ValueError(f"BucketQueue needs monotone integer priorities, got {priority}")
+        priority = int(priority)
+        current = self.priority.get(item)
+        if current is not None:
+            if current <= priority:
+                return False
+            del self.buckets[current][item]
+        self.buckets.setdefault(priority, {})[item] = None
+        self.priority[item] = priority
+        self.pushes += 1
+        return True
+
+    def pop(self):
+        if not self.priority:
+            raise IndexError("pop from empty BucketQueue")
+        buckets = self.buckets
+        while not buckets.get(self.cursor):
+            buckets.pop(self.cursor, None)
+            self.cursor += 1
+        bucket = buckets[self.cursor]
+        item = next(iter(bucket))
+        del bucket[item]
+        del self.priority[item]
+        return self.cursor, item
+
+    def __contains__(self, item):
+        return item in self.priority
+
+    def __len__(self):
+        return len(self.priority)
+
+
+FRONTIERS = {
+    "heap": LazyBinaryHeap,
+    "dary": IndexedDaryHeap,
+    "pairing": PairingHeap,
+    "bucket": BucketQueue,
+}
+
+
+def make_frontier(kind="heap"):
+    """Create an empty frontier: "heap" (default), "dary", "pairing" or "bucket"."""
+    try:
+        return FRONTIERS[kind]()
+    except KeyError:
+        raise ValueError(f"Unknown frontier {kind!r}, choose from {sorted(FRONTIERS)}") from None
+
+
+def _grid_graph(side, wall_ratio, seed):
+    rng = random.Random(seed)
+    free = {(r, c) for r in range(side) for c in range(side) if rng.random() >= wall_ratio}
+    free |= {(0, 0), (side - 1, side - 1)}
+    graph = {}
+    for r, c in free:
+        graph[(r, c)] = [(cell, 1) for cell in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)) if cell in free]
+    return graph, (0, 0), (side - 1, side - 1)
+
+
+def _random_graph(num_nodes, degree, seed):
+    rng = random.Random(seed)
+    graph = {node: [(rng.randrange(num_nodes), rng.randint(1, 20)) for _ in range(degree)]
+             for node in range(num_nodes)}
+    return graph, 0, num_nodes - 1
+
+
+def _dijkstra(graph, start, goal, frontier):
+    dist = {start: 0}
+    frontier.push(start, 0)
+    while frontier:
+        cost, node = frontier.pop()
+        if node == goal:
+            return cost
+        for neighbor, weight in graph.get(node, []):
+            new_cost = cost + weight
+            if new_cost < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_cost
+                frontier.push(neighbor, new_cost)
+    return float('inf')
+
+
+def main():
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    num_nodes = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    cases = [
+        (f"grid {side}x{side}", _grid_graph(side, 0.25, 1)),
+        (f"random n={num_nodes} deg=8", _random_graph(num_nodes, 8, 2)),
+    ]
+    for name, (graph, start, goal) in cases:
+        for kind in FRONTIERS:
+            frontier = make_frontier(kind)
+            start_time = time.perf_counter()
+            cost = _dijkstra(graph, start, goal, frontier)
+            elapsed = time.perf_counter() - start_time
+            print(f"{name:<24} {kind:<8} cost={cost:<6} pushes={frontier.pushes:<8} "
+                  f"stale pops={frontier.stale_pops:<8} {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
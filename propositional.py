@@ -0,0 +1,402 @@
+import itertools
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+# Assignments are numbered in itertools.product([True, False], repeat=N)
+# order: row r gives variable k the value False iff bit N-1-k of r is set.
+# Row r lives in bit r % 64 of word r // 64, so one uint64 holds 64
+# assignments and every operator below tests 64 of them per machine word.
+WORD_BITS = 64
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+CHUNK_WORDS = 1 << 15  # 2M assignments (256 KB per intermediate) per evaluation
+
+# Words for the six lowest row bits: bit j of _LOW_PATTERNS[p] is set iff
+# bit p of j is clear, i.e. the variable is True in that row.
+_LOW_PATTERNS = [np.uint64(sum(1 << j for j in range(WORD_BITS) if not (j >> p) & 1)) for p in range(6)]
+
+_TOKEN = re.compile(r"\s*(?:(<=>|<->|=>|->|==|!=|[()~!&|^])|([A-Za-z_][A-Za-z0-9_]*))")
+_KEYWORDS = {"not": "~", "and": "&", "or": "|", "xor": "^"}
+_CONSTANTS = {"True": True, "False": False}
+
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise ValueError(f"Unexpected character {text[position:].lstrip()[:1]!r} in {text!r}")
+        operator, name = match.groups()
+        tokens.append(operator or _KEYWORDS.get(name, name))
+        position = match.end()
+    return tokens
+
+
+def parse(text):
+    """
+    Parse a propositional formula into nested tuples:
+    ("var", name), ("const", bool), ("not", f) or (op, f, g) with op one of
+    "and", "or", "xor", "implies", "iff".
+
+    Operators from loosest to tightest: <=> <-> == (iff) and != (xor), then
+    => -> (implies, right-associative), | or, ^ xor, & and, ~ ! not.
+    Unlike Python, "not A == B" means (not A) == B.
+    """
+    tokens = tokenize(text)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def binary(operand, operators):
+        left = operand()
+        while peek() in operators:
+            left = (operators[take()], left, operand())
+        return left
+
+    def iff():
+        return binary(implies, {"<=>": "iff", "<->": "iff", "==": "iff", "!=": "xor"})
+
+    def implies():
+        left = disjunction()
+        if peek() in ("=>", "->"):
+            take()
+            return ("implies", left, implies())
+        return left
+
+    def disjunction():
+        return binary(exclusive, {"|": "or"})
+
+    def exclusive():
+        return binary(conjunction, {"^": "xor"})
+
+    def conjunction():
+        return binary(negation, {"&": "and"})
+
+    def negation():
+        if peek() in ("~", "!"):
+            take()
+            return ("not", negation())
+        return atom()
+
+    def atom():
+        token = take() if peek() is not None else None
+        if token == "(":
+            inner = iff()
+            if peek() != ")":
+                raise ValueError(f"Missing ')' in {text!r}")
+            take()
+            return inner
+        if token in _CONSTANTS:
+            return ("const", _CONSTANTS[token])
+        if token is None or not (token[0].isalpha() or token[0] == "_"):
+            raise ValueError(f"Expected a variable at token {position} of {text!r}, got {token!r}")
+        return ("var", token)
+
+    formula = iff()
+    if peek() is not None:
+        raise ValueError(f"Unexpected {peek()!r} at token {position} of {text!r}")
+    return formula
+
+
+def variables_of(formulas):
+    """Variable names in order of first appearance."""
+    names = {}
+    stack = list(reversed(formulas))
+    while stack:
+        node = stack.pop()
+        if node[0] == "var":
+            names.setdefault(node[1], None)
+        elif node[0] != "const":
+            stack.extend(reversed(node[1:]))
+    return list(names)
+
+
+def conjuncts(formula):
+    """Split a formula at its top-level "and" nodes."""
+    parts = []
+    stack = [formula]
+    while stack:
+        node = stack.pop()
+        if node[0] == "and":
+            stack.extend((node[2], node[1]))
+        else:
+            parts.append(node)
+    return parts
+
+
+class CompiledFormula:
+    """
+    A formula compiled to postfix code over a fixed variable order and run
+    on whole uint64 words, so each operator is one NumPy call per chunk of
+    up to CHUNK_WORDS * 64 assignments.
+    """
+
+    def __init__(self, formula, variables):
+        self.variables = list(variables)
+        self.num_vars = len(self.variables)
+        index = {name: k for k, name in enumerate(self.variables)}
+        self.code = []
+        stack = [(formula, False)]
+        while stack:  # iterative post-order walk, so deep formulas don't hit the recursion limit
+            node, expanded = stack.pop()
+            if node[0] == "var":
+                if node[1] not in index:
+                    raise ValueError(f"Variable {node[1]} is not in {self.variables}")
+                self.code.append(("var", index[node[1]]))
+            elif node[0] == "const":
+                self.code.append(("const", ALL_ONES if node[1] else np.uint64(0)))
+            elif expanded:
+                self.code.append((node[0], None))
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node[1:]))
+        self._patterns = {}
+
+    @property
+    def num_words(self):
+        return max(1, (1 << self.num_vars) // WORD_BITS)
+
+    def _variable(self, k, first_word, num_words):
+        """Words for variable k: a scalar when it is constant over the chunk."""
+        p = self.num_vars - 1 - k
+        if p < 6:
+            return _LOW_PATTERNS[p]
+        q = p - 6
+        if num_words <= 1 << q:  # aligned chunk inside one half-period
+            return np.uint64(0) if (first_word >> q) & 1 else ALL_ONES
+        pattern = self._patterns.get((q, num_words))
+        if pattern is None:
+            words = np.arange(num_words, dtype=np.uint64)
+            pattern = np.where((words >> np.uint64(q)) & np.uint64(1), np.uint64(0), ALL_ONES)
+            self._patterns[(q, num_words)] = pattern
+        return pattern
+
+    def evaluate(self, first_word=0, num_words=None):
+        """
+        Truth table words for rows first_word * 64 onwards. Chunks must be
+        aligned: num_words a power of two and first_word a multiple of it.
+        """
+        if num_words is None:
+            num_words = self.num_words
+        stack = []  # (value, owned): owned arrays are temporaries that may be overwritten
+        for op, arg in self.code:
+            if op == "var":
+                value = self._variable(arg, first_word, num_words)
+                stack.append((value, False))
+            elif op == "const":
+                stack.append((arg, False))
+            elif op == "not":
+                value, owned = stack.pop()
+                stack.append((np.invert(value, out=value) if owned else ~value, isinstance(value, np.ndarray)))
+            else:
+                right, right_owned = stack.pop()
+                left, left_owned = stack.pop()
+                if op == "implies":
+                    left = np.invert(left, out=left) if left_owned else ~left
+                    left_owned = isinstance(left, np.ndarray)
+                if right_owned and not left_owned:
+                    left, right, left_owned = right, left, True
+                out = left if left_owned else None
+                if op in ("and",):
+                    value = np.bitwise_and(left, right, out=out)
+                elif op in ("or", "implies"):
+                    value = np.bitwise_or(left, right, out=out)
+                else:
+                    value = np.bitwise_xor(left, right, out=out)
+                    if op == "iff":
+                        value = np.invert(value, out=value) if isinstance(value, np.ndarray) else ~value
+                stack.append((value, isinstance(value, np.ndarray)))
+        value, owned = stack.pop()
+        if not owned:
+            value = np.full(num_words, value, dtype=np.uint64)
+        if self.num_vars < 6:  # fewer than 64 rows: clear the unused bits
+            value &= np.uint64((1 << (1 << self.num_vars)) - 1)
+        return value
+
+    def chunks(self, chunk_words=CHUNK_WORDS, first_word=0, last_word=None):
+        """Yield (first_word, words) over the truth table (or the aligned range given) chunk by chunk."""
+        last_word = self.num_words if last_word is None else last_word
+        chunk_words = min(chunk_words, last_word - first_word)
+        for start in range(first_word, last_word, chunk_words):
+            yield start, self.evaluate(start, chunk_words)
+
+
+def popcount(words):
+    """Number of set bits in a uint64 array."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(_BYTE_COUNTS[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+_BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def set_rows(first_word, words):
+    """Row numbers of the set bits, in increasing order."""
+    nonzero = np.flatnonzero(words)
+    bits = np.unpackbits(words[nonzero].view(np.uint8), bitorder="little").reshape(-1, WORD_BITS)
+    which, bit = np.nonzero(bits)
+    return (first_word + nonzero[which]).astype(np.int64) * WORD_BITS + bit
+
+
+def assignments(rows, num_vars):
+    """(len(rows) x num_vars) bool array of the assignments numbered by rows."""
+    shifts = np.arange(num_vars - 1, -1, -1, dtype=np.int64)
+    return (np.asarray(rows, dtype=np.int64)[:, None] >> shifts) & 1 == 0
+
+
+class ModelChecker:
+    """
+    Truth-table model checking over compiled formulas. kb is a formula
+    string or a list of them (their conjunction); variables fixes the order
+    of variables in models and defaults to order of first appearance.
+
+    The 2^N assignments are streamed chunk by chunk and never materialized;
+    within a chunk the KB's conjuncts are evaluated one at a time and the
+    rest are skipped once no assignment in the chunk survives.
+    """
+
+    def __init__(self, kb, variables=None, chunk_words=CHUNK_WORDS):
+        formulas = [kb] if isinstance(kb, str) else list(kb)
+        self.kb = [part for formula in formulas for part in conjuncts(parse(formula))]
+        self.variables = list(variables) if variables is not None else variables_of(self.kb)
+        self.chunk_words = chunk_words
+        self.compiled = self._compile(self.variables)
+
+    def _compile(self, variables):
+        return [CompiledFormula(formula, variables) for formula in self.kb]
+
+    @property
+    def num_vars(self):
+        return len(self.variables)
+
+    def conjunction_chunks(self, compiled, first_word=0, last_word=None):
+        """Yield (first_word, words) with the rows where every compiled formula holds."""
+        if not compiled:
+            compiled = [CompiledFormula(("const", True), self.variables)]
+        last_word = compiled[0].num_words if last_word is None else last_word
+        chunk_words = min(self.chunk_words, last_word - first_word)
+        for start in range(first_word, last_word, chunk_words):
+            words = compiled[0].evaluate(start, chunk_words)
+            for formula in compiled[1:]:
+                if not words.any():
+                    break
+                words &= formula.evaluate(start, chunk_words)
+            yield start, words
+
+    def count_models(self, first_word=0, last_word=None):
+        """Number of models, optionally over an aligned range of truth-table words only."""
+        return sum(popcount(words) for _, words in self.conjunction_chunks(self.compiled, first_word, last_word))
+
+    def models(self):
+        """Yield every model as a tuple of bools, in itertools.product([True, False]) order."""
+        for start, words in self.conjunction_chunks(self.compiled):
+            if words.any():
+                for row in assignments(set_rows(start, words), self.num_vars).tolist():
+                    yield tuple(row)
+
+    def is_satisfiable(self):
+        return any(words.any() for _, words in self.conjunction_chunks(self.compiled))
+
+    def counterexample_formulas(self, query):
+        """
+        (variables, compiled formulas) whose conjunction holds exactly on the
+        KB models falsifying query. Variables only in the query are added
+        after the KB's.
+        """
+        query = parse(query) if isinstance(query, str) else query
+        variables = self.variables + [name for name in variables_of([query]) if name not in self.variables]
+        compiled = self._compile(variables) if variables != self.variables else self.compiled
+        return variables, [CompiledFormula(("not", query), variables)] + compiled
+
+    def entails(self, query, first_word=0, last_word=None):
+        """
+        Whether KB |= query. Returns (entailed, counterexample) where the
+        counterexample is the first model of the KB falsifying the query, as
+        a {name: bool} dict, or None. Stops at the first chunk with a
+        counterexample.
+        """
+        variables, compiled = self.counterexample_formulas(query)
+        for start, words in self.conjunction_chunks(compiled, first_word, last_word):
+            if words.any():
+                row = set_rows(start, words)[0]
+                return False, dict(zip(variables, assignments([row], len(variables))[0].tolist()))
+        return True, None
+
+
+def random_cnf_formula(num_vars, num_clauses, k=3, seed=0):
+    """Random k-CNF as one formula string over variables X1..Xn."""
+    rng = random.Random(seed)
+    clauses = []
+    for _ in range(num_clauses):
+        literals = [("~" if rng.random() < 0.5 else "") + f"X{v}"
+                    for v in rng.sample(range(1, num_vars + 1), k)]
+        clauses.append("(" + " | ".join(literals) + ")")
+    return " & ".join(clauses)
+
+
+def evaluate(formula, assignment):
+    """Truth value of a parsed formula under {name: bool}, one node at a time (the reference semantics)."""
+    op = formula[0]
+    if op == "var":
+        return assignment[formula[1]]
+    if op == "const":
+        return formula[1]
+    if op == "not":
+        return not evaluate(formula[1], assignment)
+    left, right = evaluate(formula[1], assignment), evaluate(formula[2], assignment)
+    if op == "and":
+        return left and right
+    if op == "or":
+        return left or right
+    if op == "xor":
+        return left != right
+    if op == "implies":
+        return not left or right
+    return left == right
+
+
+def _count_with_product(kb, variables):
+    """Row-at-a-time count over itertools.product, as Model_Checking.py used to do."""
+    count = 0
+    for values in itertools.product([True, False], repeat=len(variables)):
+        assignment = dict(zip(variables, values))
+        if all(evaluate(formula, assignment) for formula in kb):
+            count += 1
+    return count
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [16, 20, 24, 28, 30]
+    for num_vars in sizes:
+        kb = random_cnf_formula(num_vars, round(2.5 * num_vars), seed=num_vars)
+        checker = ModelChecker(kb, [f"X{v}" for v in range(1, num_vars + 1)])
+        start_time = time.perf_counter()
+        count = checker.count_models()
+        elapsed = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        entailed, counterexample = checker.entails("X1 | X2 | ~X3")
+        entail_time = time.perf_counter() - start_time
+        line = (f"N={num_vars:<3} {len(checker.kb)} clauses: {count} models in {elapsed:.2f}s "
+                f"({2 ** num_vars / elapsed / 1e6:.0f}M assignments/s); "
+                f"entails X1|X2|~X3: {entailed} in {entail_time:.3f}s")
+        if num_vars <= 16:
+            start_time = time.perf_counter()
+            assert _count_with_product(checker.kb, checker.variables) == count
+            line += f"; itertools.product+eval {time.perf_counter() - start_time:.2f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import heapq
+import os
+import sys
+import time
+from collections import deque
+from itertools import count
+
+
+def reconstruct_path(parent, node):
+    """Follow parent pointers from node back to the start (whose parent is None)."""
+    path = [node]
+    node = parent[node]
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+def graph_search(start, is_goal, successors, strategy="priority", heuristic=None):
+    """
+    Graph search that keeps one parent pointer per closed state instead of a
+    path copy per frontier entry, and rebuilds the path once at the goal.
+
+    strategy is "priority" (UCS, or A* when heuristic is given), "fifo" (BFS)
+    or "lifo" (DFS). successors(state) yields (next_state, step_cost) pairs.
+    Frontier entries carry their parent state, which becomes the state's
+    parent pointer the first time it is popped, so the path returned is the
+    same one a path-copying search would have returned.
+
+    Returns (path, cost, stats) where stats counts "generated" states
+    (start included), "expanded" states and frontier "popped" entries.
+    Returns ([], inf, stats) when no goal is reachable.
+    """
+    stats = {"generated": 1, "expanded": 0, "popped": 0}
+    parent = {}
+
+    if strategy == "priority":
+        tie = count()
+        h = heuristic or (lambda state: 0)
+        frontier = [(h(start), next(tie), 0, start, None)]
+        pop = lambda: heapq.heappop(frontier)[2:]
+        push = lambda g, state, prev: heapq.heappush(frontier, (g + h(state), next(tie), g, state, prev))
+    elif strategy in ("fifo", "lifo"):
+        frontier = deque([(0, start, None)])
+        pop = frontier.popleft if strategy == "fifo" else frontier.pop
+        push = lambda g, state, prev: frontier.append((g, state, prev))
+    else:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    while frontier:
+        g, state, prev = pop()
+        stats["popped"] += 1
+        if state in parent:
+            continue
+        parent[state] = prev
+
+        if is_goal(state):
+            return reconstruct_path(parent, state), g, stats
+
+        stats["expanded"] += 1
+        for next_state, step_cost in successors(state):
+            if next_state not in parent:
+                stats["generated"] += 1
+                push(g + step_cost, next_state, state)
+
+    return [], float('inf'), stats
+
+
+def _path_copy_search(start, is_goal, successors, heuristic):
+    """The previous A*/UCS scheme, pushing curr_path + [neighbor]; kept for the benchmark."""
+    tie = count()
+    frontier = [(heuristic(start), next(tie), 0, start, [start])]
+    closed = set()
+    expanded = 0
+    while frontier:
+        _, _, g, state, path = heapq.heappop(frontier)
+        if state in closed:
+            continue
+        closed.add(state)
+        if is_goal(state):
+            return path, g, expanded
+        expanded += 1
+        for next_state, step_cost in successors(state):
+            if next_state not in closed:
+                heapq.heappush(frontier, (g + step_cost + heuristic(next_state), next(tie),
+                                          g + step_cost, next_state, path + [next_state]))
+    return [], float('inf'), expanded
+
+
+def _measure(run):
+    """Run in a forked child and return (peak RSS in MB, seconds, expansions)."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        start_time = time.perf_counter()
+        expanded = run()
+        os.write(write_fd, f"{time.perf_counter() - start_time} {expanded}".encode())
+        os._exit(0)
+    os.close(write_fd)
+    seconds, expanded = os.read(read_fd, 64).decode().split()
+    os.close(read_fd)
+    _, _, rusage = os.wait4(pid, 0)
+    return rusage.ru_maxrss / 1024, float(seconds), int(expanded)
+
+
+def main():
+    from towers_of_hanoi import TowersOfHanoiSolver
+
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    disks = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    # Serpentine corridor: every other row is a wall with a gap at alternating ends,
+    # so the only path snakes through the whole grid (length ~ side^2 / 2).
+    def corridor_successors(cell):
+        r, c = cell
+        for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nr < side and 0 <= nc < side:
+                if nr % 2 == 1 and nc != (side - 1 if nr % 4 == 1 else 0):
+                    continue
+                yield (nr, nc), 1
+    corridor_goal = (side - 1 if (side - 1) % 2 == 0 else side - 2, 0)
+
+    def open_successors(cell):
+        r, c = cell
+        for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nr < side and 0 <= nc < side:
+                yield (nr, nc), 1
+
+    hanoi = TowersOfHanoiSolver(disks)
+    hanoi_start = tuple((0, i) for i in range(disks))
+
+    cases = [
+        (f"corridor {side}x{side}", (0, 0), lambda s: s == corridor_goal, corridor_successors, lambda s: 0),
+        (f"open grid {side}x{side}", (0, 0), lambda s: s == (side - 1, side - 1), open_successors, lambda s: 0),
+        (f"hanoi n={disks}", hanoi_start, lambda s: s == hanoi.goal,
+         lambda s: ((nxt, 1) for nxt in hanoi.successors(s)), hanoi.heuristic),
+    ]
+    for name, start, is_goal, successors, heuristic in cases:
+        before = _measure(lambda: _path_copy_search(start, is_goal, successors, heuristic)[2])
+        after = _measure(lambda: graph_search(start, is_goal, successors, heuristic=heuristic)[2]["expanded"])
+        for label, (rss, seconds, expanded) in (("path copies", before), ("parent pointers", after)):
+            print(f"{name:<20} {label:<16} peak RSS {rss:8.1f} MB  "
+                  f"{seconds / max(expanded, 1) * 1e6:6.2f} us/expansion  ({expanded} expansions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+import heapq
+import math
+import re
+import sys
+import time
+
+import numpy as np
+
+_POINT = re.compile(r"\(\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*\)")
+_ANCHOR = re.compile(r"^(wall|corner|window|door)\s*(\d*)$")
+_ARTICLE = re.compile(r"^(?:the|a|an)\s+")
+_RELATION = re.compile(r"^(in front of|behind|left|right|next to|near|on|at)\b\s*(?:\((\w+)\))?\s*(?:of\s+|to\s+)?(.+)$")
+
+
+class Location:
+    """
+    A parsed location description: anchors (names like "wall4", "corner4",
+    "window2"), relations [(relation, target, side)] such as
+    ("right", "desk", "front"), and an explicit (x, y) point if one was given.
+    """
+
+    def __init__(self, anchors=(), relations=(), point=None):
+        self.anchors = list(anchors)
+        self.relations = list(relations)
+        self.point = point
+
+    def __repr__(self):
+        return f"Location(anchors={self.anchors}, relations={self.relations}, point={self.point})"
+
+
+def parse_location(text):
+    """
+    Parse free-text locations like "corner 4, wall4, in front of window2",
+    "right(front) of desk" or "(12.5, 3)". Anchors are whole tokens, so
+    "wall1" never matches "wall10".
+    """
+    point = None
+    match = _POINT.search(text)
+    if match:
+        point = (float(match.group(1)), float(match.group(2)))
+        text = text[:match.start()] + text[match.end():]
+    anchors, relations = [], []
+    for part in text.split(","):
+        part = " ".join(part.lower().split())
+        if not part:
+            continue
+        relation = _RELATION.match(part)
+        if relation and relation.group(1) not in ("on", "at"):
+            target = _ARTICLE.sub("", relation.group(3))
+            anchor = _ANCHOR.match(target)
+            if anchor:  # "corner 3" -> "corner3"
+                target = anchor.group(1) + anchor.group(2)
+            relations.append((relation.group(1).replace(" ", "_"), target, relation.group(2)))
+            continue
+        if relation:  # "on wall2", "at corner 3"
+            part = relation.group(3)
+        anchor = _ANCHOR.match(part)
+        if anchor:
+            anchors.append(anchor.group(1) + anchor.group(2))
+    return Location(anchors, relations, point)
+
+
+class FloorPlan:
+    """
+    A polygonal room. corner{i} is the i-th vertex (from 1) and wall{i}
+    runs from corner{i-1} to corner{i}, so wall1 starts at the last corner.
+    For the clockwise rectangle from rectangle(), wall1 is the top
+    (y = depth) and the walls go clockwise; "right" of something on a wall
+    is along the wall's direction, as seen facing it from inside.
+    """
+
+    def __init__(self, vertices):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        n = len(self.vertices)
+        self.starts = self.vertices[np.arange(-1, n - 1)]
+        self.ends = self.vertices
+        x, y = self.vertices[:, 0], self.vertices[:, 1]
+        area = 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+        direction = self.ends - self.starts
+        self.tangents = direction / np.linalg.norm(direction, axis=1)[:, None]
+        sign = -1.0 if area < 0 else 1.0  # clockwise polygons turn right to face inward
+        self.normals = sign * np.stack((-self.tangents[:, 1], self.tangents[:, 0]), axis=1)
+        if area > 0:  # counter-clockwise: right of something, facing the wall, runs against the wall
+            self.tangents = -self.tangents
+        self.walls = {f"wall{i}": i - 1 for i in range(1, n + 1)}
+        self.corners = {f"corner{i}": i - 1 for i in range(1, n + 1)}
+
+    @classmethod
+    def rectangle(cls, width, depth):
+        return cls([(width, depth), (width, 0.0), (0.0, 0.0), (0.0, depth)])
+
+    def wall_point(self, wall, fraction=0.5, inset=0.0):
+        i = self.walls[wall]
+        return self.starts[i] + fraction * (self.ends[i] - self.starts[i]) + inset * self.normals[i]
+
+    def corner_point(self, corner, inset=0.0):
+        i = self.corners[corner]
+        inward = self.normals[i] + self.normals[(i + 1) % len(self.vertices)]
+        return self.vertices[i] + inset * inward
+
+    def snap_to_wall(self, point, wall, inset=0.0):
+        """Closest point on the wall segment, moved inset into the room."""
+        i = self.walls[wall]
+        start, end = self.starts[i], self.ends[i]
+        t = np.clip(np.dot(point - start, end - start) / np.dot(end - start, end - start), 0.0, 1.0)
+        return start + t * (end - start) + inset * self.normals[i]
+
+    def wall_distances(self, points):
+        """(len(points) x walls) distances from each point to each wall segment."""
+        points = np.asarray(points, dtype=np.float64)[:, None, :]
+        start, segment = self.starts[None], (self.ends - self.starts)[None]
+        t = np.clip(np.sum((points - start) * segment, axis=2) / np.sum(segment * segment, axis=2), 0.0, 1.0)
+        return np.linalg.norm(points - (start + t[..., None] * segment), axis=2)
+
+
+class SpatialIndex:
+    """
+    Items at (x, y) points in a uniform grid of cell_size buckets, with
+    inverse maps from anchors (walls, corners, windows, doors) and from
+    relations ("right", "desk") to items, so "what is at wall10" and
+    "what is right of the desk" are dict lookups, and near/nearest
+    queries only look at the grid cells around the query point.
+
+    Items added without anchors get them from geometry: every wall within
+    touch of the point, and every corner within touch along both walls.
+    """
+
+    def __init__(self, plan, cell_size=1.0, touch=0.75):
+        self.plan = plan
+        self.cell_size = cell_size
+        self.touch = touch
+        self.names = []
+        self.ids = {}
+        self.coords = np.empty((1024, 2))
+        self.grid = {}  # (cx, cy) -> list of item ids
+        self.lowest = [0, 0]  # grid extent, to stop ring searches
+        self.highest = [0, 0]
+        self.anchored = {}  # anchor -> set of item ids
+        self.anchors_of = {}  # item id -> set of anchors
+        self.related = {}  # (relation, target) -> set of item ids
+        self.relations_of = {}  # item id -> set of (relation, target)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _cell(self, point):
+        return int(math.floor(point[0] / self.cell_size)), int(math.floor(point[1] / self.cell_size))
+
+    def _geometric_anchors(self, points):
+        distances = self.plan.wall_distances(points)
+        at_wall = distances <= self.touch
+        in_corner = at_wall & np.roll(at_wall, -1, axis=1)  # corner i joins wall i and wall i + 1
+        walls, corners = list(self.plan.walls), list(self.plan.corners)
+        return [[walls[j] for j in np.flatnonzero(row)] + [corners[j] for j in np.flatnonzero(corner_row)]
+                for row, corner_row in zip(at_wall, in_corner)]
+
+    def add(self, name, point, anchors=None, relations=()):
+        """Add (or move) an item; anchors=None derives them from the point."""
+        self.add_many([name], [point], None if anchors is None else [anchors], [relations])
+
+    def add_many(self, names, points, anchors=None, relations=None):
+        """Bulk add: cells and geometric anchors are computed for all points at once."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if anchors is None:
+            anchors = self._geometric_anchors(points)
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        for i, name in enumerate(names):
+            if name in self.ids:
+                self.remove(name)
+            item = len(self.names)
+            self.names.append(name)
+            self.ids[name] = item
+            if item == len(self.coords):
+                self.coords = np.concatenate((self.coords, np.empty_like(self.coords)))
+            self.coords[item] = points[i]
+            cell = (int(cells[i, 0]), int(cells[i, 1]))
+            self.grid.setdefault(cell, []).append(item)
+            for axis in (0, 1):
+                self.lowest[axis] = min(self.lowest[axis], cell[axis])
+                self.highest[axis] = max(self.highest[axis], cell[axis])
+            self.anchors_of[item] = set(anchors[i])
+            for anchor in anchors[i]:
+                self.anchored.setdefault(anchor, set()).add(item)
+            self.relations_of[item] = set(relations[i]) if relations is not None else set()
+            for relation in self.relations_of[item]:
+                self.related.setdefault(relation, set()).add(item)
+
+    def remove(self, name):
+        """Remove an item; its id slot is reused by the last item so ids stay dense."""
+        item = self.ids.pop(name)
+        self.grid[self._cell(self.coords[item])].remove(item)
+        for anchor in self.anchors_of.pop(item):
+            self.anchored[anchor].discard(item)
+        for relation in self.relations_of.pop(item):
+            self.related[relation].discard(item)
+        last = len(self.names) - 1
+        if item != last:  # move the last item into the freed id
+            moved = self.names[last]
+            cell = self.grid[self._cell(self.coords[last])]
+            cell[cell.index(last)] = item
+            self.coords[item] = self.coords[last]
+            self.names[item] = moved
+            self.ids[moved] = item
+            self.anchors_of[item] = self.anchors_of.pop(last)
+            for anchor in self.anchors_of[item]:
+                self.anchored[anchor].discard(last)
+                self.anchored[anchor].add(item)
+            self.relations_of[item] = self.relations_of.pop(last)
+            for relation in self.relations_of[item]:
+                self.related[relation].discard(last)
+                self.related[relation].add(item)
+        self.names.pop()
+
+    def position(self, name):
+        return tuple(self.coords[self.ids[name]].tolist())
+
+    def anchors(self, name):
+        return sorted(self.anchors_of[self.ids[name]])
+
+    def at(self, anchor):
+        """Items at a wall, in a corner, or by a window or door."""
+        return sorted(self.names[item] for item in self.anchored.get(anchor, ()))
+
+    def relative_to(self, relation, target):
+        """Items described as being in relation to target, e.g. relative_to("right", "desk")."""
+        return sorted(self.names[item] for item in self.related.get((relation, target), ()))
+
+    def _point(self, target):
+        return self.coords[self.ids[target]] if isinstance(target, str) else np.asarray(target, dtype=np.float64)
+
+    def near(self, target, radius):
+        """Items within radius of an item or point, closest first (an item is not near itself)."""
+        point = self._point(target)
+        low = np.floor((point - radius) / self.cell_size).astype(np.int64)
+        high = np.floor((point + radius) / self.cell_size).astype(np.int64)
+        candidates = [item for cx in range(low[0], high[0] + 1) for cy in range(low[1], high[1] + 1)
+                      for item in self.grid.get((cx, cy), ())]
+        if not candidates:
+            return []
+        candidates = np.array(candidates)
+        distances = np.linalg.norm(self.coords[candidates] - point, axis=1)
+        keep = distances <= radius
+        if isinstance(target, str):
+            keep &= candidates != self.ids[target]
+        order = np.argsort(distances[keep], kind="stable")
+        return [self.names[item] for item in candidates[keep][order].tolist()]
+
+    def nearest(self, target, k=1):
+        """
+        The k items closest to an item or point, as [(name, distance)].
+        Rings of grid cells are searched outwards until the k-th best
+        distance is within the radius every unsearched cell lies beyond.
+        """
+        if k <= 0:
+            return []
+        point = self._point(target)
+        skip = self.ids[target] if isinstance(target, str) else -1
+        cx, cy = self._cell(point)
+        best = []  # max-heap of (-distance, item)
+        reach = max(cx - self.lowest[0], self.highest[0] - cx, cy - self.lowest[1], self.highest[1] - cy)
+        for ring in range(reach + 1):
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(x, y) for x in range(cx - ring, cx + ring + 1) for y in (cy - ring, cy + ring)]
+                cells += [(x, y) for x in (cx - ring, cx + ring) for y in range(cy - ring + 1, cy + ring)]
+            items = [item for cell in cells for item in self.grid.get(cell, ()) if item != skip]
+            if items:
+                distances = np.linalg.norm(self.coords[items] - point, axis=1).tolist()
+                for item, distance in zip(items, distances):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, item))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, item))
+            # anything in ring + 1 or beyond is at least this far from the point
+            if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                break
+        return [(self.names[item], -negative) for negative, item in sorted(best, reverse=True)]
+
+    @classmethod
+    def from_kb(cls, kb, plan=None, cell_size=0.5, spacing=1.0):
+        """
+        Index a room_kb-style dict: windows and doors spread evenly along
+        their walls, then every item placed from its parsed location (see
+        place()). Items keep exactly the anchors their description names.
+        """
+        plan = plan or FloorPlan.rectangle(5.0, 4.0)
+        index = cls(plan, cell_size)
+        openings = {}
+        for group in ("windows", "door", "doors"):
+            for name, wall in kb.get(group, {}).items():
+                openings.setdefault(wall, []).append(name)
+        for wall, names in openings.items():
+            for i, name in enumerate(names):
+                index.add(name, plan.wall_point(wall, (i + 1) / (len(names) + 1)), [wall])
+
+        locations = {item: parse_location(text) for item, text in kb.get("locations", {}).items()}
+        for corner, items in kb.get("corners", {}).items():
+            for item in items:
+                if item in locations and corner not in locations[item].anchors:
+                    locations[item].anchors.append(corner)
+        pending = dict(locations)
+        while pending:  # items described relative to other items wait until those are placed
+            placed = False
+            for item, location in list(pending.items()):
+                point = index.place(location, spacing)
+                if point is not None:
+                    relations = [(relation, target) for relation, target, _ in location.relations]
+                    index.add(item, point, location.anchors, relations)
+                    del pending[item]
+                    placed = True
+            if not placed:
+                raise ValueError(f"Cannot place {sorted(pending)}: their locations refer to each other or to "
+                                 f"unknown items")
+        return index
+
+    def place(self, location, spacing=1.0):
+        """
+        A point for a parsed location, or None while it refers to items not
+        indexed yet: the explicit point if given; otherwise the average of
+        its corners (inset) and relation targets (moved spacing in front of,
+        behind, left or right of them), snapped onto its wall if it names one.
+        """
+        if location.point is not None:
+            return location.point
+        plan = self.plan
+        candidates = []
+        walls = [anchor for anchor in location.anchors if anchor in plan.walls]
+        for anchor in location.anchors:
+            if anchor in plan.corners:
+                candidates.append(plan.corner_point(anchor, 0.5 * spacing))
+            elif anchor in self.ids:
+                candidates.append(self.coords[self.ids[anchor]])
+        for relation, target, _ in location.relations:
+            if target not in self.ids:
+                return None
+            origin = self.coords[self.ids[target]]
+            target_walls = [plan.walls[a] for a in self.anchors_of[self.ids[target]] if a in plan.walls]
+            wall = target_walls[0] if target_walls else None
+            normal = plan.normals[wall] if wall is not None else np.array([0.0, -1.0])
+            tangent = plan.tangents[wall] if wall is not None else np.array([1.0, 0.0])
+            offset = {"in_front_of": normal, "behind": -normal, "right": tangent, "left": -tangent,
+                      "next_to": tangent, "near": normal}[relation]
+            candidates.append(origin + spacing * offset)
+        if walls:
+            point = np.mean(candidates, axis=0) if candidates else plan.wall_point(walls[0])
+            return plan.snap_to_wall(point, walls[0], 0.5 * spacing)
+        if not candidates:
+            return None
+        return np.mean(candidates, axis=0)
+
+
+def cross_plan(arm, width):
+    """A plus-shaped warehouse with 12 walls: arms of length arm around a width x width centre."""
+    a, w = arm, width
+    outline = [(a, 0), (a + w, 0), (a + w, a), (2 * a + w, a), (2 * a + w, a + w), (a + w, a + w),
+               (a + w, 2 * a + w), (a, 2 * a + w), (a, a + w), (0, a + w), (0, a), (a, a)]
+    return FloorPlan(outline[::-1])  # clockwise
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    arm, width = 400.0, 200.0
+    plan = cross_plan(arm, width)
+    # half the items in the horizontal bar, half in the vertical one
+    half = num_items // 2
+    points = np.concatenate((
+        rng.uniform((0, arm), (2 * arm + width, arm + width), (half, 2)),
+        rng.uniform((arm, 0), (arm + width, 2 * arm + width), (num_items - half, 2))))
+    # push a tenth of them against a wall so every wall has something on it
+    on_wall = rng.choice(num_items, num_items // 10, replace=False)
+    walls = rng.integers(len(plan.vertices), size=len(on_wall))
+    points[on_wall] = [plan.snap_to_wall(points[i], f"wall{w + 1}", 0.3) for i, w in zip(on_wall, walls)]
+    names = [f"item{i}" for i in range(num_items)]
+
+    start_time = time.perf_counter()
+    index = SpatialIndex(plan, cell_size=5.0)
+    index.add_many(names, points)
+    print(f"{num_items} items indexed in {time.perf_counter() - start_time:.2f}s "
+          f"({len(index.grid)} grid cells, {len(plan.vertices)} walls)")
+
+    # the old way: a text location per item and a substring scan per query
+    locations = {name: ", ".join(index.anchors(name)) or "floor" for name in names}
+    start_time = time.perf_counter()
+    scanned = [item for item, loc in locations.items() if "wall1" in loc]
+    scan_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    at_wall = index.at("wall1")
+    print(f"at wall1: substring scan {scan_time * 1e3:.1f} ms ({len(scanned)} items, "
+          f"{len(scanned) - len(at_wall)} of them really at wall10-12), index "
+          f"{(time.perf_counter() - start_time) * 1e3:.2f} ms ({len(at_wall)} items)")
+
+    queries = rng.uniform((arm, arm), (arm + width, arm + width), (1000, 2))
+    for k in (1, 10, 100):
+        start_time = time.perf_counter()
+        results = [index.nearest(query, k) for query in queries]
+        grid_time = (time.perf_counter() - start_time) / len(queries)
+        start_time = time.perf_counter()
+        for query, result in zip(queries[:100], results):
+            distances = np.linalg.norm(index.coords[:len(index)] - query, axis=1)
+            expected = np.partition(distances, k - 1)[k - 1]
+            assert abs(result[-1][1] - expected) < 1e-9
+        brute_time = (time.perf_counter() - start_time) / 100
+        print(f"nearest k={k:<3}: grid {grid_time * 1e6:7.0f} us/query, NumPy brute force {brute_time * 1e6:7.0f} us/query")
+    start_time = time.perf_counter()
+    found = sum(len(index.near(query, 10.0)) for query in queries)
+    print(f"near(radius 10): {(time.perf_counter() - start_time) / len(queries) * 1e6:.0f} us/query, "
+          f"{found / len(queries):.1f} items on average")
+    start_time = time.perf_counter()
+    for i in range(1000):
+        index.add(names[i], points[i] + 1.0)
+    print(f"move an item: {(time.perf_counter() - start_time) / 1000 * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
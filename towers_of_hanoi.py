@@ -1,4 +1,4 @@
-import heapq
+from search_core import graph_search
 
 class TowersOfHanoiSolver:
     def __init__(self, n):
@@ -29,24 +29,18 @@ class TowersOfHanoiSolver:
     def solve(self):
         """A* search"""
         start = tuple([(0, i) for i in range(self.n)])
-        open_set = [(self.heuristic(start), 0, start, [])]
-        closed = set()
-        
-        while open_set:
-            f, g, state, path = heapq.heappop(open_set)
-            if state == self.goal: return path
-            if state in closed: continue
-            closed.add(state)
-            
-            for next_state in self.successors(state):
-                if next_state not in closed:
-                    # Find moved disk
-                    disk = next(i for i in range(self.n) if state[i][0] != next_state[i][0])
-                    move = (disk, state[disk][0], next_state[disk][0])
-                    new_g = g + 1
-                    heapq.heappush(open_set, (new_g + self.heuristic(next_state), 
-                                            new_g, next_state, path + [move]))
-        return None
+        states, _, _ = graph_search(start, lambda state: state == self.goal,
+                                    lambda state: ((next_state, 1) for next_state in self.successors(state)),
+                                    heuristic=self.heuristic)
+        if not states:
+            return None
+
+        path = []
+        for state, next_state in zip(states, states[1:]):
+            # Find moved disk
+            disk = next(i for i in range(self.n) if state[i][0] != next_state[i][0])
+            path.append((disk, state[disk][0], next_state[disk][0]))
+        return path
 
 def solve_hanoi(n):
     """Solve using A* search"""
@@ -66,9 +60,10 @@ def solve_hanoi(n):
         return 0
 
 # Test the solver
-print("=== TOWERS OF HANOI A* SOLVER ===")
-for n in range(3,6):  # Test up to n=5
-    moves = solve_hanoi(n)
-    if moves == 2**n - 1:
-        print(f"✓ Optimal solution found")
-    print("-" * 40)
\ No newline at end of file
+if __name__ == "__main__":
+    print("=== TOWERS OF HANOI A* SOLVER ===")
+    for n in range(3,6):  # Test up to n=5
+        moves = solve_hanoi(n)
+        if moves == 2**n - 1:
+            print(f"✓ Optimal solution found")
+        print("-" * 40)
\ No newline at end of file
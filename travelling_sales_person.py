@@ -99,12 +99,23 @@
 
 import random
 
+import numpy as np
+
+from distance_matrix import DistanceMatrix
+from tsp_local_search import distance_array, local_search, two_opt
+from tsp_multistart import multi_start
+
+# Below this many cities main() runs a single hill climb instead of the multi-start pool
+MULTI_START_CITIES = 200
+
 def route_distance(route, dist_matrix, start_city):
     """
     Given a route (which does NOT include the starting city) and the distance matrix,
     compute the total distance of traveling:
     start_city -> route[0] -> route[1] -> ... -> route[-1] -> start_city
     """
+    if isinstance(dist_matrix, DistanceMatrix):
+        return dist_matrix.route_distance(route, start_city)
     total_dist = 0
     current_city = start_city
     for next_city in route:
@@ -129,55 +140,49 @@ def generate_2opt_neighbors(route):
             neighbors.append(new_route)
     return neighbors
 
-def hill_climb(route, dist_matrix, start_city):
+def hill_climb(route, dist_matrix, start_city, mode="first"):
     """
-    Perform hill climbing on the TSP route using 2-opt neighbors.
+    Perform hill climbing on the TSP route using 2-opt moves.
+    Each move is scored by its 4-edge delta on a NumPy distance array and
+    applied in place (see tsp_local_search.two_opt); mode is "first" or
+    "best" improvement.
+    For large tours, mode "2opt", "oropt" or "or2opt" runs
+    tsp_local_search.local_search instead, which only tries moves towards
+    each city's nearest neighbors and needs the route to cover every city.
     Returns the best route (excluding the start city) and its total distance.
     """
-    current_route = route
-    current_dist = route_distance(current_route, dist_matrix, start_city)
-
-    while True:
-        improved = False
-        neighbors = generate_2opt_neighbors(current_route)
-        for neighbor in neighbors:
-            dist_neighbor = route_distance(neighbor, dist_matrix, start_city)
-            if dist_neighbor < current_dist:
-                current_route = neighbor
-                current_dist = dist_neighbor
-                improved = True
-                break  # Accept the first improvement
-        if not improved:
-            break
-    
-    return current_route, current_dist
+    dist = distance_array(dist_matrix)
+    tour = np.array([start_city] + list(route))
+    if mode in ("first", "best"):
+        two_opt(tour, dist, mode)
+    else:
+        local_search(tour, dist, mode)
+    best_route = tour[1:].tolist()
+    return best_route, route_distance(best_route, dist_matrix, start_city)
 
 def main():
     # Get the number of cities
     num_cities = int(input("Enter the number of cities: "))
 
-    # Get the distance matrix from user input
-    dist_matrix = {}
+    # Get the distance matrix from user input (symmetric distances assumed)
     print("Enter the distances between cities (e.g., 0,1,20 0,2,10 1,2,15 ...):")
-    distances_input = input().split()
-    for dist_str in distances_input:
-        city1, city2, distance = dist_str.split(',')
-        city1, city2, distance = int(city1), int(city2), int(distance)
-        dist_matrix[(city1, city2)] = distance
-        dist_matrix[(city2, city1)] = distance  # Assuming symmetric distances
+    dist_matrix = DistanceMatrix.from_pairs(input(), num_cities)
 
     # Get the starting city from user input
     start_city = int(input("Enter the starting city (0 to {}): ".format(num_cities - 1)))
 
-    # Create a list of cities excluding the starting city
-    cities = list(range(num_cities))
-    cities.remove(start_city)
-
-    # Shuffle the cities to create an initial route
-    random.shuffle(cities)
-
-    # Perform hill climbing to find the best route
-    best_route, best_distance = hill_climb(cities, dist_matrix, start_city)
+    if num_cities < MULTI_START_CITIES:
+        # Small instances: one hill climb from a shuffled route finishes instantly
+        cities = list(range(num_cities))
+        cities.remove(start_city)
+        random.shuffle(cities)
+        best_route, best_distance = hill_climb(cities, dist_matrix, start_city)
+    else:
+        # Large instances: restart local search from several constructions on every core,
+        # for about a second per thousand cities
+        budget = min(max(num_cities / 1000, 1.0), 10.0)
+        best_route, _, _ = multi_start(dist_matrix, start_city, time_budget=budget)
+        best_distance = route_distance(best_route, dist_matrix, start_city)
 
     # Print the results
     print("Best route (excluding start city {}): {}".format(start_city, best_route))
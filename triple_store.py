@@ -0,0 +1,438 @@
+import os
+import random
+import sys
+import time
+
+
+def is_variable(term):
+    return isinstance(term, str) and term.startswith("?")
+
+
+class Rule:
+    """
+    Horn rule head :- body over triple patterns, e.g.
+    Rule(("?b", "right_of", "?a"), [("?a", "left_of", "?b")]).
+    Terms starting with "?" are variables; every head variable must occur in the body.
+    """
+
+    def __init__(self, head, body):
+        self.head = tuple(head)
+        self.body = [tuple(atom) for atom in body]
+        bound = {term for atom in self.body for term in atom if is_variable(term)}
+        unbound = [term for term in self.head if is_variable(term) and term not in bound]
+        if unbound:
+            raise ValueError(f"Head variables {unbound} do not occur in the body of {self}")
+
+    def __repr__(self):
+        return f"Rule({self.head} :- {self.body})"
+
+
+class TripleStore:
+    """
+    Subject-predicate-object facts over interned symbols.
+
+    Strings are interned to ints once; each fact is indexed three ways
+    (SPO: s -> p -> {o}, POS: p -> o -> {s}, OSP: o -> s -> {p}), so any
+    pattern with at least one bound position is a couple of dict lookups.
+
+    Rules are applied either forward (forward_chain() materializes derived
+    facts semi-naively: each round only joins against facts new in the
+    previous round, and later calls start from the facts added since) or
+    backward (prove() answers one goal with tabled resolution, without
+    materializing anything).
+    """
+
+    def __init__(self):
+        self.symbols = {}  # str -> id
+        self.names = []  # id -> str
+        self.spo = {}
+        self.pos = {}
+        self.osp = {}
+        self.size = 0
+        self.rules = []
+        self.derived = set()  # facts added by forward_chain, as id triples
+        self._pending = []  # facts added since the last forward_chain
+        self._tables = {}  # goal -> answers, for prove(); dropped whenever facts or rules change
+        self._complete = set()
+        self._active = {}  # goals being evaluated -> depth
+        self._stack = []
+        self._low = 0
+        self._answers = 0
+
+    # Symbols
+
+    def intern(self, name):
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            symbol = self.symbols[name] = len(self.names)
+            self.names.append(name)
+        return symbol
+
+    def _lookup(self, term):
+        """Id of a bound term, -1 if the symbol was never seen, None for a wildcard."""
+        if term is None or is_variable(term):
+            return None
+        return self.symbols.get(term, -1)
+
+    # Facts
+
+    def _insert(self, s, p, o):
+        objects = self.spo.setdefault(s, {}).setdefault(p, set())
+        if o in objects:
+            return False
+        objects.add(o)
+        self.pos.setdefault(p, {}).setdefault(o, set()).add(s)
+        self.osp.setdefault(o, {}).setdefault(s, set()).add(p)
+        self.size += 1
+        return True
+
+    def _delete(self, s, p, o):
+        objects = self.spo.get(s, {}).get(p)
+        if not objects or o not in objects:
+            return False
+        for index, a, b, c in ((self.spo, s, p, o), (self.pos, p, o, s), (self.osp, o, s, p)):
+            inner = index[a]
+            inner[b].discard(c)
+            if not inner[b]:
+                del inner[b]
+                if not inner:
+                    del index[a]
+        self.size -= 1
+        return True
+
+    def add(self, s, p, o):
+        """Add a fact; returns False if it was already present."""
+        fact = (self.intern(s), self.intern(p), self.intern(o))
+        if not self._insert(*fact):
+            return False
+        self._pending.append(fact)
+        self._tables.clear()
+        self._complete.clear()
+        return True
+
+    def remove(self, s, p, o):
+        """
+        Remove a fact. Derived facts are not retracted individually: when
+        there are rules, all derived facts are dropped and forward_chain
+        re-derives them from the remaining ones, so a removed fact the rules
+        still entail comes back as a derived fact.
+        """
+        fact = tuple(self._lookup(term) for term in (s, p, o))
+        if -1 in fact or not self._delete(*fact):
+            return False
+        self.derived.discard(fact)
+        self._tables.clear()
+        self._complete.clear()
+        if self.rules:
+            for derived in self.derived:
+                self._delete(*derived)
+            self.derived.clear()
+            self._pending = list(self._match(None, None, None))
+            self.forward_chain()
+        return True
+
+    def _match(self, s, p, o):
+        """Yield id triples matching a pattern of ids (None is a wildcard)."""
+        if s is not None:
+            by_predicate = self.spo.get(s)
+            if not by_predicate:
+                return
+            if p is not None:
+                objects = by_predicate.get(p, ())
+                if o is not None:
+                    if o in objects:
+                        yield s, p, o
+                else:
+                    for x in objects:
+                        yield s, p, x
+            elif o is not None:
+                for x in self.osp.get(o, {}).get(s, ()):
+                    yield s, x, o
+            else:
+                for x, objects in by_predicate.items():
+                    for y in objects:
+                        yield s, x, y
+        elif p is not None:
+            by_object = self.pos.get(p)
+            if not by_object:
+                return
+            if o is not None:
+                for x in by_object.get(o, ()):
+                    yield x, p, o
+            else:
+                for y, subjects in by_object.items():
+                    for x in subjects:
+                        yield x, p, y
+        elif o is not None:
+            for x, predicates in self.osp.get(o, {}).items():
+                for y in predicates:
+                    yield x, y, o
+        else:
+            for x, by_predicate in self.spo.items():
+                for y, objects in by_predicate.items():
+                    for z in objects:
+                        yield x, y, z
+
+    def find(self, s=None, p=None, o=None):
+        """Facts matching a pattern, as string triples; None or "?var" is a wildcard."""
+        ids = [self._lookup(term) for term in (s, p, o)]
+        if -1 in ids:
+            return []
+        names = self.names
+        return [(names[x], names[y], names[z]) for x, y, z in self._match(*ids)]
+
+    def objects(self, s, p):
+        """Every o with (s, p, o)."""
+        s, p = self.symbols.get(s), self.symbols.get(p)
+        return [self.names[o] for o in self.spo.get(s, {}).get(p, ())]
+
+    def subjects(self, p, o):
+        """Every s with (s, p, o)."""
+        p, o = self.symbols.get(p), self.symbols.get(o)
+        return [self.names[s] for s in self.pos.get(p, {}).get(o, ())]
+
+    def __contains__(self, fact):
+        s, p, o = (self.symbols.get(term, -1) for term in fact)
+        return o in self.spo.get(s, {}).get(p, ())
+
+    def __len__(self):
+        return self.size
+
+    # Rules
+
+    def add_rule(self, head, body):
+        rule = Rule(head, body)
+        self.rules.append(Rule(self._compile_atom(rule.head), [self._compile_atom(atom) for atom in rule.body]))
+        # a new rule has to see every fact, not just the ones added since the last round
+        self._pending = list(self._match(None, None, None))
+        self._tables.clear()
+        self._complete.clear()
+        return rule
+
+    def _compile_atom(self, atom):
+        """Constants become symbol ids; variables stay "?name" strings."""
+        return tuple(term if is_variable(term) else self.intern(term) for term in atom)
+
+    @staticmethod
+    def _unify(atom, fact, bindings):
+        """Extend bindings so atom matches the id triple fact, or None."""
+        extended = bindings
+        for term, value in zip(atom, fact):
+            if isinstance(term, int):
+                if term != value:
+                    return None
+            else:
+                bound = extended.get(term)
+                if bound is None:
+                    if extended is bindings:
+                        extended = dict(bindings)
+                    extended[term] = value
+                elif bound != value:
+                    return None
+        return extended
+
+    @staticmethod
+    def _resolve(atom, bindings):
+        return tuple(term if isinstance(term, int) else bindings.get(term) for term in atom)
+
+    def _join(self, atoms, bindings):
+        """Yield bindings satisfying every atom against the stored facts, most-bound atom first."""
+        if not atoms:
+            yield bindings
+            return
+        patterns = [self._resolve(atom, bindings) for atom in atoms]
+        k = max(range(len(atoms)), key=lambda i: sum(term is not None for term in patterns[i]))
+        rest = atoms[:k] + atoms[k + 1:]
+        for fact in self._match(*patterns[k]):
+            extended = self._unify(atoms[k], fact, bindings)
+            if extended is not None:
+                yield from self._join(rest, extended)
+
+    def query(self, body):
+        """Every binding of the variables that satisfies all the patterns in body, e.g. [("?x", "type", "desk")]."""
+        atoms = [self._compile_atom(atom) for atom in body]
+        names = self.names
+        return [{var: names[value] for var, value in solution.items()} for solution in self._join(atoms, {})]
+
+    def forward_chain(self):
+        """
+        Apply the rules until nothing new follows, joining each body atom in
+        turn against only the facts new since the previous round (semi-naive
+        evaluation). Returns the number of facts derived.
+        """
+        delta, self._pending = self._pending, []
+        derived = 0
+        while delta and self.rules:
+            by_predicate = {}
+            for fact in delta:
+                by_predicate.setdefault(fact[1], []).append(fact)
+            new = []
+            for rule in self.rules:
+                for i, atom in enumerate(rule.body):
+                    candidates = delta if not isinstance(atom[1], int) else by_predicate.get(atom[1], ())
+                    rest = rule.body[:i] + rule.body[i + 1:]
+                    for fact in candidates:
+                        bindings = self._unify(atom, fact, {})
+                        if bindings is None:
+                            continue
+                        for solution in self._join(rest, bindings):
+                            new.append(self._resolve(rule.head, solution))
+            delta = []
+            for fact in new:
+                if self._insert(*fact):
+                    self.derived.add(fact)
+                    delta.append(fact)
+            derived += len(delta)
+        if derived:
+            self._tables.clear()
+            self._complete.clear()
+        return derived
+
+    def _solve(self, goal):
+        """
+        Tabled resolution: answers (id triples) for a goal pattern. A goal
+        met again while it is being evaluated returns its answers so far;
+        the outermost goal of such a cycle re-runs its rules until no table
+        grows, then marks every goal evaluated under it complete.
+        """
+        table = self._tables.get(goal)
+        if goal in self._complete:
+            return table
+        if goal in self._active:
+            self._low = min(self._low, self._active[goal])
+            return table
+        if table is None:
+            table = self._tables[goal] = set(self._match(*goal))
+        depth = len(self._active)
+        self._active[goal] = depth
+        self._stack.append(goal)
+        outer_low = self._low
+        while True:
+            self._low = depth
+            before = self._answers
+            for rule in self.rules:
+                bindings = self._unify_pattern(rule.head, goal)
+                if bindings is None:
+                    continue
+                for solution in self._prove(rule.body, bindings):
+                    fact = self._resolve(rule.head, solution)
+                    if fact not in table:
+                        table.add(fact)
+                        self._answers += 1
+            low = self._low
+            if low < depth or self._answers == before:
+                break
+        del self._active[goal]
+        if low >= depth:  # nothing under this goal depends on an enclosing one: all of it is final
+            while True:
+                done = self._stack.pop()
+                self._complete.add(done)
+                if done == goal:
+                    break
+        self._low = min(outer_low, low)
+        return table
+
+    @staticmethod
+    def _unify_pattern(head, goal):
+        """Bindings making head match goal, where goal may have wildcards (None)."""
+        bindings = {}
+        for term, value in zip(head, goal):
+            if value is None:
+                continue
+            if isinstance(term, int):
+                if term != value:
+                    return None
+            elif bindings.setdefault(term, value) != value:
+                return None
+        return bindings
+
+    def _prove(self, atoms, bindings):
+        if not atoms:
+            yield bindings
+            return
+        patterns = [self._resolve(atom, bindings) for atom in atoms]
+        k = max(range(len(atoms)), key=lambda i: sum(term is not None for term in patterns[i]))
+        rest = atoms[:k] + atoms[k + 1:]
+        for fact in list(self._solve(patterns[k])):
+            extended = self._unify(atoms[k], fact, bindings)
+            if extended is not None:
+                yield from self._prove(rest, extended)
+
+    def prove(self, s, p, o):
+        """
+        Answer a goal pattern by backward chaining over facts and rules,
+        e.g. prove("?x", "part_of", "building1"); returns matching facts
+        as string triples. Answers are tabled, so repeated and recursive
+        subgoals are solved once until the facts or rules change.
+        """
+        ids = [self._lookup(term) for term in (s, p, o)]
+        if -1 in ids:
+            return []
+        goal = tuple(ids)
+        names = self.names
+        return [(names[x], names[y], names[z]) for x, y, z in self._solve(goal)]
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    rng = random.Random(0)
+    store = TripleStore()
+    # a 4-level containment hierarchy of areas, items placed in the leaves
+    levels = [[f"site{i}" for i in range(10)]]
+    for depth, fanout in enumerate((10, 10, 20), 1):
+        levels.append([f"{levels[-1][i // fanout]}/a{i}" for i in range(len(levels[-1]) * fanout)])
+    before = _rss_mb()
+    start_time = time.perf_counter()
+    for upper, lower in zip(levels, levels[1:]):
+        fanout = len(lower) // len(upper)
+        for i, area in enumerate(lower):
+            store.add(area, "part_of", upper[i // fanout])
+    kinds = ["desk", "chair", "bed", "shelf", "cart", "rack"]
+    for i in range(num_items):
+        item = f"item{i}"
+        store.add(item, "type", rng.choice(kinds))
+        store.add(item, "located_in", rng.choice(levels[-1]))
+        store.add(item, "near", f"item{rng.randrange(num_items)}")
+    load_time = time.perf_counter() - start_time
+    print(f"{len(store)} facts loaded in {load_time:.2f}s ({len(store) / load_time / 1e3:.0f}k/s, "
+          f"+{_rss_mb() - before:.0f} MB RSS)")
+
+    queries = [f"item{rng.randrange(num_items)}" for _ in range(100000)]
+    for name, lookup in (("objects(s, p)", lambda item: store.objects(item, "located_in")),
+                         ("subjects(p, o)", lambda item: store.subjects("near", item)),
+                         ("find(s, None, o)", lambda item: store.find(item, None, "desk"))):
+        start_time = time.perf_counter()
+        for item in queries:
+            lookup(item)
+        print(f"{name:<17} {(time.perf_counter() - start_time) / len(queries) * 1e6:.2f} us/lookup")
+
+    store.add_rule(("?a", "part_of", "?c"), [("?a", "part_of", "?b"), ("?b", "part_of", "?c")])
+    store.add_rule(("?x", "located_in", "?b"), [("?x", "located_in", "?a"), ("?a", "part_of", "?b")])
+    store.add_rule(("?y", "near", "?x"), [("?x", "near", "?y")])
+
+    start_time = time.perf_counter()
+    goal = store.prove("item7", "located_in", "?where")
+    print(f"prove(item7 located_in ?where) from cold tables: {len(goal)} answers in "
+          f"{(time.perf_counter() - start_time) * 1e3:.2f} ms")
+
+    start_time = time.perf_counter()
+    derived = store.forward_chain()
+    print(f"forward_chain: {derived} facts derived in {time.perf_counter() - start_time:.2f}s, {len(store)} total")
+    start_time = time.perf_counter()
+    for i in range(1000):
+        store.add(f"new{i}", "located_in", rng.choice(levels[-1]))
+    derived = store.forward_chain()
+    print(f"1000 new facts: {derived} derived incrementally in {(time.perf_counter() - start_time) * 1e3:.1f} ms")
+    start_time = time.perf_counter()
+    for item in queries:
+        store.objects(item, "located_in")
+    print(f"objects(s, p) after materializing: {(time.perf_counter() - start_time) / len(queries) * 1e6:.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from distance_matrix import DistanceMatrix
+
+EPSILON = 1e-9  # ignore "improvements" that are only floating point noise
+
+
+def distance_array(dist_matrix):
+    """
+    Dense (n x n) float array from a {(city1, city2): distance} dict, or the
+    array itself if one (or a DistanceMatrix) is passed. Missing pairs become inf.
+    """
+    if isinstance(dist_matrix, DistanceMatrix):
+        return dist_matrix.array
+    if isinstance(dist_matrix, np.ndarray):
+        return dist_matrix
+    n = 1 + max(max(pair) for pair in dist_matrix)
+    dist = np.full((n, n), np.inf)
+    np.fill_diagonal(dist, 0)
+    for (city1, city2), distance in dist_matrix.items():
+        dist[city1, city2] = distance
+    return dist
+
+
+def tour_length(tour, dist):
+    """Length of the closed tour tour[0] -> ... -> tour[-1] -> tour[0]."""
+    return float(dist[tour, np.roll(tour, -1)].sum(dtype=np.float64))
+
+
+def two_opt(tour, dist, mode="first"):
+    """
+    2-opt local search on a closed tour (NumPy array of city ids), in place.
+    tour[0] stays fixed, so a route that excludes the start city maps to
+    tour[1:]. Distances are assumed symmetric; int32/float32 matrices are
+    summed in float64 so rounding cannot make a move and its inverse both
+    look improving.
+
+    A move reversing tour[i..j] replaces edges (a, b) and (c, d) with (a, c)
+    and (b, d), so its gain is a 4-edge delta. "first" scans, for one i at a
+    time, all j in a single vectorized step and applies the first improving
+    move; "best" evaluates every (i, j) pair in row blocks and applies the
+    best move. Returns the final tour length.
+    """
+    n = len(tour)
+    if n < 4:
+        return tour_length(tour, dist)
+    # edge[k] = length of the edge leaving position k
+    edge = dist[tour, np.roll(tour, -1)].astype(np.float64)
+
+    def apply(i, j):
+        tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+        k = np.arange(i - 1, j + 1)
+        edge[k] = dist[tour[k], tour[(k + 1) % n]]
+
+    if mode == "first":
+        i = 1
+        since_improvement = 0
+        while since_improvement < n - 2:
+            a, b = tour[i - 1], tour[i]
+            c = tour[i + 1:]
+            d = np.append(tour[i + 2:], tour[0])
+            delta = dist[a, c].astype(np.float64) + dist[b, d] - edge[i - 1] - edge[i + 1:]
+            improving = np.flatnonzero(delta < -EPSILON)
+            if len(improving):
+                apply(i, i + 1 + improving[0])
+                since_improvement = 0
+                continue  # tour[i] changed, look at the same position again
+            since_improvement += 1
+            i = i + 1 if i < n - 2 else 1
+    elif mode == "best":
+        block = max(1, (1 << 22) // n)
+        nxt = np.roll(np.arange(n), -1)
+        while True:
+            best_delta, best_move = -EPSILON, None
+            for start in range(1, n - 1, block):
+                rows = np.arange(start, min(start + block, n - 1))
+                a, b = tour[rows - 1], tour[rows]
+                delta = (dist[a][:, tour].astype(np.float64) + dist[b][:, tour[nxt]]
+                         - edge[rows - 1][:, None] - edge[None, :])
+                delta[np.arange(n)[None, :] <= rows[:, None]] = np.inf  # only j > i
+                flat = int(np.argmin(delta))
+                if delta.flat[flat] < best_delta:
+                    best_delta = delta.flat[flat]
+                    best_move = (int(rows[flat // n]), flat % n)
+            if best_move is None:
+                break
+            apply(*best_move)
+    else:
+        raise ValueError(f"Unknown 2-opt mode: {mode}")
+    return float(edge.sum())
+
+
+def neighbor_lists(dist, k=12):
+    """(n x k) int32 array of each city's k nearest other cities, nearest first."""
+    n = len(dist)
+    k = min(k, n - 1)
+    neighbors = np.empty((n, k), dtype=np.int32)
+    block = max(1, (1 << 22) // n)
+    for start in range(0, n, block):
+        rows = np.array(dist[start:start + block], dtype=np.float64)
+        rows[np.arange(len(rows)), np.arange(start, start + len(rows))] = np.inf
+        nearest = np.argpartition(rows, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(rows, nearest, axis=1).argsort(axis=1, kind="stable")
+        neighbors[start:start + len(rows)] = np.take_along_axis(nearest, order, axis=1)
+    return neighbors
+
+
+def local_search(tour, dist, moves="or2opt", neighbors=None, k=12, queue=None):
+    """
+    Neighbor-list local search on a closed tour visiting every city of dist,
+    in place; tour[0] is the same city afterwards. Returns the tour length.
+
+    moves is "2opt", "oropt" (move a segment of 1-3 cities elsewhere, possibly
+    reversed) or "or2opt" (both). Only moves that create an edge from a city
+    to one of its k nearest neighbors are tried, and don't-look bits keep a
+    queue of cities whose surroundings changed: a city leaves the queue when
+    no move from it improves and re-enters when a move touches it. Each
+    move is a sequence of segment reversals on the tour array, reversing
+    whichever side of the cycle is shorter.
+
+    neighbors may be precomputed (array or nested list), and queue limits the
+    cities examined first, e.g. to the endpoints of a perturbation.
+    """
+    n = len(tour)
+    if n != len(dist):
+        raise ValueError("local_search needs a tour through every city of dist")
+    if moves not in ("2opt", "oropt", "or2opt"):
+        raise ValueError(f"Unknown local search moves: {moves}")
+    if n < 8:
+        return two_opt(tour, dist, "first")
+    if neighbors is None:
+        neighbors = neighbor_lists(dist, k)
+    near = neighbors.tolist() if isinstance(neighbors, np.ndarray) else neighbors
+    d = dist.item
+    first = tour.item(0)
+    pos = np.empty(n, dtype=np.int64)
+    pos[tour] = np.arange(n)
+
+    def succ(city):
+        return tour.item((pos.item(city) + 1) % n)
+
+    def pred(city):
+        return tour.item(pos.item(city) - 1)
+
+    def reverse(i, j):
+        """Reverse tour positions i..j (cyclic), or the complementary positions."""
+        length = (j - i) % n + 1
+        if 2 * length > n:
+            i, j, length = (j + 1) % n, (i - 1) % n, n - length
+        if i <= j:
+            tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+            pos[tour[i:j + 1]] = np.arange(i, j + 1)
+        else:
+            index = (i + np.arange(length)) % n
+            tour[index] = tour[index[::-1]]
+            pos[tour[index]] = index
+
+    def move(a, b, c, e):
+        """2-opt move replacing edges (a, b), (c, e) with (a, c), (b, e); b follows a as e follows c."""
+        if succ(a) != b:
+            a, b, c, e = b, a, e, c
+        reverse(pos.item(b), pos.item(c))
+
+    def improve_2opt(a):
+        for step in (succ, pred):
+            b = step(a)
+            d_ab = d(a, b)
+            for c in near[a]:
+                g1 = d_ab - d(a, c)
+                if g1 <= EPSILON:
+                    break  # neighbors are sorted, later ones only gain less
+                e = step(c)
+                if c == b or e == a:
+                    continue
+                if g1 + d(c, e) - d(b, e) > EPSILON:
+                    move(a, b, c, e)
+                    return a, b, c, e
+        return None
+
+    def improve_oropt(a):
+        for length in (1, 2, 3):
+            for step, back in ((succ, pred), (pred, succ)):
+                segment = [a]
+                for _ in range(length - 1):
+                    segment.append(step(segment[-1]))
+                s1, s2 = segment[0], segment[-1]
+                p, nx = back(s1), step(s2)
+                removed = d(p, s1) + d(s2, nx) - d(p, nx)
+                if removed <= EPSILON:
+                    continue
+                for end in (s1, s2):
+                    for x in near[end]:
+                        if d(end, x) >= removed:
+                            break
+                        # insert between c and e = step(c) so that end is next to x
+                        for c, e in ((x, step(x)), (back(x), x)):
+                            if c in segment or e in segment or c == nx or e == p:
+                                continue
+                            keep = (c == x) == (end == s1)  # c s1..s2 e, else c s2..s1 e
+                            if keep:
+                                added = d(c, s1) + d(s2, e) - d(c, e)
+                            else:
+                                added = d(c, s2) + d(s1, e) - d(c, e)
+                            if removed - added > EPSILON:
+                                move(p, s1, c, e)  # p c .. nx s2..s1 e
+                                move(p, c, nx, s2)  # p nx .. c s2..s1 e
+                                if keep and s1 != s2:
+                                    move(c, s2, s1, e)  # p nx .. c s1..s2 e
+                                return p, nx, c, e, *segment
+        return None
+
+    improvers = {"2opt": (improve_2opt,), "oropt": (improve_oropt,),
+                 "or2opt": (improve_2opt, improve_oropt)}[moves]
+    queue = deque(tour.tolist() if queue is None else dict.fromkeys(queue))
+    queued = [False] * n
+    for city in queue:
+        queued[city] = True
+    while queue:
+        a = queue.popleft()
+        queued[a] = False
+        for improve in improvers:
+            touched = improve(a)
+            if touched:
+                for city in touched:
+                    if not queued[city]:
+                        queued[city] = True
+                        queue.append(city)
+                break
+
+    tour[:] = np.roll(tour, -pos.item(first))
+    return tour_length(tour, dist)
+
+
+def random_euclidean_instance(num_cities, seed=0):
+    """Cities uniform in a 1000x1000 square: returns (coords, distance array)."""
+    rng = np.random.default_rng(seed)
+    coords = rng.random((num_cities, 2)) * 1000
+    return coords, DistanceMatrix.from_coords(coords, "EXACT").array
+
+
+def main():
+    import travelling_sales_person as tsp
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [60, 1000, 5000, 10000]
+    for num_cities in sizes:
+        _, dist = random_euclidean_instance(num_cities, seed=num_cities)
+        rng = np.random.default_rng(1)
+        start = np.concatenate(([0], rng.permutation(np.arange(1, num_cities))))
+        line = f"n={num_cities:<5} random tour {tour_length(start, dist):10.1f}"
+        for mode in ("first", "best", "2opt", "oropt", "or2opt"):
+            if mode == "best" and num_cities > 1000 or mode == "first" and num_cities > 5000:
+                continue
+            tour = start.copy()
+            start_time = time.perf_counter()
+            if mode in ("first", "best"):
+                length = two_opt(tour, dist, mode)
+            else:
+                length = local_search(tour, dist, mode)
+            line += f" | {mode}: {length:9.1f} in {time.perf_counter() - start_time:6.2f}s"
+        if num_cities <= 100:
+            dist_dict = {(i, j): dist[i, j] for i in range(num_cities) for j in range(num_cities)}
+            route = start[1:].tolist()
+            start_time = time.perf_counter()
+            current, current_dist = route, tsp.route_distance(route, dist_dict, 0)
+            while True:  # the previous list-copying hill climb, for comparison
+                for neighbor in tsp.generate_2opt_neighbors(current):
+                    neighbor_dist = tsp.route_distance(neighbor, dist_dict, 0)
+                    if neighbor_dist < current_dist:
+                        current, current_dist = neighbor, neighbor_dist
+                        break
+                else:
+                    break
+            line += f" | list copies: {current_dist:9.1f} in {time.perf_counter() - start_time:6.2f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from tsp_local_search import EPSILON, distance_array, local_search, neighbor_lists, tour_length
+
+CONSTRUCTIONS = ("random", "nearest", "greedy", "sfc")
+
+# Instance and shared best tour used by the worker processes, set by
+# _init_worker before any work starts (inherited copy-on-write under fork).
+_INSTANCE = None
+_BEST_LENGTH = None
+_BEST_TOUR = None
+
+
+def _init_worker(instance, best_length, best_tour):
+    global _INSTANCE, _BEST_LENGTH, _BEST_TOUR
+    _INSTANCE, _BEST_LENGTH, _BEST_TOUR = instance, best_length, best_tour
+
+
+def random_tour(n, rng):
+    return rng.permutation(n)
+
+
+def nearest_neighbor_tour(dist, near, rng):
+    """Nearest unvisited city from a random start, trying the neighbor list before a full row scan."""
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    city = int(rng.integers(n))
+    tour = [city]
+    visited[city] = True
+    for _ in range(n - 1):
+        for candidate in near[city]:
+            if not visited[candidate]:
+                city = candidate
+                break
+        else:
+            row = np.where(visited, np.inf, dist[city])
+            city = int(np.argmin(row))
+        tour.append(city)
+        visited[city] = True
+    return np.array(tour)
+
+
+def greedy_edge_tour(dist, neighbors):
+    """
+    Greedy matching: take candidate edges (from the neighbor lists) shortest
+    first whenever both ends have degree < 2 and no cycle forms, then chain
+    the resulting fragments nearest endpoint first.
+    """
+    n = len(dist)
+    a = np.repeat(np.arange(n), neighbors.shape[1])
+    b = neighbors.ravel().astype(np.int64)
+    pairs = np.unique(np.stack((np.minimum(a, b), np.maximum(a, b)), axis=1), axis=0)
+    order = np.argsort(dist[pairs[:, 0], pairs[:, 1]], kind="stable")
+
+    root = list(range(n))
+
+    def find(x):
+        while root[x] != x:
+            root[x] = root[root[x]]
+            x = root[x]
+        return x
+
+    degree = [0] * n
+    links = [[] for _ in range(n)]
+    added = 0
+    for u, v in pairs[order].tolist():
+        if degree[u] < 2 and degree[v] < 2:
+            ru, rv = find(u), find(v)
+            if ru != rv:
+                root[ru] = rv
+                links[u].append(v)
+                links[v].append(u)
+                degree[u] += 1
+                degree[v] += 1
+                added += 1
+                if added == n - 1:
+                    break
+
+    endpoints = np.array([city for city in range(n) if degree[city] < 2])
+    open_end = np.ones(len(endpoints), dtype=bool)
+    slot = {city: i for i, city in enumerate(endpoints.tolist())}
+    visited = np.zeros(n, dtype=bool)
+    tour = []
+    city = int(endpoints[0])
+    while True:
+        open_end[slot[city]] = False
+        while True:  # walk the fragment to its other end
+            tour.append(city)
+            visited[city] = True
+            following = [other for other in links[city] if not visited[other]]
+            if not following:
+                break
+            city = following[0]
+        open_end[slot[city]] = False
+        if len(tour) == n:
+            return np.array(tour)
+        candidates = endpoints[open_end]
+        city = int(candidates[np.argmin(dist[city][candidates])])
+
+
+def hilbert_tour(coords, rng, order=16):
+    """Visit cities along a Hilbert curve through randomly rotated and shifted coordinates."""
+    angle = rng.uniform(0, 2 * math.pi)
+    rotation = np.array([[math.cos(angle), -math.sin(angle)], [math.sin(angle), math.cos(angle)]])
+    xy = np.asarray(coords, dtype=np.float64) @ rotation
+    xy -= xy.min(axis=0)
+    xy += rng.uniform(0, 0.5, 2) * xy.max()
+    side = 1 << order
+    xy = xy / max(xy.max(), 1e-12) * (side - 1)
+    x, y = xy[:, 0].astype(np.int64), xy[:, 1].astype(np.int64)
+    index = np.zeros(len(xy), dtype=np.int64)
+    s = side >> 1
+    while s:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+    return np.argsort(index, kind="stable")
+
+
+def construct(kind, dist, neighbors, near, coords, rng):
+    if kind == "random":
+        return random_tour(len(dist), rng)
+    if kind == "nearest":
+        return nearest_neighbor_tour(dist, near, rng)
+    if kind == "greedy":
+        return greedy_edge_tour(dist, neighbors)
+    if kind == "sfc":
+        if coords is None:
+            raise ValueError("The space-filling curve construction needs city coordinates")
+        return hilbert_tour(coords, rng)
+    raise ValueError(f"Unknown tour construction: {kind}")
+
+
+def double_bridge(tour, rng, window=100):
+    """
+    Local double-bridge kick A B C D -> A C B D with all three cuts inside a
+    random window, in place. Returns the cities whose edges changed.
+    """
+    n = len(tour)
+    window = min(window, n - 2)
+    first = int(rng.integers(1, n - window + 1))
+    p1, p2, p3 = np.sort(rng.choice(np.arange(first, first + window), 3, replace=False)) + [0, 0, 1]
+    touched = tour[[p1 - 1, p1, p2 - 1, p2, p3 - 1, p3 % n]].tolist()
+    tour[p1:p3] = np.concatenate((tour[p2:p3], tour[p1:p2]))
+    return touched
+
+
+def _publish(tour, length):
+    """Offer a tour to the shared best-so-far; returns the (possibly improved) shared best length."""
+    with _BEST_LENGTH.get_lock():
+        if length < _BEST_LENGTH.value:
+            _BEST_LENGTH.value = length
+            np.frombuffer(_BEST_TOUR.get_obj(), dtype=np.int32)[:] = tour
+        return _BEST_LENGTH.value
+
+
+def _worker(task):
+    """
+    One worker's share of the budget: construct, run or2opt local search,
+    then (if phase is set) perturb with double-bridge kicks until `patience`
+    kicks in a row bring no improvement, and start over with the next
+    construction. "ils" keeps only improving kicks; "sa" also accepts worse
+    tours with probability exp(-delta / T), T cooling geometrically over the
+    budget. Returns [(time, length)] for each improvement of its own best.
+    """
+    worker, seed, constructions, phase, patience, started, deadline, target = task
+    dist, neighbors, near, coords = _INSTANCE
+    rng = np.random.default_rng([seed, worker])
+    n = len(dist)
+    trace = []
+    best = math.inf
+    restart = 0
+    while True:
+        kind = constructions[(worker + restart) % len(constructions)]
+        restart += 1
+        tour = construct(kind, dist, neighbors, near, coords, rng)
+        length = local_search(tour, dist, "or2opt", near)
+        stale = 0
+        temperature = 0.05 * length / n
+        while True:
+            if length < best - EPSILON:
+                best = length
+                trace.append((time.monotonic() - started, best))
+                shared = _publish(tour, length)
+            else:
+                shared = _BEST_LENGTH.value
+            now = time.monotonic()
+            if now >= deadline or (target is not None and shared <= target):
+                return trace
+            if phase is None or n < 8 or stale >= patience:
+                break
+            candidate = tour.copy()
+            touched = double_bridge(candidate, rng)
+            new_length = local_search(candidate, dist, "or2opt", near, queue=touched)
+            stale = 0 if new_length < best - EPSILON else stale + 1
+            if new_length < length - EPSILON:
+                tour, length = candidate, new_length
+            elif phase == "sa":
+                cooled = temperature * 0.01 ** ((now - started) / (deadline - started))
+                if rng.random() < math.exp(-(new_length - length) / cooled):
+                    tour, length = candidate, new_length
+
+
+def multi_start(dist_matrix, start_city=0, workers=None, time_budget=10.0,
+                constructions=CONSTRUCTIONS, phase="ils", coords=None, seed=0,
+                patience=None, target=None):
+    """
+    Independent restarts spread over a process pool until time_budget
+    seconds have passed (each worker finishes at least one local search).
+    Every worker has its own RNG seeded from (seed, worker index), so runs
+    are reproducible per worker, and all workers share the best tour found
+    so far; they stop early once it reaches target.
+
+    constructions is a subset of "random", "nearest", "greedy" and "sfc"
+    (Hilbert curve, skipped without coords). phase is None, "ils" or "sa".
+
+    Returns (best_route, best_distance, trace) like hill_climb, with the
+    route excluding start_city; trace lists (seconds, best length so far).
+    """
+    if phase not in (None, "ils", "sa"):
+        raise ValueError(f"Unknown improvement phase: {phase}")
+    dist = distance_array(dist_matrix)
+    n = len(dist)
+    if coords is None and "sfc" in constructions:
+        constructions = tuple(kind for kind in constructions if kind != "sfc")
+    neighbors = neighbor_lists(dist)
+    instance = (dist, neighbors, neighbors.tolist(), coords)
+    best_length = multiprocessing.Value("d", math.inf)
+    best_tour = multiprocessing.Array("i", n)
+
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+    tasks = [(worker, seed, constructions, phase, patience or n, started, started + time_budget, target)
+             for worker in range(workers)]
+    if workers == 1:
+        _init_worker(instance, best_length, best_tour)
+        traces = [_worker(tasks[0])]
+    else:
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() \
+            else multiprocessing.get_context()
+        with context.Pool(workers, initializer=_init_worker,
+                          initargs=(instance, best_length, best_tour)) as pool:
+            traces = pool.map(_worker, tasks)
+
+    tour = np.frombuffer(best_tour.get_obj(), dtype=np.int32).astype(np.int64)
+    tour = np.roll(tour, -int(np.flatnonzero(tour == start_city)[0]))
+    trace = []
+    for elapsed, length in sorted(point for worker_trace in traces for point in worker_trace):
+        if not trace or length < trace[-1][1]:
+            trace.append((elapsed, length))
+    return tour[1:].tolist(), tour_length(tour, dist), trace
+
+
+def main():
+    from distance_matrix import DistanceMatrix
+
+    num_cities = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    rng = np.random.default_rng(42)
+    coords = rng.random((num_cities, 2)) * 1000
+    dist = DistanceMatrix.from_coords(coords, "EXACT")
+    checkpoints = [budget * f for f in (0.05, 0.1, 0.25, 0.5, 1.0)]
+    print(f"{num_cities} random cities, {budget:.0f}s budget ({os.cpu_count()} CPUs available)")
+    print("workers  phase  " + "  ".join(f"@{t:5.1f}s" for t in checkpoints))
+    for phase in ("ils", "sa"):
+        for workers in (1, 4, 8):
+            _, length, trace = multi_start(dist, 0, workers=workers, time_budget=budget,
+                                           phase=phase, coords=coords, seed=7)
+            at = [min([l for t, l in trace if t <= c], default=math.inf) for c in checkpoints]
+            print(f"{workers:>7}  {phase:>5}  " + "  ".join(f"{l:7.0f}" for l in at) + f"  final {length:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
-import heapq
+from priority_queues import make_frontier
+from search_core import reconstruct_path
 
-def uniform_cost_search(graph, start, goal):
-    pq = [(0, start)]
+def uniform_cost_search(graph, start, goal, frontier="heap"):
+    pq = make_frontier(frontier)
+    pq.push(start, 0)
     visited = set()
     parent = {start: None}
     cost_so_far = {start: 0}
@@ -9,18 +11,11 @@ def uniform_cost_search(graph, start, goal):
     actual_cost = float('inf')
     actual_path = []
     while pq:
-        cost, node = heapq.heappop(pq)
-        if node in visited:
-            continue
+        cost, node = pq.pop()
         visited.add(node)
 
         if node == goal:
-            path = []
-            while node:
-                path.append(node)
-                node = parent[node]
-
-            path.reverse()
+            path = reconstruct_path(parent, node)
             if actual_cost > cost:
                 actual_cost = cost
                 actual_path = path
@@ -28,9 +23,9 @@ def uniform_cost_search(graph, start, goal):
 
         for neighbor, weight in graph.get(node, []):
             new_cost = cost + weight
-            if neighbor not in cost_so_far or new_cost < cost_so_far.get(neighbor, float('inf')):
+            if neighbor not in visited and new_cost < cost_so_far.get(neighbor, float('inf')):
                 cost_so_far[neighbor] = new_cost
-                heapq.heappush(pq, (new_cost, neighbor))
+                pq.push(neighbor, new_cost)
                 parent[neighbor] = node
 
     return actual_cost, actual_path
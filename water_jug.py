@@ -1,95 +1,37 @@
-import heapq
 import math
-from collections import deque
-
-def water_jug_ucs(a,b,d):
-    if d>max(a,b) or d%math.gcd(a,b)!=0:
-        return -1,[]
-    pq=[(0,0,0,[])]
-    vis=set()
-    while pq:
-        cost, jugA, jugB, path=heapq.heappop(pq)
-        new_path=path+[(jugA, jugB)]
-
-        if jugA==d or jugB==d:
-            return cost, new_path
-        
-        if (jugA, jugB) in vis:
-            continue
-        vis.add((jugA, jugB))
+from search_core import graph_search
 
+def jug_successors(a,b):
+    """Fill, empty and pour moves from a (jugA, jugB) state, each costing one step."""
+    def successors(state):
+        jugA, jugB=state
         next_states=[
             (a,jugB),
             (jugA,b),
             (0,jugB),
             (jugA,0),
-            (jugA+min(a-jugA,jugB),jugB-min(a-jugA,jugB)),
-            (jugA-min(b-jugB,jugA),jugB+min(b-jugB,jugA))
+            (jugA-min(jugA,b-jugB),jugB+min(jugA,b-jugB)),
+            (jugA+min(jugB,a-jugA),jugB-min(jugB,a-jugA))
         ]
+        return [(state,1) for state in next_states]
+    return successors
 
-        for state in next_states:
-            heapq.heappush(pq,(cost+1,state[0],state[1],new_path))
-    return -1,[]
-
-def water_jug_dfs(a,b,d):
+def water_jug_search(a,b,d,strategy):
     if d>max(a,b) or d%math.gcd(a,b)!=0:
         return -1,[]
-    stack=[(0,0,0,[])]
-    vis=set()
-    while stack:
-        cost, jugA, jugB,path=stack.pop()
-        new_path=path+[(jugA,jugB)]
-        
-        if jugA==d or jugB==d:
-            return cost,new_path
-        
-        if (jugA,jugB) in vis:
-            continue
-        vis.add((jugA,jugB))
+    path, cost, _=graph_search((0,0),lambda state: d in state,jug_successors(a,b),strategy=strategy)
+    if not path:
+        return -1,[]
+    return cost, path
 
-        next_states=[
-            (a,jugB),
-            (jugA,b),
-            (0,jugB),
-            (jugA,0),
-            (jugA-min(jugA,b-jugB),jugB+min(jugA,b-jugB)),
-            (jugA+min(jugB,a-jugA),jugB-min(jugB,a-jugA))
-        ]
+def water_jug_ucs(a,b,d):
+    return water_jug_search(a,b,d,"priority")
 
-        for state in next_states:
-            stack.append((cost+1,state[0],state[1],new_path))
-    return -1,[]
+def water_jug_dfs(a,b,d):
+    return water_jug_search(a,b,d,"lifo")
 
 def water_jug_bfs(a,b,d):
-    if d>max(a,b) or d%math.gcd(a,b)!=0:
-        return -1,[]
-    
-    q=deque()
-    q.append((0,0,0,[]))
-    vis=set()
-    while q:
-        cost, jugA, jugB,path=q.popleft()
-        new_path=path+[(jugA,jugB)]
-        if jugA==d or jugB==d:
-            return cost, new_path
-        if (jugA,jugB) in vis:
-            continue
-        vis.add((jugA,jugB))
-        
-        next_states=[
-            (a,jugB),
-            (jugA,b),
-            (0,jugB),
-            (jugA,0),
-            (jugA-min(jugA,b-jugB),jugB+min(jugA,b-jugB)),
-            (jugA+min(jugB,a-jugA),jugB-min(jugB,a-jugA))
-        ]
-
-        for state in next_states:
-            q.append((cost+1,state[0],state[1],new_path))
-    
-    return -1,[]
-        
+    return water_jug_search(a,b,d,"fifo")
 
 
 def main():